@@ -1,20 +1,67 @@
-import logging
 import os
+import sqlite3
+import click
 from flask import Flask, jsonify
 from flask_restful import Api
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from config import Config
-from logging.handlers import TimedRotatingFileHandler
-from flask_migrate import Migrate
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config import get_config
+from werkzeug.exceptions import RequestEntityTooLarge
 
 # Initialize extensions
 db = SQLAlchemy()
-migrate = Migrate()
 
-def create_app(config_class=Config):
+
+# pysqlite tự mở transaction (chỉ trước câu ghi) nên SAVEPOINT của begin_nested() không nằm trong
+# transaction của session: để SQLAlchemy tự phát BEGIN (cách làm trong tài liệu SQLAlchemy cho SQLite)
+@event.listens_for(Engine, 'connect')
+def _sqlite_manual_transactions(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.isolation_level = None
+
+
+@event.listens_for(Engine, 'begin')
+def _sqlite_begin(conn):
+    if conn.dialect.name == 'sqlite':
+        # Gọi thẳng trên kết nối DBAPI: không tính là một câu SQL trong số liệu /metrics
+        conn.connection.driver_connection.execute('BEGIN')
+
+
+class _LazyMigrateCommand(click.Command):
+    """`flask db` of Flask-Migrate, imported (with alembic) only when the command is run"""
+
+    def __init__(self, app):
+        super().__init__('db', help='Perform database migrations.')
+        self.app = app
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as db_cli_group
+        if 'migrate' not in self.app.extensions:
+            Migrate(self.app, db)
+        # Context của nhóm lệnh thật: tùy chọn -d/-x và các lệnh con do Flask-Migrate xử lý
+        return db_cli_group.make_context(info_name, args, parent=parent, **extra)
+
+
+def create_app(config_class=None):
     app = Flask(__name__)
-    app.config.from_object(config_class)
+    # Không truyền config thì chọn theo FLASK_ENV (DevelopmentConfig/ProductionConfig/TestingConfig)
+    app.config.from_object(config_class or get_config())
+
+    # Log JSON qua hàng đợi: request chỉ đẩy bản ghi vào queue, một thread riêng ghi ra file/stdout
+    from app.logging_config import configure_logging
+    configure_logging(app)
+
+    # Mã hóa JSON bằng orjson; datetime/Enum được mã hóa trực tiếp (ISO 8601)
+    from app.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
+    # Tệp upload được stream thẳng vào thư mục uploads (tính SHA-256, giới hạn kích thước khi đang nhận);
+    # chỉ trên các route @accepts_uploads, sau khi đã xác thực token
+    from app.repositories.upload_stream import UploadRequest
+    app.request_class = UploadRequest
     
     # Cấu hình thư mục lưu tệp
     UPLOAD_FOLDER = 'uploads'
@@ -26,7 +73,26 @@ def create_app(config_class=Config):
 
     # Khởi tạo đối tượng SQLAlchemy
     db.init_app(app)
-    migrate.init_app(app, db) 
+    # `flask db ...` luôn được đăng ký; Flask-Migrate (nạp alembic ~170ms) chỉ được import khi lệnh chạy
+    app.cli.add_command(_LazyMigrateCommand(app))
+
+    # Service/repository của các route: mỗi app một bộ, chỉ tạo khi request đầu tiên dùng tới
+    from app.container import DEFAULT_SERVICES, ServiceContainer
+    ServiceContainer(DEFAULT_SERVICES).init_app(app)
+
+    # Hàng đợi job chạy sau commit (worker nền + lệnh `flask jobs drain`)
+    from app.repositories.job_queue import job_queue
+    # Đăng ký job handler ngay lúc khởi động: service/repository giờ chỉ được import khi cần
+    from app.repositories import file_cleanup, thumbnails  # noqa: F401
+    job_queue.init_app(app)
+
+    # Thời gian xử lý, số câu SQL, thời gian DB, kích thước response của mỗi request -> log + GET /metrics
+    from app.instrumentation import request_metrics
+    request_metrics.init_app(app)
+
+    # Profile một request cụ thể theo yêu cầu của manager (X-Profile: 1), ghi file speedscope
+    from app.profiling import request_profiler
+    request_profiler.init_app(app)
     app.config['MEDIA_FOLDER'] = 'media'
 
     # Cho phép các website nào được quyền truy cập vào API của mình 
@@ -46,7 +112,6 @@ def create_app(config_class=Config):
             "max_age": 86400  # Cache preflight requests for 1 day
         }
     })
-    configure_logging(app)
     api = Api(app)
     
 
@@ -54,8 +119,8 @@ def create_app(config_class=Config):
     from app.routes import api_bp  
     app.register_blueprint(api_bp, url_prefix='/api/v1')
 
-    
-    # Error handlers ( xử lí lỗi ) xử lý các lỗi 404, 500
+
+    # Error handlers ( xử lí lỗi ) xử lý các lỗi 404, 413, 500
     @app.errorhandler(404)
     def not_found(error):
         return jsonify({
@@ -63,6 +128,13 @@ def create_app(config_class=Config):
             'message': 'Hello World'
         }), 404
     
+    @app.errorhandler(RequestEntityTooLarge)
+    def request_entity_too_large(error):
+        return jsonify({
+            'success': False,
+            'message': error.description or 'File too large'
+        }), 413
+
     @app.errorhandler(500)
     def internal_error(error):
         return jsonify({
@@ -70,50 +142,28 @@ def create_app(config_class=Config):
             'message': 'Inter server error'
         }), 500
     
-    @app.route('/api/v1/uploads/<filename>')
+    # path: tệp đính kèm lưu theo mã băm nằm trong thư mục con (ví dụ ab/cd/<sha256>.pdf)
+    @app.route('/api/v1/uploads/<path:filename>')
     def uploaded_file(filename):
-        from flask import send_from_directory, abort
+        from flask import abort, request
+        from werkzeug.exceptions import BadRequest, NotFound
+        from app.routes.file_serving import parse_size, send_upload
         try:
-            # Get absolute path to upload folder
-            upload_folder = os.path.abspath(app.config['UPLOAD_FOLDER'])
-            
-            # Verify file exists
-            file_path = os.path.join(upload_folder, filename)
-            if not os.path.exists(file_path):
-                app.logger.error(f"File not found: {file_path}")
-                abort(404)
-            
-            # Determine file type and set appropriate mimetype
-            file_ext = os.path.splitext(filename)[1].lower()
-            mimetypes = {
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg',
-                '.png': 'image/png',
-                '.gif': 'image/gif',
-                '.pdf': 'application/pdf',
-                '.doc': 'application/msword',
-                '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                '.xls': 'application/vnd.ms-excel',
-                '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                '.ppt': 'application/vnd.ms-powerpoint',
-                '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
-            }
-            
-            mimetype = mimetypes.get(file_ext, 'application/octet-stream')
-            return send_from_directory(upload_folder, filename, mimetype=mimetype)
+            # Đọc giá trị thô: type=int biến ?size=abc thành None và âm thầm trả ảnh gốc
+            size = parse_size(request.args.get('size'))
+            # ETag/304/Range do send_upload xử lý; ?size=64|256 trả ảnh thu nhỏ WebP
+            return send_upload(filename, size=size)
+        except BadRequest as e:
+            # ?size= không hợp lệ: trả JSON như các lỗi khác của route thay vì trang HTML của Werkzeug
+            return jsonify({
+                'success': False,
+                'message': e.description
+            }), 400
+        except NotFound:
+            app.logger.error(f"File not found: {filename}")
+            abort(404)
         except Exception as e:
             app.logger.error(f"Error serving file {filename}: {str(e)}")
             abort(500)
 
     return app
-
-
-
-# Configures the logging ( log ra mọi kết quả )
-def configure_logging(app):
-    handler = TimedRotatingFileHandler('flask-template.log', when='midnight', interval=1, backupCount=10)
-    handler.setLevel(logging.INFO) 
-    formatter = logging.Formatter('%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]')
-    handler.setFormatter(formatter)
-    app.logger.addHandler(handler)
-
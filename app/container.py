@@ -0,0 +1,88 @@
+import threading
+from typing import Any, Callable, Dict, Optional
+from flask import Flask, current_app
+from werkzeug.local import LocalProxy
+
+
+class ServiceContainer:
+    """
+    Per-app registry of services and repositories. Each one is built by its factory
+    on first use and then shared for the life of the app, so importing the route
+    modules constructs nothing and a worker only pays for what its requests use.
+    """
+
+    def __init__(self, factories: Optional[Dict[str, Callable[['ServiceContainer'], Any]]] = None):
+        self._factories: Dict[str, Callable[['ServiceContainer'], Any]] = dict(factories or {})
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[['ServiceContainer'], Any]) -> None:
+        """Register (or replace, e.g. with a fake in tests) the factory of a service"""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        # RLock: factory của một service có thể lấy service khác
+        with self._lock:
+            if name not in self._instances:
+                if name not in self._factories:
+                    raise LookupError(f"Unknown service: {name}")
+                self._instances[name] = self._factories[name](self)
+            return self._instances[name]
+
+    def built(self) -> list:
+        """Names of the services constructed so far"""
+        return list(self._instances)
+
+    def init_app(self, app: Flask) -> None:
+        app.extensions['services'] = self
+
+
+def service(name: str) -> Any:
+    """Module-level stand-in for a service: resolves to the current app's instance on each use"""
+    return LocalProxy(lambda: current_app.extensions['services'].get(name))
+
+
+# Import bên trong factory: module service/repository chỉ được nạp khi lần đầu dùng tới
+def _user_service(container: ServiceContainer):
+    from .services.user_service import UserService
+    return UserService(user_repository=container.get('user_repository'))
+
+
+def _task_service(container: ServiceContainer):
+    from .services.task_service import TaskService
+    return TaskService(user_service=container.get('user_service'))
+
+
+def _upload_service(container: ServiceContainer):
+    from .services.upload_service import UploadService
+    return UploadService()
+
+
+def _task_detail_service(container: ServiceContainer):
+    from .services.task_detail_services import TaskDetailService
+    return TaskDetailService()
+
+
+def _user_repository(container: ServiceContainer):
+    from .repositories.user_repository import UserRepository
+    return UserRepository()
+
+
+def _task_detail_assignee_repository(container: ServiceContainer):
+    from .repositories.task_detail_assignee_repository import TaskDetailAssigneeRepository
+    return TaskDetailAssigneeRepository()
+
+
+DEFAULT_SERVICES: Dict[str, Callable[[ServiceContainer], Any]] = {
+    'user_service': _user_service,
+    'task_service': _task_service,
+    'upload_service': _upload_service,
+    'task_detail_service': _task_detail_service,
+    'user_repository': _user_repository,
+    'task_detail_assignee_repository': _task_detail_assignee_repository,
+}
@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from flask import Flask, Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+
+class RequestStats:
+    """SQL activity of one request, filled by the engine events below"""
+    __slots__ = ('start', 'sql_count', 'sql_seconds', 'statements')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.statements: Counter = Counter()
+
+
+class Histogram:
+    """Cumulative Prometheus histogram per label set"""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets: Iterable[float]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[tuple, list] = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, label_values: tuple, value: float) -> None:
+        series = self._series.setdefault(label_values, [0] * len(self.buckets) + [0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for label_values, series in sorted(self._series.items()):
+            labels = _labels(self.labels, label_values)
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{_labels(self.labels + ("le",), label_values + (_number(bound),))} {count}')
+            lines.append(f'{self.name}_bucket{_labels(self.labels + ("le",), label_values + ("+Inf",))} {series[-1]}')
+            lines.append(f'{self.name}_sum{labels} {_number(series[-2])}')
+            lines.append(f'{self.name}_count{labels} {series[-1]}')
+        return lines
+
+
+class CounterMetric:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Counter = Counter()
+
+    def inc(self, label_values: tuple, amount: float = 1) -> None:
+        self._values[label_values] += amount
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f'{self.name}{_labels(self.labels, label_values)} {_number(value)}')
+        return lines
+
+
+def _labels(names: Tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestMetrics:
+    """
+    Per-request wall time, SQL statement count, DB time and response size.
+    Each request is written as one structured log line and aggregated into
+    Prometheus histograms per route, served at GET /metrics. A request running the
+    same SQL statement N_PLUS_ONE_THRESHOLD times or more is logged as a likely N+1.
+    Metrics live in the process: with several gunicorn workers each one exposes its own.
+    """
+
+    def __init__(self):
+        self.n_plus_one_threshold = 5
+        self.slow_request_seconds = 1.0
+        self._lock = threading.Lock()
+        self.latency = Histogram('http_request_duration_seconds', 'Request wall time.', ('method', 'route'), LATENCY_BUCKETS)
+        self.db_time = Histogram('http_request_db_seconds', 'Time spent executing SQL per request.', ('method', 'route'), LATENCY_BUCKETS)
+        self.response_size = Histogram('http_response_size_bytes', 'Response body size.', ('method', 'route'), SIZE_BUCKETS)
+        self.requests = CounterMetric('http_requests_total', 'Requests handled.', ('method', 'route', 'status'))
+        self.sql_statements = CounterMetric('http_request_sql_statements_total', 'SQL statements executed by requests.', ('method', 'route'))
+        self.n_plus_one = CounterMetric('http_request_n_plus_one_total', 'Requests repeating one SQL statement at least the N+1 threshold.', ('method', 'route'))
+
+    def init_app(self, app: Flask) -> None:
+        self.n_plus_one_threshold = app.config.get('N_PLUS_ONE_THRESHOLD', self.n_plus_one_threshold)
+        self.slow_request_seconds = app.config.get('SLOW_REQUEST_MS', self.slow_request_seconds * 1000) / 1000
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view, methods=['GET'])
+
+    def _start(self) -> None:
+        g.request_stats = RequestStats()
+
+    def _finish(self, response: Response) -> Response:
+        stats: Optional[RequestStats] = g.pop('request_stats', None)
+        if stats is None:
+            return response
+        elapsed = time.perf_counter() - stats.start
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        # Tệp gửi kiểu stream/X-Sendfile không có body trong bộ nhớ: dùng Content-Length nếu có
+        size = response.content_length or 0
+        repeated = [(statement, count) for statement, count in stats.statements.most_common()
+                    if count >= self.n_plus_one_threshold]
+
+        labels = (request.method, route)
+        with self._lock:
+            self.latency.observe(labels, elapsed)
+            self.db_time.observe(labels, stats.sql_seconds)
+            self.response_size.observe(labels, size)
+            self.requests.inc(labels + (str(response.status_code),))
+            self.sql_statements.inc(labels, stats.sql_count)
+            if repeated:
+                self.n_plus_one.inc(labels)
+
+        fields = {
+            'method': request.method,
+            'route': route,
+            'status': response.status_code,
+            'duration_ms': round(elapsed * 1000, 2),
+            'sql_count': stats.sql_count,
+            'sql_ms': round(stats.sql_seconds * 1000, 2),
+            'response_bytes': size,
+        }
+        level = logging.WARNING if elapsed >= self.slow_request_seconds else logging.INFO
+        logger.log(level, ' '.join(f'{key}={value}' for key, value in fields.items()), extra={'request_metrics': fields})
+        for statement, count in repeated:
+            logger.warning(f"Possible N+1: {request.method} {route} ran the same statement {count} times: "
+                           f"{' '.join(statement.split())[:300]}")
+        return response
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            for metric in (self.latency, self.db_time, self.response_size, self.requests, self.sql_statements, self.n_plus_one):
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self) -> Response:
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+request_metrics = RequestMetrics()
+
+
+# Đo từng câu SQL của request hiện tại (job worker/CLI không có request nên bỏ qua).
+# Thời điểm bắt đầu gắn vào execution context của câu lệnh, không vào conn.info của kết nối
+# trong pool: câu lệnh lỗi (không có after_cursor_execute) bỏ đi cùng context, không tích lũy
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._request_metrics_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_request_metrics_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    stats = g.get('request_stats') if has_request_context() else None
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_seconds += elapsed
+        # Câu lệnh đã tham số hóa: cùng câu với tham số khác nhau vẫn trùng khóa (dấu hiệu N+1)
+        stats.statements[statement] += 1
@@ -0,0 +1,63 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Union
+from flask.json.provider import DefaultJSONProvider
+
+# orjson là phụ thuộc tùy chọn: không cài thì dùng json của thư viện chuẩn với cùng định dạng đầu ra
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Types neither encoder handles natively; dates stay ISO 8601 as the API always returned them"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson. datetime/date/Enum values are encoded
+    natively (ISO 8601, Enum value), so formatters can pass them through as-is.
+    Keys are sorted like Flask's default provider so bodies and ETags stay stable.
+    """
+
+    default = staticmethod(_default)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self.dumps_bytes(obj, pretty=kwargs.get('indent') is not None).decode('utf-8')
+
+    def dumps_bytes(self, obj: Any, pretty: bool = False) -> bytes:
+        if orjson is None:
+            if pretty:
+                return super().dumps(obj, indent=2).encode('utf-8')
+            return super().dumps(obj, separators=(',', ':')).encode('utf-8')
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        # Ghi thẳng bytes vào response, không qua bước decode/encode chuỗi trung gian
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = self.dumps_bytes(obj, pretty=pretty)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,149 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from typing import Optional
+from flask import Flask, g, has_request_context, request
+from flask.logging import default_handler
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+TEXT_FORMAT = '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
+
+# Thuộc tính sẵn có của LogRecord; những khóa còn lại là `extra` của lời gọi log
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+_CONTEXT_ATTRS = ('request_id', 'method', 'route', 'user_id', 'latency_ms')
+
+
+class ContextQueueHandler(QueueHandler):
+    """
+    Puts records on a queue for the listener thread, so the request thread never does
+    file I/O. Request context (id, route, user, latency) is captured here, in the thread
+    that logged, and the message/traceback are rendered to text before queuing.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        for name in _CONTEXT_ATTRS:
+            setattr(record, name, None)
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.method = request.method
+            record.route = request.url_rule.rule if request.url_rule else request.path
+            record.user_id = g.get('user_id')
+            started_at = g.get('request_started_at')
+            if started_at is not None:
+                record.latency_ms = round((time.perf_counter() - started_at) * 1000, 2)
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only `rate` of INFO and lower records; warnings and errors always pass.
+    Sampling is decided per request id, so a kept request keeps all of its lines.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or record.levelno > logging.INFO:
+            return True
+        request_id = g.get('request_id') if has_request_context() else None
+        if request_id:
+            return zlib.crc32(request_id.encode()) % 10000 < self.rate * 10000
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request context and extras"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for name in _CONTEXT_ATTRS:
+            value = getattr(record, name, None)
+            if value is not None:
+                data[name] = value
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key not in _CONTEXT_ATTRS:
+                data[key] = value
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        data['source'] = f'{record.pathname}:{record.lineno}'
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def build_sink(app: Flask) -> logging.Handler:
+    """Handler that does the actual writing, run by the listener thread: LOG_SINK = file | stdout | stderr"""
+    sink = app.config.get('LOG_SINK', 'file')
+    if sink == 'stdout':
+        handler = logging.StreamHandler(sys.stdout)
+    elif sink == 'stderr':
+        handler = logging.StreamHandler(sys.stderr)
+    else:
+        handler = TimedRotatingFileHandler(app.config.get('LOG_FILE', 'flask-template.log'),
+                                           when='midnight', interval=1, backupCount=10)
+    if app.config.get('LOG_FORMAT', 'json') == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+def configure_logging(app: Flask) -> None:
+    """Route app.logger (and the app.* module loggers) through a queue to a single writer thread"""
+    global _listener, _queue_handler
+    # Tạo app lần nữa (benchmark, test) thì thay listener cũ, không gắn thêm handler trùng
+    if _listener is not None:
+        _listener.stop()
+        app.logger.removeHandler(_queue_handler)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = ContextQueueHandler(log_queue)
+    _queue_handler.addFilter(SamplingFilter(app.config.get('LOG_INFO_SAMPLE_RATE', 1.0)))
+    _listener = QueueListener(log_queue, build_sink(app), respect_handler_level=True)
+    _listener.start()
+
+    app.logger.removeHandler(default_handler)
+    app.logger.addHandler(_queue_handler)
+    app.logger.setLevel(app.config.get('LOG_LEVEL', 'INFO'))
+
+    # Mã request: lấy từ proxy nếu có, trả lại trong header để đối chiếu log
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        g.request_started_at = time.perf_counter()
+
+    @app.after_request
+    def return_request_id(response):
+        if 'request_id' in g:
+            response.headers[REQUEST_ID_HEADER] = g.request_id
+        return response
+
+
+# Ghi nốt các dòng còn trong hàng đợi khi process thoát
+@atexit.register
+def _stop_listener() -> None:
+    if _listener is not None:
+        _listener.stop()
@@ -6,6 +6,8 @@ from .task import Task
 from .user import User
 from .role import UserRole
 from .task_detail import Task_Detail  
+from .file_blob import FileBlob
+from .job import Job
 from .task_attachment import TaskAttachment
 from .task_detail_assignees import Task_Detail_Assignees  
 
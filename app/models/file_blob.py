@@ -0,0 +1,14 @@
+from . import db  # Nhập db từ __init__.py
+
+class FileBlob(db.Model):
+    __tablename__ = 'file_blobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), nullable=False, unique=True)  # Mã băm nội dung tệp
+    path = db.Column(db.String(255), nullable=False, unique=True)  # Đường dẫn tương đối trong thư mục uploads
+    size = db.Column(db.BigInteger, nullable=False)  # Kích thước (byte)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)  # Số tệp đính kèm đang tham chiếu
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())  # Thời gian tạo
+
+    def __repr__(self):
+        return f'<FileBlob {self.sha256[:12]} refs={self.ref_count}>'
@@ -0,0 +1,23 @@
+from . import db  # Nhập db từ __init__.py
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # Tên handler, ví dụ 'remove_files'
+    payload = db.Column(db.JSON, nullable=False)  # Tham số truyền cho handler
+    status = db.Column(db.Enum('pending', 'running', 'failed', name='job_status'), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)  # Số lần đã chạy
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False)  # Chưa tới thời điểm này thì chưa chạy (backoff)
+    locked_until = db.Column(db.DateTime, nullable=True)  # Hết hạn mà vẫn 'running' nghĩa là worker đã chết
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())  # Thời gian tạo
+
+    # Worker lấy job theo (status, run_at)
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
@@ -11,6 +11,14 @@ class Task(db.Model):
     status = db.Column(db.Enum('Đã giao', 'Đang thực hiện', 'Đã hoàn thành'), default='Đã giao')  # Trạng thái
     created_by = db.Column(db.Integer, nullable=False)  # ID của người tạo
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())  # Thời gian tạo
+
+    # Index phục vụ phân trang keyset (created_at, id) và các bộ lọc của GET /task/
+    __table_args__ = (
+        db.Index('ix_tasks_created_at_id', 'created_at', 'id'),
+        db.Index('ix_tasks_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_tasks_created_by_created_at_id', 'created_by', 'created_at', 'id'),
+        db.Index('ix_tasks_deadline', 'deadline'),
+    )
     
     # Mối quan hệ với User
    
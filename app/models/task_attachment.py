@@ -6,6 +6,8 @@ class TaskAttachment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)  # Khóa ngoại liên kết với Task
     file_path = db.Column(db.String(255), nullable=False)  # Đường dẫn tệp
+    blob_id = db.Column(db.Integer, db.ForeignKey('file_blobs.id'), nullable=True, index=True)  # Nội dung tệp dùng chung (NULL với tệp cũ)
+    original_filename = db.Column(db.String(255), nullable=True)  # Tên tệp lúc upload, dùng khi tải về (tệp blob mang tên sha256)
     uploaded_at = db.Column(db.DateTime, default=db.func.current_timestamp())  # Thời gian tải lên
 
     # Mối quan hệ với Task
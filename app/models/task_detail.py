@@ -11,4 +11,13 @@ class Task_Detail(db.Model):
     description = db.Column(db.Text)
     status = db.Column(db.Enum('Đã giao', 'Đang thực hiện', 'Hoàn thành'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Index phục vụ phân trang keyset (created_at, id) và các bộ lọc của GET /task_detail/
+    __table_args__ = (
+        db.Index('ix_task_details_created_at_id', 'created_at', 'id'),
+        db.Index('ix_task_details_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_task_details_task_id_created_at_id', 'task_id', 'created_at', 'id'),
+        # GROUP BY task_id, status của GET /task/progress đọc thẳng từ index
+        db.Index('ix_task_details_task_id_status', 'task_id', 'status'),
+    )
\ No newline at end of file
@@ -20,4 +20,10 @@ class User(db.Model):
     is_verified = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
 
+    # Index phục vụ phân trang keyset (created_at, id) và bộ lọc role của GET /user/
+    __table_args__ = (
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+        db.Index('ix_users_role_created_at_id', 'role', 'created_at', 'id'),
+    )
+
     
\ No newline at end of file
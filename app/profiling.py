@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from flask import Flask, Response, g, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_QUERY_PARAM = '_profile'
+
+Frame = Tuple[str, str, int]  # (hàm, tệp, dòng bắt đầu)
+
+
+class StackSampler(threading.Thread):
+    """
+    Sampling profiler for one thread: every `interval` seconds it records the
+    thread's current Python stack (sys._current_frames), so the profiled request
+    runs at full speed apart from brief GIL pauses.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005, max_seconds: float = 30):
+        super().__init__(name='request-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.samples: List[Tuple[Frame, ...]] = []
+        self.weights: List[float] = []
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        self.started_at = last = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            now = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or now - self.started_at > self.max_seconds:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            # speedscope cần stack từ gốc đến lá
+            self.samples.append(tuple(reversed(stack)))
+            self.weights.append(now - last)
+            last = now
+        self.duration = time.perf_counter() - self.started_at
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def to_speedscope(self, name: str) -> Dict:
+        """Samples as a speedscope 'sampled' profile (open with https://www.speedscope.app)"""
+        frame_index: Dict[Frame, int] = {}
+        samples = [[frame_index.setdefault(frame, len(frame_index)) for frame in stack] for stack in self.samples]
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': [{'name': fn, 'file': file, 'line': line} for fn, file, line in frame_index]},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': self.duration,
+                'samples': samples,
+                'weights': self.weights,
+            }],
+            'name': name,
+            'exporter': 'flask-template request profiler',
+        }
+
+
+class RequestProfiler:
+    """
+    Opt-in profiling of single requests. With PROFILING_ENABLED, a request carrying
+    `X-Profile: 1` (or `?_profile=1`) from a manager account is sampled while it runs
+    and written as a speedscope JSON file in PROFILE_DIR; the file name is returned
+    in the X-Profile-File header. At most PROFILE_MAX_CONCURRENT requests are
+    profiled at once; others run unprofiled with `X-Profile: busy`.
+    """
+
+    def __init__(self):
+        self.directory = 'profiles'
+        self.interval = 0.005
+        self.max_seconds = 30.0
+        self._slots = threading.BoundedSemaphore(1)
+
+    def init_app(self, app: Flask) -> None:
+        if not app.config.get('PROFILING_ENABLED', False):
+            return
+        self.directory = app.config.get('PROFILE_DIR', self.directory)
+        self.interval = app.config.get('PROFILE_INTERVAL_MS', self.interval * 1000) / 1000
+        self.max_seconds = app.config.get('PROFILE_MAX_SECONDS', self.max_seconds)
+        self._slots = threading.BoundedSemaphore(app.config.get('PROFILE_MAX_CONCURRENT', 1))
+        os.makedirs(self.directory, exist_ok=True)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+
+    @staticmethod
+    def requested() -> bool:
+        return request.headers.get(PROFILE_HEADER) == '1' or request.args.get(PROFILE_QUERY_PARAM) == '1'
+
+    def _start(self):
+        if not self.requested():
+            return None
+        # Chỉ manager được profile: trả về luôn lỗi 401/403 của admin_required
+        from .routes.auth_routes import admin_required
+        denied = admin_required(lambda current_user: None)()
+        if denied is not None:
+            return denied
+        if not self._slots.acquire(blocking=False):
+            g.profile_busy = True
+            return None
+        sampler = StackSampler(threading.get_ident(), self.interval, self.max_seconds)
+        g.profile_sampler = sampler
+        sampler.start()
+        return None
+
+    def _finish(self, response: Response) -> Response:
+        if g.pop('profile_busy', False):
+            response.headers[PROFILE_HEADER] = 'busy'
+        path = self._stop()
+        if path:
+            response.headers['X-Profile-File'] = os.path.basename(path)
+        return response
+
+    def _teardown(self, exc: Optional[BaseException]) -> None:
+        # Request lỗi không qua after_request: vẫn dừng sampler và trả slot
+        self._stop()
+
+    def _stop(self) -> Optional[str]:
+        sampler: Optional[StackSampler] = g.pop('profile_sampler', None)
+        if sampler is None:
+            return None
+        try:
+            sampler.stop()
+            name = f"{request.method} {request.full_path.rstrip('?')}"
+            slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+            file_name = (f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{request.method.lower()}-{slug}"
+                         f"-{sampler.duration * 1000:.0f}ms.speedscope.json")
+            path = os.path.join(self.directory, file_name)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(sampler.to_speedscope(name), f)
+            logger.info(f"Profile of {name} written to {path} ({len(sampler.samples)} samples)")
+            return path
+        except Exception as e:
+            logger.error(f"Failed to write profile: {str(e)}")
+            return None
+        finally:
+            self._slots.release()
+
+
+request_profiler = RequestProfiler()
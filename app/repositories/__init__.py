@@ -1,9 +1,18 @@
-# Import interfaces
-from .interfaces.user_repository import IUserRepository
-from .upload_repository import UploadRepository
+import importlib
+
+# Nạp lười: import một module con (ví dụ upload_stream) không kéo theo mọi repository
+_EXPORTS = {
+    'IUserRepository': '.interfaces.user_repository',
+    'UploadRepository': '.upload_repository',
+    'UserRepository': '.user_repository',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
 
-# Import implementations
-from .user_repository import UserRepository
 
 # Export classes for easy import
-__all__ = ['IUserRepository', 'UserRepository']
\ No newline at end of file
+__all__ = ['IUserRepository', 'UserRepository']
@@ -0,0 +1,90 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy.exc import IntegrityError
+from ..models import db, FileBlob
+
+
+def blob_path(sha256: str, extension: str) -> str:
+    """Sharded relative path of a blob, e.g. ab/cd/abcd...ef.pdf"""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{extension.lower()}"
+
+
+def storage_path_from_url(file_url: str) -> str:
+    """Relative path inside the upload folder for an /api/v1/uploads/... URL"""
+    return file_url.split('/uploads/')[-1]
+
+
+class BlobRepository:
+    """
+    Content-addressed file records shared by task attachments.
+    Reference changes are only staged in the session: the caller commits them
+    together with the attachment rows they belong to.
+    """
+
+    def get_by_sha256(self, sha256: str) -> Optional[FileBlob]:
+        return FileBlob.query.filter_by(sha256=sha256).first()
+
+    def get_by_paths(self, paths: Iterable[str]) -> Dict[str, FileBlob]:
+        """Map storage paths to their blobs with one IN query"""
+        paths = set(paths)
+        if not paths:
+            return {}
+        return {blob.path: blob for blob in FileBlob.query.filter(FileBlob.path.in_(paths)).all()}
+
+    def get_or_create(self, sha256: str, path: str, size: int) -> FileBlob:
+        """Return the blob for this content, staging its row in the caller's transaction if needed"""
+        blob = self.get_by_sha256(sha256)
+        if blob:
+            return blob
+        try:
+            # Savepoint: request khác vừa lưu cùng nội dung thì chỉ hủy câu INSERT này,
+            # không hủy các blob khác đã stage trong cùng transaction
+            with db.session.begin_nested():
+                blob = FileBlob(sha256=sha256, path=path, size=size, ref_count=0)
+                db.session.add(blob)
+            return blob
+        except IntegrityError:
+            return self.get_by_sha256(sha256)
+
+    def recreate(self, blob: FileBlob) -> FileBlob:
+        """Stage a new row for a blob that another transaction deleted after this one read it"""
+        # Bản đã đọc không còn trong DB: bỏ khỏi session trước khi thêm bản mới
+        if blob in db.session:
+            db.session.expunge(blob)
+        with db.session.begin_nested():
+            fresh = FileBlob(sha256=blob.sha256, path=blob.path, size=blob.size, ref_count=0)
+            db.session.add(fresh)
+        return fresh
+
+    def add_references(self, blob_ids: Iterable[int]) -> Set[int]:
+        """
+        Stage ref_count increments, one per occurrence of each blob id.
+        Returns the ids whose row no longer exists (released and deleted by another transaction).
+        """
+        missing = set()
+        for blob_id, count in Counter(blob_ids).items():
+            updated = FileBlob.query.filter(FileBlob.id == blob_id).update(
+                {FileBlob.ref_count: FileBlob.ref_count + count}, synchronize_session=False
+            )
+            if not updated:
+                missing.add(blob_id)
+        return missing
+
+    def release_references(self, blob_ids: Iterable[int]) -> List[str]:
+        """
+        Stage ref_count decrements and delete blobs nobody references any more.
+        Returns the storage paths of the deleted blobs; unlink them only after commit.
+        """
+        counts = Counter(blob_id for blob_id in blob_ids if blob_id is not None)
+        if not counts:
+            return []
+        for blob_id, count in counts.items():
+            FileBlob.query.filter(FileBlob.id == blob_id).update(
+                {FileBlob.ref_count: FileBlob.ref_count - count}, synchronize_session=False
+            )
+        orphans = db.session.query(FileBlob.id, FileBlob.path).filter(
+            FileBlob.id.in_(counts.keys()), FileBlob.ref_count <= 0
+        ).all()
+        if orphans:
+            FileBlob.query.filter(FileBlob.id.in_([row.id for row in orphans])).delete(synchronize_session=False)
+        return [row.path for row in orphans]
@@ -0,0 +1,190 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Type
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from config import Config
+from .interfaces.cache_backend import ICacheBackend
+from ..models import db
+
+
+class LRUCacheBackend(ICacheBackend):
+    """Process-local LRU with per-entry TTL"""
+
+    def __init__(self, max_size: int = 2048, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self, prefix: str = '') -> None:
+        with self._lock:
+            if not prefix:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class EntityCache:
+    """
+    Read-through cache of one model's rows by primary key. Only column values are
+    stored; a hit is merged into the current session without a SELECT, so callers
+    get a normal persistent instance they can modify, lazy-load and commit.
+    """
+
+    def __init__(self, model: Type, backend: ICacheBackend):
+        self.model = model
+        self.backend = backend
+        self.prefix = f"{model.__tablename__}:"
+        self._mapper = inspect(model)
+        self._columns = [attr.key for attr in self._mapper.column_attrs]
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def load(self, id: int, loader: Callable[[int], Any]) -> Any:
+        """Return the entity from cache, calling loader(id) and caching the result on a miss"""
+        # Đã có trong session (có thể đang sửa dở) thì dùng luôn, không ghi đè bằng bản trong cache
+        existing = db.session.identity_map.get(self._mapper.identity_key_from_primary_key((id,)))
+        if existing is not None:
+            self._count('hits')
+            return existing
+
+        values = self.backend.get(f"{self.prefix}{id}")
+        if values is not None:
+            self._count('hits')
+            return self._restore(values)
+
+        self._count('misses')
+        entity = loader(id)
+        # Chỉ lưu trạng thái đã khớp với DB, không lưu thay đổi chưa flush
+        if entity is not None and not inspect(entity).modified:
+            self.backend.set(f"{self.prefix}{id}", {key: getattr(entity, key) for key in self._columns})
+        return entity
+
+    def _restore(self, values: Dict[str, Any]) -> Any:
+        # Dựng instance từ giá trị đã lưu rồi gắn vào session hiện tại (merge load=False: không truy vấn)
+        entity = self._mapper.class_manager.new_instance()
+        for key, value in values.items():
+            set_committed_value(entity, key, value)
+        make_transient_to_detached(entity)
+        return db.session.merge(entity, load=False)
+
+    def invalidate(self, id: Optional[int] = None) -> None:
+        """Drop one entity, or the whole model when id is None"""
+        self._count('invalidations')
+        if id is None:
+            self.backend.clear(self.prefix)
+        else:
+            self.backend.delete(f"{self.prefix}{id}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else None,
+            'invalidations': self.invalidations
+        }
+
+
+# Một backend dùng chung cho mọi model (khóa có tiền tố tên bảng), giống cách dùng Redis
+cache_backend: ICacheBackend = LRUCacheBackend(Config.ENTITY_CACHE_SIZE, Config.ENTITY_CACHE_TTL)
+_caches: Dict[Type, EntityCache] = {}
+
+
+def cached_repository(model: Type):
+    """
+    Class decorator: serve the repository's get_by_id from the entity cache.
+    Rows of the model are invalidated when a transaction that flushed an update or
+    delete of them (create/update/delete, or a bulk UPDATE/DELETE) ends, in this
+    process only. The database read stays available as get_by_id_uncached.
+    """
+    cache = _caches.setdefault(model, EntityCache(model, cache_backend))
+
+    def decorator(cls):
+        original = cls.get_by_id
+
+        @functools.wraps(original)
+        def get_by_id(self, id):
+            return cache.load(id, lambda key: original(self, key))
+
+        cls.get_by_id = get_by_id
+        # Cho các chỗ không chấp nhận dữ liệu cũ từ worker khác (vd. role khi xác thực token)
+        cls.get_by_id_uncached = original
+        cls.entity_cache = cache
+        return cls
+    return decorator
+
+
+def entity_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of every repository cache, keyed by table name"""
+    stats = {model.__tablename__: cache.stats() for model, cache in _caches.items()}
+    if isinstance(cache_backend, LRUCacheBackend):
+        stats['_backend'] = {'size': len(cache_backend), 'max_size': cache_backend.max_size}
+    return stats
+
+
+# Ghi nhận (model, id) bị sửa/xóa trong transaction; id None = câu UPDATE/DELETE hàng loạt
+def _stale(session) -> set:
+    return session.info.setdefault('entity_cache_stale', set())
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed(session, flush_context):
+    for entity in list(session.dirty) + list(session.deleted):
+        if type(entity) in _caches:
+            _stale(session).add((type(entity), inspect(entity).identity[0]))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in _caches:
+        _stale(orm_execute_state.session).add((mapper.class_, None))
+
+
+# Xóa khỏi cache khi transaction kết thúc, kể cả rollback (cache có thể đã nạp dữ liệu chưa commit)
+@event.listens_for(Session, 'after_commit')
+@event.listens_for(Session, 'after_rollback')
+def _invalidate_stale(session):
+    for model, id in session.info.pop('entity_cache_stale', ()):
+        _caches[model].invalidate(id)
@@ -0,0 +1,109 @@
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from werkzeug.utils import safe_join
+from ..models import db, FileBlob
+from .job_queue import job_handler, job_queue, jobs_cli
+from .thumbnails import thumbnail_generator
+
+logger = logging.getLogger(__name__)
+
+# Tên tệp gốc trong kho blob: <sha256>[.ext] (ảnh thu nhỏ <sha256>.<size>.webp không khớp)
+BLOB_FILE_NAME = re.compile(r'^[0-9a-f]{64}(\.[^.]+)?$')
+
+
+def upload_root() -> str:
+    return os.path.join(os.getcwd(), 'uploads')
+
+
+def attachment_disk_path(file_path: str) -> Optional[str]:
+    """Map an attachment URL (.../uploads/<name>) to its absolute path on disk; None if it points outside uploads/"""
+    file_name = file_path.split('/uploads/')[-1]
+    # safe_join từ chối '..', đường dẫn tuyệt đối...: không bao giờ trả về tệp nằm ngoài thư mục uploads
+    path = safe_join(upload_root(), file_name)
+    if path is None:
+        logger.warning(f"Refusing to map attachment outside the upload folder: {file_path}")
+    return path
+
+
+def schedule_file_removal(paths: Iterable[Optional[str]]) -> None:
+    """Stage removal of files in the current transaction; they are deleted only after it commits"""
+    paths = [path for path in paths if path]
+    if paths:
+        # Chờ một khoảng: request vừa tham chiếu lại cùng nội dung (tạo lại blob) kịp commit trước khi job kiểm tra
+        job_queue.enqueue('remove_files', {'paths': paths}, delay=current_app.config.get('FILE_REMOVAL_DELAY', 0))
+
+
+def _remove_with_derivatives(path: str) -> list:
+    """Remove a file and its thumbnails; returns the paths that could not be removed"""
+    failed = []
+    for file_path in [path] + thumbnail_generator.derivative_paths(path):
+        try:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        except OSError as e:
+            logger.error(f"Failed to remove file {file_path}: {str(e)}")
+            failed.append(file_path)
+    return failed
+
+
+@job_handler('remove_files')
+def remove_files(payload: Dict[str, Any]) -> None:
+    """Remove files and their thumbnails; raises so the job is retried if any removal failed"""
+    root = upload_root()
+    relative = {path: os.path.relpath(path, root).replace(os.sep, '/') for path in payload['paths']}
+    # Nội dung đã được upload/tham chiếu lại sau khi job được tạo: blob có bản ghi mới thì giữ tệp
+    referenced = {path for (path,) in db.session.query(FileBlob.path).filter(FileBlob.path.in_(set(relative.values())))}
+    failed = []
+    for path in payload['paths']:
+        if relative[path] in referenced:
+            continue
+        failed.extend(_remove_with_derivatives(path))
+    if failed:
+        raise OSError(f"Could not remove {len(failed)} file(s): {', '.join(failed)}")
+
+
+def collect_orphan_blobs(max_age: float) -> Dict[str, int]:
+    """
+    Delete blob rows nobody references and blob files that have no row, when older than
+    max_age seconds (left behind by uploads whose request failed before committing).
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+    rows = db.session.query(FileBlob.id, FileBlob.path).filter(
+        FileBlob.ref_count <= 0, FileBlob.created_at < cutoff
+    ).all()
+    if rows:
+        FileBlob.query.filter(FileBlob.id.in_([row.id for row in rows]), FileBlob.ref_count <= 0).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+
+    root = upload_root()
+    known = {path for (path,) in db.session.query(FileBlob.path)}
+    removed_files = 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            relative = os.path.relpath(path, root).replace(os.sep, '/')
+            # Chỉ xét tệp gốc trong thư mục phân mảnh ab/cd/<sha256>.ext; bản tạm .upload-* đang ghi thì bỏ qua
+            if relative.count('/') != 2 or not BLOB_FILE_NAME.match(name) or relative in known:
+                continue
+            if datetime.utcfromtimestamp(os.path.getmtime(path)) >= cutoff:
+                continue
+            if not _remove_with_derivatives(path):
+                removed_files += 1
+    return {'rows': len(rows), 'files': removed_files}
+
+
+@jobs_cli.command('collect-blobs')
+@click.option('--older-than', type=float, default=None, help='Minimum age in seconds (default BLOB_GC_AGE)')
+@with_appcontext
+def collect_blobs_command(older_than):
+    """Remove unreferenced blob rows and files left by failed uploads"""
+    result = collect_orphan_blobs(older_than if older_than is not None else current_app.config.get('BLOB_GC_AGE', 3600))
+    click.echo(f"Removed {result['rows']} blob row(s) and {result['files']} file(s)")
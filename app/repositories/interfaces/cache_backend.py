@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+class ICacheBackend(ABC):
+    """
+    Key/value store behind the repository caches. Keys are strings and values are
+    plain dicts of column values, so a shared backend (Redis, memcached...) can
+    implement this with the in-process LRU as its local stand-in.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value for ttl seconds (None = backend default)"""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove one key"""
+        pass
+
+    @abstractmethod
+    def clear(self, prefix: str = '') -> None:
+        """Remove every key starting with prefix"""
+        pass
@@ -1,7 +1,15 @@
-from typing import List
+from typing import List, Optional, Tuple
 from werkzeug.datastructures import FileStorage
 
 class IUploadRepository:
-    def save_files(self, files: List[FileStorage], upload_folder: str) -> List[str]:
+    def save_file(self, file: FileStorage, upload_folder: str, max_size: Optional[int] = None) -> Tuple[str, str, int]:
+        """Save one file and return its URL, SHA-256 checksum and size."""
+        pass
+
+    def save_files(self, files: List[FileStorage], upload_folder: str, max_size: Optional[int] = None) -> List[str]:
         """Save files to the specified upload folder and return their absolute paths."""
+        pass
+
+    def save_blobs(self, files: List[FileStorage], upload_folder: str, max_size: Optional[int] = None) -> List[Tuple[str, Optional[str]]]:
+        """Save files by content hash, reusing identical stored files, and return (URL, original filename) pairs."""
         pass
\ No newline at end of file
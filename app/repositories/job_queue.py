@@ -0,0 +1,207 @@
+import logging
+import threading
+import traceback
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+import click
+from flask import Flask
+from flask.cli import with_appcontext
+from sqlalchemy import and_, event, or_
+from sqlalchemy.orm import Session
+from ..models import db, Job
+
+logger = logging.getLogger(__name__)
+
+# kind -> hàm xử lý, nhận payload (dict) của job
+_handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+
+
+def job_handler(kind: str):
+    """Register the function that runs jobs of the given kind"""
+    def decorator(fn):
+        _handlers[kind] = fn
+        return fn
+    return decorator
+
+
+class JobQueue:
+    """
+    Persistent queue of side effects (file removal, thumbnails...) stored in the jobs table.
+    enqueue() only stages a row in the caller's transaction, so a job exists only if the
+    work that produced it committed; worker threads are woken right after that commit.
+    Failed jobs are retried with exponential backoff, and jobs left 'running' by a dead
+    worker are picked up again once their lease expires.
+    """
+
+    def __init__(self):
+        self.app: Optional[Flask] = None
+        self.workers = 2
+        self.max_attempts = 5
+        self.backoff = 2.0
+        self.max_backoff = 600.0
+        self.poll_interval = 5.0
+        self.lease = 300
+        self._wake = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def init_app(self, app: Flask) -> None:
+        self.app = app
+        self.workers = app.config.get('JOB_WORKERS', self.workers)
+        self.max_attempts = app.config.get('JOB_MAX_ATTEMPTS', self.max_attempts)
+        self.backoff = app.config.get('JOB_RETRY_BACKOFF', self.backoff)
+        self.poll_interval = app.config.get('JOB_POLL_INTERVAL', self.poll_interval)
+        self.lease = app.config.get('JOB_LEASE_SECONDS', self.lease)
+        # Worker khởi động ở request đầu tiên (sau khi gunicorn fork), không chạy trong lệnh CLI
+        app.before_request(self._ensure_workers)
+        app.cli.add_command(jobs_cli)
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None, delay: float = 0) -> Job:
+        """Stage a job in the current transaction; it runs only after the caller commits (and delay seconds)"""
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = Job(
+            kind=kind,
+            payload=payload,
+            status='pending',
+            attempts=0,
+            max_attempts=max_attempts or self.max_attempts,
+            run_at=datetime.utcnow() + timedelta(seconds=delay)
+        )
+        db.session.add(job)
+        db.session.info['job_queue_wake'] = True
+        return job
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def _ensure_workers(self) -> None:
+        if self.workers <= 0:
+            return
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for i in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._run, name=f'job-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self) -> None:
+        while True:
+            # Thức dậy khi có commit chứa job mới, hoặc định kỳ để nhận job đến hạn retry
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            with self.app.app_context():
+                try:
+                    while self.run_next():
+                        pass
+                except Exception as e:
+                    logger.error(f"Job worker error: {str(e)}")
+                    db.session.rollback()
+
+    def _due(self, now: datetime, ignore_schedule: bool = False):
+        pending = Job.status == 'pending'
+        if not ignore_schedule:
+            pending = and_(pending, Job.run_at <= now)
+        expired = and_(Job.status == 'running', Job.locked_until < now)
+        return or_(pending, expired)
+
+    def _claim(self, ignore_schedule: bool = False) -> Optional[Job]:
+        """Atomically move one due job to 'running'; safe across threads and processes"""
+        now = datetime.utcnow()
+        due = self._due(now, ignore_schedule)
+        candidates = db.session.query(Job.id).filter(due).order_by(Job.run_at, Job.id).limit(10).all()
+        for (job_id,) in candidates:
+            # UPDATE có điều kiện: worker nào đổi được trạng thái trước thì nhận job
+            claimed = Job.query.filter(Job.id == job_id, due).update({
+                Job.status: 'running',
+                Job.locked_until: now + timedelta(seconds=self.lease),
+                Job.attempts: Job.attempts + 1
+            }, synchronize_session=False)
+            db.session.commit()
+            if claimed:
+                return db.session.get(Job, job_id)
+        return None
+
+    def run_next(self, ignore_schedule: bool = False) -> bool:
+        """Claim and run one due job; False when nothing is due"""
+        job = self._claim(ignore_schedule)
+        if job is None:
+            return False
+
+        job_id, kind, payload = job.id, job.kind, job.payload
+        try:
+            handler = _handlers.get(kind)
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind '{kind}'")
+            handler(payload)
+        except Exception as e:
+            db.session.rollback()
+            job = db.session.get(Job, job_id)
+            job.locked_until = None
+            job.last_error = traceback.format_exc()
+            if job.attempts >= job.max_attempts:
+                job.status = 'failed'
+                logger.error(f"Job {job_id} ({kind}) failed permanently: {str(e)}")
+            else:
+                job.status = 'pending'
+                delay = min(self.max_backoff, self.backoff * 2 ** (job.attempts - 1))
+                job.run_at = datetime.utcnow() + timedelta(seconds=delay)
+                logger.warning(f"Job {job_id} ({kind}) failed, retrying in {delay:.0f}s: {str(e)}")
+            db.session.commit()
+        else:
+            # Job xong thì xóa luôn để bảng chỉ còn việc chưa làm và việc lỗi
+            Job.query.filter(Job.id == job_id).delete(synchronize_session=False)
+            db.session.commit()
+        return True
+
+    def drain(self, max_jobs: Optional[int] = None, ignore_schedule: bool = False) -> int:
+        """Run due jobs on the calling thread until none are left; returns how many ran"""
+        count = 0
+        while (max_jobs is None or count < max_jobs) and self.run_next(ignore_schedule):
+            count += 1
+        return count
+
+
+job_queue = JobQueue()
+
+
+# Đánh thức worker chỉ sau khi transaction chứa job đã commit; rollback thì bỏ cờ
+@event.listens_for(Session, 'after_commit')
+def _wake_after_commit(session):
+    if session.info.pop('job_queue_wake', False):
+        job_queue.notify()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _clear_after_rollback(session):
+    session.info.pop('job_queue_wake', None)
+
+
+@click.group('jobs')
+def jobs_cli():
+    """Background job queue"""
+
+
+@jobs_cli.command('drain')
+@click.option('--max-jobs', type=int, default=None, help='Stop after running this many jobs')
+@click.option('--now', 'ignore_schedule', is_flag=True, help='Also run jobs still waiting for a retry')
+@with_appcontext
+def drain_command(max_jobs, ignore_schedule):
+    """Run queued jobs until the queue is empty"""
+    count = job_queue.drain(max_jobs, ignore_schedule)
+    pending = Job.query.filter(Job.status != 'failed').count()
+    failed = Job.query.filter(Job.status == 'failed').count()
+    click.echo(f"Ran {count} job(s); {pending} pending, {failed} failed")
+
+
+@jobs_cli.command('retry-failed')
+@with_appcontext
+def retry_failed_command():
+    """Queue permanently failed jobs again"""
+    count = Job.query.filter(Job.status == 'failed').update({
+        Job.status: 'pending',
+        Job.attempts: 0,
+        Job.run_at: datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+    click.echo(f"Re-queued {count} job(s)")
@@ -0,0 +1,74 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Mapping, Optional, Tuple
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Phân trang keyset theo cặp (created_at, id): mỗi trang bắt đầu ngay sau bản ghi
+# cuối của trang trước nên chi phí truy vấn không tăng theo số trang như OFFSET
+
+
+def encode_cursor(created_at: Optional[datetime], entity_id: int) -> str:
+    """Encode the last (created_at, id) of a page into an opaque cursor"""
+    raw = json.dumps([created_at.isoformat() if created_at else None, entity_id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode an opaque cursor back into (created_at, id)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, entity_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return (datetime.fromisoformat(created_at) if created_at else None), int(entity_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def parse_page_args(args: Mapping[str, Any]) -> Tuple[Optional[str], int]:
+    """Read cursor/limit query parameters, clamping limit to MAX_PAGE_SIZE"""
+    cursor = args.get('cursor') or None
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return cursor, min(limit, MAX_PAGE_SIZE)
+
+
+def parse_int_arg(args: Mapping[str, Any], name: str) -> Optional[int]:
+    """Read an optional integer filter; a non-integer value is an error instead of being ignored"""
+    value = args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+
+
+def keyset_page(query, model, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Fetch one page of `query` ordered by (created_at, id) and the cursor of the next page"""
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        if created_at is None:
+            # created_at có thể NULL (dữ liệu cũ): MySQL/SQLite xếp NULL trước mọi giá trị khi tăng dần,
+            # nên sau các dòng NULL còn lại là mọi dòng có created_at (so sánh với NULL không khớp dòng nào)
+            query = query.filter(or_(
+                and_(model.created_at.is_(None), model.id > last_id),
+                model.created_at.isnot(None)
+            ))
+        else:
+            query = query.filter(or_(
+                model.created_at > created_at,
+                and_(model.created_at == created_at, model.id > last_id)
+            ))
+    # Lấy dư một bản ghi để biết còn trang sau hay không mà không cần COUNT
+    rows = query.order_by(model.created_at, model.id).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
@@ -0,0 +1,73 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Type
+from sqlalchemy import select
+from ..models import db
+
+
+class RowDTO:
+    """
+    Read-only row built from selected columns: no ORM instance, no identity map,
+    no change tracking. Attributes that were not selected are None.
+    """
+    __slots__ = ()
+
+    def __init__(self, **values: Any):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)})"
+
+
+class TaskRow(RowDTO):
+    __slots__ = ('id', 'code', 'title', 'description', 'deadline', 'status', 'created_by', 'created_at', 'attachments')
+
+
+class AttachmentRow(RowDTO):
+    __slots__ = ('id', 'task_id', 'file_path', 'original_filename', 'uploaded_at')
+
+
+class UserRow(RowDTO):
+    # Không bao giờ đọc password_hash cho danh sách
+    __slots__ = ('id', 'username', 'email', 'birth_year', 'phone', 'gender', 'avatar', 'start_date',
+                 'cv_link', 'role', 'is_verified', 'created_at')
+
+
+class TaskDetailRow(RowDTO):
+    __slots__ = ('id', 'task_id', 'title', 'description', 'status', 'created_at', 'updated_at')
+
+
+def select_rows(model: Type, row_type: Type[RowDTO], columns: Iterable[str], *criteria) -> List[RowDTO]:
+    """SELECT only the given columns of a model and wrap each result row in row_type"""
+    # Sắp theo khóa chính: chỉ đọc vài cột thì DB có thể quét theo index khác và đổi thứ tự trả về
+    statement = select(*[getattr(model, column) for column in columns]).where(*criteria).order_by(model.id)
+    return [row_type(**row._mapping) for row in db.session.execute(statement)]
+
+
+def parse_fields(args: Mapping[str, str]) -> Optional[List[str]]:
+    """Read ?fields=a,b,c; None means every field"""
+    raw = args.get('fields')
+    if not raw:
+        return None
+    return list(dict.fromkeys(field.strip() for field in raw.split(',') if field.strip()))
+
+
+def resolve_fields(fields: Optional[Sequence[str]], field_columns: Dict[str, Sequence[str]]) -> List[str]:
+    """Validate requested fields against field -> source columns; returns the fields to output"""
+    if fields is None:
+        return list(field_columns)
+    unknown = [field for field in fields if field not in field_columns]
+    if unknown:
+        raise ValueError(f"Invalid fields: {unknown}. Must be among: {list(field_columns)}")
+    return list(fields)
+
+
+def columns_for(fields: Sequence[str], field_columns: Dict[str, Sequence[str]]) -> List[str]:
+    """Columns to SELECT for the given output fields (id is always read)"""
+    columns = ['id']
+    for field in fields:
+        columns.extend(field_columns[field])
+    return list(dict.fromkeys(columns))
+
+
+def pick(data: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    return {field: data[field] for field in fields}
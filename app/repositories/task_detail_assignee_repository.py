@@ -1,5 +1,7 @@
-from ..models import db, Task_Detail_Assignees
-from typing import List, Optional
+from ..models import db, Task_Detail_Assignees, Task_Detail, User
+from typing import Dict, List, Optional
+from datetime import datetime
+from sqlalchemy import insert
 
 class TaskDetailAssigneeRepository:
     def create(self, assignee: Task_Detail_Assignees) -> Task_Detail_Assignees:
@@ -12,6 +14,41 @@ class TaskDetailAssigneeRepository:
             db.session.rollback()
             raise e
 
+    def create_many(self, task_detail_id: int, user_ids: List[int]) -> None:
+        """Assign many users to a task detail with one INSERT"""
+        if not user_ids:
+            return
+        try:
+            self._insert(task_detail_id, user_ids)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
+
+    def set_assignees(self, task_detail_id: int, user_ids: List[int]) -> None:
+        """
+        Stage only the inserts/deletes needed so the task detail is assigned exactly user_ids.
+        Does not commit: the caller commits together with its other changes.
+        """
+        current = Task_Detail_Assignees.query.filter_by(task_detail_id=task_detail_id).all()
+        desired = set(user_ids)
+        removed_ids = [assignee.id for assignee in current if assignee.user_id not in desired]
+        if removed_ids:
+            Task_Detail_Assignees.query.filter(
+                Task_Detail_Assignees.id.in_(removed_ids)
+            ).delete(synchronize_session=False)
+        current_user_ids = {assignee.user_id for assignee in current}
+        self._insert(task_detail_id, [user_id for user_id in user_ids if user_id not in current_user_ids])
+
+    def _insert(self, task_detail_id: int, user_ids: List[int]) -> None:
+        if not user_ids:
+            return
+        assigned_at = datetime.utcnow()
+        db.session.execute(insert(Task_Detail_Assignees), [
+            {'task_detail_id': task_detail_id, 'user_id': user_id, 'assigned_at': assigned_at}
+            for user_id in user_ids
+        ])
+
     def get_by_task_detail_id(self, task_detail_id: int) -> List[Task_Detail_Assignees]:
         """Get all assignees for a specific task detail"""
         return Task_Detail_Assignees.query.filter_by(task_detail_id=task_detail_id).all()
@@ -20,6 +57,42 @@ class TaskDetailAssigneeRepository:
         """Get all task details assigned to a specific user"""
         return Task_Detail_Assignees.query.filter_by(user_id=user_id).all()
 
+    def get_users_by_task_detail_id(self, task_detail_id: int) -> List[User]:
+        """Get the users assigned to a task detail with a single join query"""
+        return (
+            User.query
+            .join(Task_Detail_Assignees, Task_Detail_Assignees.user_id == User.id)
+            .filter(Task_Detail_Assignees.task_detail_id == task_detail_id)
+            .order_by(Task_Detail_Assignees.id)
+            .all()
+        )
+
+    def get_users_by_task_detail_ids(self, task_detail_ids: List[int]) -> Dict[int, List[User]]:
+        """Get the assigned users of many task details at once, keyed by task_detail_id"""
+        result = {task_detail_id: [] for task_detail_id in task_detail_ids}
+        if not task_detail_ids:
+            return result
+        rows = (
+            db.session.query(Task_Detail_Assignees.task_detail_id, User)
+            .join(User, Task_Detail_Assignees.user_id == User.id)
+            .filter(Task_Detail_Assignees.task_detail_id.in_(set(task_detail_ids)))
+            .order_by(Task_Detail_Assignees.id)
+            .all()
+        )
+        for task_detail_id, user in rows:
+            result[task_detail_id].append(user)
+        return result
+
+    def get_task_details_by_user_id(self, user_id: int) -> List[Task_Detail]:
+        """Get the task details assigned to a user with a single join query"""
+        return (
+            Task_Detail.query
+            .join(Task_Detail_Assignees, Task_Detail_Assignees.task_detail_id == Task_Detail.id)
+            .filter(Task_Detail_Assignees.user_id == user_id)
+            .order_by(Task_Detail_Assignees.id)
+            .all()
+        )
+
     def delete(self, assignee_id: int) -> bool:
         """Delete a task detail assignee by ID"""
         assignee = Task_Detail_Assignees.query.get(assignee_id)
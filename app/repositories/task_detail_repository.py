@@ -1,11 +1,28 @@
 from .interfaces.task_detail_repository import ITaskDetailRepository
-from ..models import db, Task_Detail
-from typing import List, Optional
+from ..models import db, Task_Detail, Task_Detail_Assignees
+from typing import Any, Dict, List, Optional, Tuple
+from .pagination import keyset_page
+from .entity_cache import cached_repository
+from .projection import TaskDetailRow, select_rows
 
+@cached_repository(Task_Detail)
 class TaskDetailRepository(ITaskDetailRepository):
     def get_all(self) -> List[Task_Detail]:
         """Lấy tất cả task detail từ database"""
         return Task_Detail.query.all()
+
+    def get_all_rows(self, columns: List[str]) -> List[TaskDetailRow]:
+        """Chỉ đọc các cột cần thiết của task detail, trả về dạng row gọn nhẹ"""
+        return select_rows(Task_Detail, TaskDetailRow, columns)
+    
+    def get_page(self, filters: Dict[str, Any], cursor: Optional[str], limit: int) -> Tuple[List[Task_Detail], Optional[str]]:
+        """Lấy một trang task detail theo keyset cùng cursor của trang kế tiếp"""
+        query = Task_Detail.query
+        if filters.get('status'):
+            query = query.filter(Task_Detail.status == filters['status'])
+        if filters.get('task_id'):
+            query = query.filter(Task_Detail.task_id == filters['task_id'])
+        return keyset_page(query, Task_Detail, cursor, limit)
     
     def get_by_id(self, task_detail_id: int) -> Optional[Task_Detail]:
         """Lấy task detail theo ID"""
@@ -35,11 +52,12 @@ class TaskDetailRepository(ITaskDetailRepository):
             raise e
     
     def delete(self, task_detail_id: int) -> bool:
-        """Xoá một task detail theo ID"""
+        """Xoá một task detail theo ID (kèm các assignee) trong một transaction"""
         task_detail = self.get_by_id(task_detail_id)
         if not task_detail:
             return False
         try:
+            Task_Detail_Assignees.query.filter_by(task_detail_id=task_detail_id).delete(synchronize_session=False)
             db.session.delete(task_detail)
             db.session.commit()
             return True
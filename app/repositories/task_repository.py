@@ -1,30 +1,155 @@
 from .interfaces.task_repository import ITaskRepository
-from ..models import db, Task, TaskAttachment, Task_Detail
-from typing import List, Optional
-import os
+from ..models import db, Task, TaskAttachment, Task_Detail, Task_Detail_Assignees
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import func, insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import joinedload
-from ..services.task_detail_services import TaskDetailService
+from sqlalchemy.orm import joinedload, selectinload
+from .pagination import keyset_page
+from .entity_cache import cached_repository
+from .projection import AttachmentRow, TaskRow, select_rows
+from .file_cleanup import attachment_disk_path, schedule_file_removal
+from .blob_repository import BlobRepository, storage_path_from_url
 
+@cached_repository(Task)
 class TaskRepository(ITaskRepository):
+    def __init__(self, blob_repository: BlobRepository = None):
+        self.blob_repository = blob_repository or BlobRepository()
+
+    def _blob_ids(self, file_paths: List[str]) -> List[Optional[int]]:
+        """Blob id of each attachment URL (None for files outside the blob store), staging +1 references"""
+        blobs = self.blob_repository.get_by_paths(storage_path_from_url(path) for path in file_paths)
+        blob_paths = [storage_path_from_url(path) if storage_path_from_url(path) in blobs else None for path in file_paths]
+        missing = self.blob_repository.add_references(blobs[path].id for path in blob_paths if path is not None)
+        if missing:
+            # Blob bị transaction khác giải phóng và xóa giữa lúc đọc và lúc tăng tham chiếu: tạo lại
+            # bản ghi (job xóa tệp kiểm tra lại bảng file_blobs nên tệp trên đĩa được giữ)
+            recreated = {path: self.blob_repository.recreate(blob) for path, blob in blobs.items() if blob.id in missing}
+            blobs.update(recreated)
+            self.blob_repository.add_references(blobs[path].id for path in blob_paths if path in recreated)
+        return [blobs[path].id if path is not None else None for path in blob_paths]
+
+    def _stage_attachments(self, task_id: int, files: List[Tuple[str, Optional[str]]]) -> List[TaskAttachment]:
+        """Add attachment rows for (URL, original filename) pairs, and their blob references, without committing"""
+        blob_ids = self._blob_ids([file_path for file_path, _ in files])
+        attachments = [
+            TaskAttachment(task_id=task_id, file_path=file_path, original_filename=filename, blob_id=blob_id)
+            for (file_path, filename), blob_id in zip(files, blob_ids)
+        ]
+        db.session.add_all(attachments)
+        return attachments
+
+    def get_unknown_attachment_urls(self, file_paths: List[str]) -> Set[str]:
+        """URLs among file_paths that do not name an uploaded blob, checked with one IN query"""
+        blobs = self.blob_repository.get_by_paths(storage_path_from_url(path) for path in file_paths)
+        return {path for path in file_paths if '/uploads/' not in path or storage_path_from_url(path) not in blobs}
+
+    def _release_files(self, attachments: List[Tuple[str, Optional[int]]]) -> List[str]:
+        """
+        Stage reference releases for deleted (file_path, blob_id) rows and return the
+        disk paths that can be removed once the transaction commits.
+        """
+        # Tệp cũ (không thuộc kho blob) vẫn xóa trực tiếp như trước; đường dẫn ra ngoài uploads/ bị bỏ qua (None)
+        paths = [attachment_disk_path(file_path) for file_path, blob_id in attachments if blob_id is None]
+        # Tệp trong kho blob chỉ bị xóa khi không còn attachment nào tham chiếu
+        orphan_paths = self.blob_repository.release_references(blob_id for _, blob_id in attachments)
+        return paths + [attachment_disk_path(path) for path in orphan_paths]
+
     def get_all(self) -> List[Task]:  # Changed from get_all_tasks
         """Get all tasks from the database"""
-        return Task.query.all()
+        # Nạp attachments của tất cả task bằng một truy vấn IN duy nhất thay vì lazy-load từng task
+        return Task.query.options(selectinload(Task.attachments)).all()
+
+    def get_all_rows(self, columns: List[str], with_attachments: bool = True) -> List[TaskRow]:
+        """Select only the given task columns as lightweight rows, with attachments grouped per task"""
+        tasks = select_rows(Task, TaskRow, columns)
+        attachments: Dict[int, List[AttachmentRow]] = {}
+        if with_attachments and tasks:
+            # Danh sách gồm mọi task nên đọc mọi attachment một lần, không cần IN hàng nghìn id
+            for attachment in select_rows(TaskAttachment, AttachmentRow, AttachmentRow.__slots__):
+                attachments.setdefault(attachment.task_id, []).append(attachment)
+        for task in tasks:
+            task.attachments = attachments.get(task.id, [])
+        return tasks
+    
+    def get_page(self, filters: Dict[str, Any], cursor: Optional[str], limit: int) -> Tuple[List[Task], Optional[str]]:
+        """Get one keyset page of tasks matching the filters and the next cursor"""
+        query = Task.query.options(selectinload(Task.attachments))
+        if filters.get('status'):
+            query = query.filter(Task.status == filters['status'])
+        if filters.get('created_by'):
+            query = query.filter(Task.created_by == filters['created_by'])
+        if filters.get('deadline_from'):
+            query = query.filter(Task.deadline >= filters['deadline_from'])
+        if filters.get('deadline_to'):
+            query = query.filter(Task.deadline <= filters['deadline_to'])
+        return keyset_page(query, Task, cursor, limit)
     
     def get_by_id(self, task_id: int) -> Optional[Task]:  # Changed from get_by_id_
         """Get a task by ID"""
         return Task.query.get(task_id)
     
-    def create(self, task: Task) -> Task:  # Changed from create_task
-        """Create a new task"""
+    def create(self, task: Task, files: Optional[List[Tuple[str, Optional[str]]]] = None) -> Task:  # Changed from create_task
+        """Create a new task and its attachments in one transaction"""
         try:
             db.session.add(task)
+            # Blob vừa upload chỉ được commit cùng attachment tham chiếu tới nó (không để lại blob 0 tham chiếu)
+            if files:
+                db.session.flush()
+                self._stage_attachments(task.id, files)
             db.session.commit()
             return task
         except Exception as e:
             db.session.rollback()
             raise e
         
+    def create_many(self, tasks: List[Task], attachment_paths: List[List[str]]) -> List[Task]:
+        """Insert many tasks and their attachments in a single transaction"""
+        try:
+            # executemany: một câu INSERT cho cả lô (add_all sẽ INSERT từng dòng để lấy id)
+            db.session.execute(insert(Task), [
+                {
+                    'code': task.code,
+                    'title': task.title,
+                    'description': task.description,
+                    'deadline': task.deadline,
+                    'status': task.status,
+                    'created_by': task.created_by
+                }
+                for task in tasks
+            ])
+            # code là duy nhất nên lấy lại id của cả lô bằng một truy vấn IN
+            codes = [task.code for task in tasks]
+            id_by_code = dict(db.session.query(Task.code, Task.id).filter(Task.code.in_(codes)).all())
+            attachment_rows = [
+                {'task_id': id_by_code[task.code], 'file_path': file_path}
+                for task, file_paths in zip(tasks, attachment_paths)
+                for file_path in file_paths
+            ]
+            for row, blob_id in zip(attachment_rows, self._blob_ids([row['file_path'] for row in attachment_rows])):
+                # Chỉ nhận tệp đã upload vào kho blob: đường dẫn tùy ý sẽ bị xóa khỏi đĩa khi xóa task
+                if blob_id is None:
+                    raise ValueError(f"Unknown attachment: {row['file_path']}")
+                row['blob_id'] = blob_id
+            if attachment_rows:
+                db.session.execute(insert(TaskAttachment), attachment_rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise e
+        return (
+            Task.query.options(selectinload(Task.attachments))
+            .filter(Task.id.in_([id_by_code[code] for code in codes]))
+            .order_by(Task.id)
+            .all()
+        )
+
+    def get_existing_codes(self, codes: List[str]) -> Set[str]:
+        """Return which of the given task codes already exist, in one IN query"""
+        if not codes:
+            return set()
+        rows = db.session.query(Task.code).filter(Task.code.in_(set(codes))).all()
+        return {row.code for row in rows}
+        
     def get_attachment_by_id(self, attachment_id: int) -> TaskAttachment | None:
         return TaskAttachment.query.get(attachment_id)
         
@@ -33,7 +158,8 @@ class TaskRepository(ITaskRepository):
         try:
             attachment = TaskAttachment(
                 task_id=task_id,
-                file_path=file_path
+                file_path=file_path,
+                blob_id=self._blob_ids([file_path])[0]
             )
             db.session.add(attachment)
             db.session.commit()
@@ -58,6 +184,10 @@ class TaskRepository(ITaskRepository):
         attachments = TaskAttachment.query.filter_by(task_id=task_id).all()
         for attachment in attachments:
             db.session.delete(attachment)
+        # Chỉ tệp blob hết tham chiếu mới bị xóa khỏi đĩa (tệp cũ giữ nguyên như trước)
+        orphan_paths = self.blob_repository.release_references(attachment.blob_id for attachment in attachments)
+        # Job xóa tệp commit cùng transaction, chỉ chạy khi việc xóa bản ghi đã thành công
+        schedule_file_removal(attachment_disk_path(path) for path in orphan_paths)
         db.session.commit()
     
     # ham xoa mot attachment theo id cua attachment
@@ -68,29 +198,23 @@ class TaskRepository(ITaskRepository):
         attachment = TaskAttachment.query.get(attachment_id)
 
         if attachment:
+            schedule_file_removal(self._release_files([(attachment.file_path, attachment.blob_id)]))
             db.session.delete(attachment)
             db.session.commit()
-            file_path = attachment.file_path.split('/uploads/')[-1]
-            absolute_file_path = os.path.join(os.getcwd(), 'uploads', file_path)
-            if os.path.exists(absolute_file_path):
-                os.remove(absolute_file_path)
         else:
             raise ValueError(f"Tệp đính kèm với ID {attachment_id} không tồn tại.")
     
     # ham them nhieu attachment cho task theo id cua task
     # dung de them nhieu attachment cho task khi cap nhat task
-    def add_attachments(self, task_id: int, file_paths: List[str]) -> List[TaskAttachment]:
-        """Add multiple attachments to a task by task ID"""
-        attachments = []
-        for file_path in file_paths:
-            attachment = TaskAttachment(
-                task_id=task_id,
-                file_path=file_path
-            )
-            db.session.add(attachment)
-            attachments.append(attachment)
-        db.session.commit()
-        return attachments
+    def add_attachments(self, task_id: int, files: List[Tuple[str, Optional[str]]]) -> List[TaskAttachment]:
+        """Add attachments to a task by task ID from (URL, original filename) pairs"""
+        try:
+            attachments = self._stage_attachments(task_id, files)
+            db.session.commit()
+            return attachments
+        except Exception as e:
+            db.session.rollback()
+            raise e
     
 
     def delete(self, task_id: int) -> bool:  
@@ -100,25 +224,24 @@ class TaskRepository(ITaskRepository):
             raise ValueError(f"Task với ID {task_id} không tồn tại.")
 
         try:
-            # Sử dụng TaskDetailService để xóa các task_detail liên quan
-            task_detail_service = TaskDetailService()
-            task_details = db.session.query(Task_Detail).filter_by(task_id=task_id).all()
-
-            for task_detail in task_details:
-                task_detail_service.delete(task_detail.id)  # Xóa task_detail và assignees liên quan
-
-            # Xóa các tệp đính kèm (cả bản ghi trong DB và tệp vật lý nếu cần)
-            for attachment in task.attachments:
-                file_path = attachment.file_path.split('/uploads/')[-1]
-                absolute_file_path = os.path.join(os.getcwd(), 'uploads', file_path)
+            # Xóa theo tập hợp: vài câu DELETE ... WHERE thay vì nạp và xóa từng bản ghi
+            detail_ids = db.session.query(Task_Detail.id).filter(Task_Detail.task_id == task_id)
+            db.session.query(Task_Detail_Assignees).filter(
+                Task_Detail_Assignees.task_detail_id.in_(detail_ids.scalar_subquery())
+            ).delete(synchronize_session=False)
+            db.session.query(Task_Detail).filter(Task_Detail.task_id == task_id).delete(synchronize_session=False)
 
-                if os.path.exists(absolute_file_path):
-                    os.remove(absolute_file_path)
-
-                db.session.delete(attachment)
+            # Job xóa tệp vật lý được commit cùng transaction và chỉ chạy sau khi commit thành công
+            file_paths = self._release_files(
+                db.session.query(TaskAttachment.file_path, TaskAttachment.blob_id)
+                .filter(TaskAttachment.task_id == task_id)
+                .all()
+            )
+            db.session.query(TaskAttachment).filter(TaskAttachment.task_id == task_id).delete(synchronize_session=False)
 
             # Xóa task
-            db.session.delete(task)
+            db.session.query(Task).filter(Task.id == task_id).delete(synchronize_session=False)
+            schedule_file_removal(file_paths)
             db.session.commit()
             return True
         except IntegrityError as e:
@@ -127,6 +250,19 @@ class TaskRepository(ITaskRepository):
         except Exception as e:
             db.session.rollback()
             raise ValueError(f"Lỗi không xác định khi xóa task: {str(e)}")
+    def get_ids(self) -> List[int]:
+        """IDs of every task, read from the primary key only"""
+        return [task_id for (task_id,) in db.session.query(Task.id).order_by(Task.id)]
+
+    def count_task_details_by_status(self, task_ids: Optional[List[int]] = None) -> List[Tuple[int, str, int]]:
+        """Count task details per (task_id, status) with one GROUP BY query"""
+        query = db.session.query(Task_Detail.task_id, Task_Detail.status, func.count(Task_Detail.id))
+        if task_ids is not None:
+            if not task_ids:
+                return []
+            query = query.filter(Task_Detail.task_id.in_(set(task_ids)))
+        return query.group_by(Task_Detail.task_id, Task_Detail.status).all()
+
     def count_incomplete_task_details(self, task_id: int) -> int:
         """Count all task details with status not equal to 'Hoàn thành'"""
         return db.session.query(Task_Detail).filter(
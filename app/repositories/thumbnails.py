@@ -0,0 +1,102 @@
+import importlib.util
+import os
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config import Config
+from .job_queue import job_handler, job_queue
+
+# Pillow là phụ thuộc tùy chọn: không cài thì bỏ qua bước tạo ảnh thu nhỏ.
+# Chỉ kiểm tra có cài hay không; PIL được import trong job tạo ảnh, không làm chậm lúc khởi động
+HAS_PILLOW = importlib.util.find_spec('PIL') is not None
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'}
+THUMBNAIL_EXTENSION = '.webp'
+
+
+def is_image(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+
+
+def thumbnail_path(path: str, size: int) -> str:
+    """Path of the derivative stored beside the original, e.g. ab/cd/<sha>.png -> ab/cd/<sha>.256.webp"""
+    return f"{os.path.splitext(path)[0]}.{size}{THUMBNAIL_EXTENSION}"
+
+
+def thumbnail_url(file_url: Optional[str], size: Optional[int]) -> Optional[str]:
+    """?size= URL of an uploaded image, or None for other files and external links"""
+    if not size or not file_url or '/uploads/' not in file_url or not is_image(file_url):
+        return None
+    return f"{file_url}?size={size}"
+
+
+class ThumbnailGenerator:
+    """Create fixed-size WebP thumbnails of uploaded images; runs as a background job"""
+
+    def __init__(self, sizes: Tuple[int, ...] = (64, 256), quality: int = 80):
+        self.sizes = tuple(sorted(sizes))
+        self.quality = quality
+
+    @property
+    def enabled(self) -> bool:
+        return HAS_PILLOW and bool(self.sizes)
+
+    @property
+    def smallest(self) -> Optional[int]:
+        return self.sizes[0] if self.sizes else None
+
+    @property
+    def largest(self) -> Optional[int]:
+        return self.sizes[-1] if self.sizes else None
+
+    def derivative_paths(self, path: str) -> List[str]:
+        """All thumbnail paths that may exist for an original file"""
+        if not is_image(path):
+            return []
+        return [thumbnail_path(path, size) for size in self.sizes]
+
+    def schedule(self, paths: Iterable[str]) -> None:
+        """Stage a thumbnail job for image files already written to disk"""
+        if not self.enabled:
+            return
+        images = [os.path.abspath(path) for path in paths if is_image(path)]
+        if images:
+            job_queue.enqueue('generate_thumbnails', {'paths': images})
+
+    def generate(self, path: str) -> None:
+        """Write every missing thumbnail of one image"""
+        missing = [size for size in self.sizes if not os.path.exists(thumbnail_path(path, size))]
+        if not missing:
+            return
+        from PIL import Image
+        with Image.open(path) as source:
+            source.load()
+            image = source.convert('RGBA') if source.mode not in ('RGB', 'RGBA') else source.copy()
+        # Lớn nhất trước, các cỡ nhỏ hơn thu từ ảnh vừa thu để đỡ tốn CPU
+        for size in sorted(missing, reverse=True):
+            image.thumbnail((size, size))
+            self._save(image, thumbnail_path(path, size))
+
+    def _save(self, image, destination: str) -> None:
+        # Ghi ra tệp tạm rồi đổi tên để request không bao giờ đọc phải ảnh ghi dở
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(destination), prefix='.thumb-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                image.save(out, 'WEBP', quality=self.quality)
+            os.replace(temp_path, destination)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+thumbnail_generator = ThumbnailGenerator(Config.THUMBNAIL_SIZES)
+
+
+@job_handler('generate_thumbnails')
+def generate_thumbnails(payload: Dict[str, Any]) -> None:
+    if not thumbnail_generator.enabled:
+        return
+    for path in payload['paths']:
+        # Tệp gốc đã bị xóa trước khi job kịp chạy thì bỏ qua
+        if os.path.exists(path):
+            thumbnail_generator.generate(path)
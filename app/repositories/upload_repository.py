@@ -1,29 +1,77 @@
 from .interfaces.upload_repository import IUploadRepository
-from typing import List
+from .upload_stream import HashingFileStream, copy_to_hashing_stream
+from .blob_repository import BlobRepository, blob_path
+from typing import List, NamedTuple, Optional, Tuple
 from werkzeug.datastructures import FileStorage
 import os
 import uuid
 
-import os
-from dotenv import load_dotenv
+class UploadedFile(NamedTuple):
+    """API URL of a stored upload and the name the client sent it with"""
+    url: str
+    filename: Optional[str]
 
-# Load environment variables
-load_dotenv()
 
 class UploadRepository(IUploadRepository):
-    def save_files(self, files: List[FileStorage], upload_folder: str) -> List[str]:
+    def __init__(self, blob_repository: BlobRepository = None):
+        self.blob_repository = blob_repository or BlobRepository()
+
+    def _file_url(self, relative_path: str) -> str:
+        # Get base URL from environment
+        base_url = os.getenv('API_BASE_URL')
+        return f"{base_url}/api/v1/uploads/{relative_path}"
+
+    def _hashing_stream(self, file: FileStorage, upload_folder: str, max_size: Optional[int]) -> HashingFileStream:
+        # Tệp đã được stream thẳng vào thư mục upload (UploadRequest) thì dùng luôn,
+        # còn lại sao chép theo từng khối vào tệp tạm
+        if isinstance(file.stream, HashingFileStream):
+            return file.stream
+        return copy_to_hashing_stream(file.stream, upload_folder, max_size)
+
+    def save_file(self, file: FileStorage, upload_folder: str, max_size: Optional[int] = None) -> Tuple[str, str, int]:
+        """Save one uploaded file atomically and return (API URL, SHA-256, size in bytes)."""
+        filename = f"{uuid.uuid4()}_{file.filename}"
+        file_path = os.path.join(upload_folder, filename)
+
+        stream = self._hashing_stream(file, upload_folder, max_size)
+        stream.commit_to(file_path)
+        if not os.path.exists(file_path):
+            raise ValueError(f"Failed to save file: {filename}")
+        return self._file_url(filename), stream.sha256, stream.size
+
+    def save_files(self, files: List[FileStorage], upload_folder: str, max_size: Optional[int] = None) -> List[str]:
         """Save files to the specified upload folder and return their API URLs."""
         file_urls = []
         for file in files:
             if file and file.filename:
-                filename = f"{uuid.uuid4()}_{file.filename}"
-                file_path = os.path.join(upload_folder, filename)
-                file.save(file_path)
-                if not os.path.exists(file_path):
-                    raise ValueError(f"Failed to save file: {filename}")
-                
-                # Get base URL from environment
-                base_url = os.getenv('API_BASE_URL')
-                file_url = f"{base_url}/api/v1/uploads/{filename}"
+                file_url, _, _ = self.save_file(file, upload_folder, max_size)
                 file_urls.append(file_url)
-        return file_urls
\ No newline at end of file
+        return file_urls
+
+
+    def save_blob(self, file: FileStorage, upload_folder: str, max_size: Optional[int] = None) -> str:
+        """Store a file by content hash (deduplicated) and return its API URL."""
+        stream = self._hashing_stream(file, upload_folder, max_size)
+        blob = self.blob_repository.get_by_sha256(stream.sha256)
+        relative_path = blob.path if blob else blob_path(stream.sha256, os.path.splitext(file.filename)[1])
+        destination = os.path.join(upload_folder, relative_path)
+
+        # Nội dung đã có trên đĩa: chỉ cần tham chiếu lại, bỏ bản tạm
+        if os.path.exists(destination):
+            stream.discard()
+        else:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            stream.commit_to(destination)
+
+        if not blob:
+            blob = self.blob_repository.get_or_create(stream.sha256, relative_path, stream.size)
+        return self._file_url(blob.path)
+
+    def save_blobs(self, files: List[FileStorage], upload_folder: str, max_size: Optional[int] = None) -> List[UploadedFile]:
+        """Store files in the content-addressed store and return their API URLs with the original names."""
+        return [
+            # Tên trên đĩa là sha256: giữ lại tên gốc (bỏ phần thư mục) để tải về đúng tên
+            UploadedFile(self.save_blob(file, upload_folder, max_size), os.path.basename(file.filename)[:255])
+            for file in files
+            if file and file.filename
+        ]
@@ -0,0 +1,114 @@
+import hashlib
+import os
+import tempfile
+from functools import wraps
+from typing import IO, Optional
+from flask import Request, current_app, request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+# Kích thước mỗi lần đọc/ghi khi phải tự sao chép luồng dữ liệu
+CHUNK_SIZE = 64 * 1024
+
+
+class HashingFileStream:
+    """
+    Writable temp file inside the upload folder that hashes (SHA-256) and
+    size-checks every chunk as it is written. Once complete it can be
+    renamed into place, so the upload is never copied a second time.
+    """
+
+    def __init__(self, directory: str, max_size: Optional[int] = None):
+        os.makedirs(directory, exist_ok=True)
+        self._file: IO[bytes] = tempfile.NamedTemporaryFile(dir=directory, prefix='.upload-', delete=False)
+        self.temp_path = self._file.name
+        self.max_size = max_size
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._committed = False
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        # Vượt giới hạn thì dừng ngay giữa chừng, không đọc tiếp phần còn lại của tệp
+        if self.max_size is not None and self.size > self.max_size:
+            self.discard()
+            raise RequestEntityTooLarge(f"File exceeds the {self.max_size} byte limit")
+        self._hash.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def commit_to(self, destination: str) -> None:
+        """Atomically move the finished upload to its final path"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp_path, destination)
+        self._committed = True
+
+    def discard(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        if not self._committed and os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def close(self) -> None:
+        # Werkzeug đóng các tệp khi kết thúc request: tệp chưa được lưu thì xóa bản tạm
+        self.discard()
+
+    def __getattr__(self, name):
+        # read/seek/tell/readline... chuyển thẳng cho tệp tạm
+        return getattr(self._file, name)
+
+
+def copy_to_hashing_stream(source: IO[bytes], directory: str, max_size: Optional[int] = None) -> HashingFileStream:
+    """Copy any readable stream chunk by chunk into a HashingFileStream"""
+    stream = HashingFileStream(directory, max_size)
+    try:
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            stream.write(chunk)
+    except Exception:
+        stream.discard()
+        raise
+    return stream
+
+
+class UploadRequest(Request):
+    """Request that streams multipart file parts straight into the upload folder (on upload routes only)"""
+
+    # Chỉ route gắn @accepts_uploads (đặt sau token_required) mới bật; request khác dùng bộ đệm mặc định của Werkzeug
+    stream_uploads = False
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        upload_folder = current_app.config.get('UPLOAD_FOLDER')
+        if not (self.stream_uploads and upload_folder):
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        stream = HashingFileStream(upload_folder, current_app.config.get('UPLOAD_MAX_FILE_SIZE'))
+        # Ghi nhớ để dọn cả khi form bị lỗi giữa chừng (413): lúc đó request.files không được gán
+        self._upload_streams = getattr(self, '_upload_streams', []) + [stream]
+        return stream
+
+    def close(self) -> None:
+        # Flask gọi close() khi kết thúc request: xóa các tệp tạm chưa được lưu vào blob store
+        for stream in getattr(self, '_upload_streams', []):
+            stream.discard()
+        super().close()
+
+
+def accepts_uploads(f):
+    """
+    Route decorator, placed below token_required: streams the multipart body into
+    the upload folder and parses it before the route runs, so an oversized file
+    answers 413 instead of being turned into a 500 by the route's try/except.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        request.stream_uploads = True
+        if request.mimetype == 'multipart/form-data':
+            request.files
+        return f(*args, **kwargs)
+    return decorated
@@ -1,22 +1,56 @@
 from .interfaces.user_repository import IUserRepository
 from ..models import db, User
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+from .pagination import keyset_page
+from .entity_cache import cached_repository
+from .projection import UserRow, select_rows
 
+@cached_repository(User)
 class UserRepository(IUserRepository):
     def get_all(self) -> List[User]:
         """Get all users from the database"""
         return User.query.all()
+
+    def get_all_rows(self, columns: List[str]) -> List[UserRow]:
+        """Select only the given user columns as lightweight rows"""
+        return select_rows(User, UserRow, columns)
+
+    def get_rows_by_ids(self, user_ids: List[int], columns: List[str]) -> List[UserRow]:
+        """Select only the given columns of many users in a single IN query"""
+        if not user_ids:
+            return []
+        return select_rows(User, UserRow, columns, User.id.in_(set(user_ids)))
+    
+    def get_page(self, filters: Dict[str, Any], cursor: Optional[str], limit: int) -> Tuple[List[User], Optional[str]]:
+        """Get one keyset page of users matching the filters and the next cursor"""
+        query = User.query
+        if filters.get('role'):
+            query = query.filter(User.role == filters['role'])
+        return keyset_page(query, User, cursor, limit)
     
     def get_by_id(self, user_id: int) -> Optional[User]:
         """Get a user by ID"""
         return User.query.get(user_id)
     
+    def get_by_ids(self, user_ids: List[int]) -> List[User]:
+        """Get many users by ID in a single query"""
+        if not user_ids:
+            return []
+        return User.query.filter(User.id.in_(set(user_ids))).all()
+    
 
     def get_by_username(self, username: str) -> Optional[User]:
         """Get a user by username"""
         return User.query.filter_by(username=username).first()
     
 
+    def get_by_usernames(self, usernames: List[str]) -> List[User]:
+        """Get many users by username in a single query"""
+        if not usernames:
+            return []
+        return User.query.filter(User.username.in_(set(usernames))).order_by(User.id).all()
+    
+
     def get_by_email(self, email: str) -> Optional[User]:
         """Get a user by email"""
         return User.query.filter_by(email=email).first()
@@ -12,4 +12,8 @@ from .task_routes import task_bp
 api_bp.register_blueprint(task_bp)
 
 from .task_detail_routes import task_detail_bp
-api_bp.register_blueprint(task_detail_bp)
\ No newline at end of file
+api_bp.register_blueprint(task_detail_bp)
+from .cache_routes import cache_bp
+api_bp.register_blueprint(cache_bp)
+from .health_routes import health_bp
+api_bp.register_blueprint(health_bp)
@@ -1,10 +1,11 @@
-from flask import Blueprint, jsonify, request, make_response
-from ..services.user_service import UserService
+from flask import Blueprint, g, jsonify, request, make_response
+from ..container import service
+from ..services.password_hasher import PasswordHasherBusy
 from functools import wraps
 from datetime import datetime, timedelta
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
-user_service = UserService()
+user_service = service('user_service')
 
 # bảo vệ router cần có token
 def token_required(f):
@@ -35,14 +36,16 @@ def token_required(f):
                 'message': payload.get('error', 'Invalid token')
             }), 401
             
-        # Get user from token
-        current_user = user_service.get_user_from_token(token)
+        # Get user from token (dùng lại payload đã xác thực, không decode JWT lần hai)
+        current_user = user_service.get_user_from_token(token, payload)
         if not current_user:
             return jsonify({
                 'success': False,
                 'message': 'User not found'
             }), 401
             
+        # Gắn user id vào các dòng log của request này
+        g.user_id = current_user.get('id')
         return f(current_user, *args, **kwargs)
     return decorated
 
@@ -80,11 +83,18 @@ def login():
             'message': 'Email and password are required'
         }), 400
     
-    is_valid, user = user_service.verify_credentials(email, password)
+    try:
+        is_valid, user = user_service.verify_credentials(email, password)
+    except PasswordHasherBusy:
+        return jsonify({
+            'success': False,
+            'message': 'Server is busy, please try again'
+        }), 503
     if is_valid and user:
         # Generate tokens
-        access_token = user_service.generate_access_token(user.id)
-        refresh_token = user_service.generate_refresh_token(user.id)
+        role = user.role.value if user.role else None
+        access_token = user_service.generate_access_token(user.id, role)
+        refresh_token = user_service.generate_refresh_token(user.id, role)
         
         # Create response
         response = make_response(jsonify({
@@ -94,7 +104,7 @@ def login():
                 'access_token': access_token,
                 'refresh_token': refresh_token,
                 'user': user_service._format_user_data(user),
-                'role': user.role.value if user.role else None  # Thêm role vào response
+                'role': role  # Thêm role vào response
             }
         }))
         
@@ -159,7 +169,13 @@ def refresh_token():
             'message': 'Invalid token payload'
         }), 401
         
-    new_access_token = user_service.generate_access_token(user_id)
+    try:
+        new_access_token = user_service.refresh_access_token(payload)
+    except LookupError:
+        return jsonify({
+            'success': False,
+            'message': 'User not found'
+        }), 401
     
     # Create response
     response = make_response(jsonify({
@@ -0,0 +1,21 @@
+from flask import Blueprint, jsonify
+from .auth_routes import admin_required
+from ..repositories.entity_cache import entity_cache_stats
+from ..services.response_cache import response_cache
+
+cache_bp = Blueprint('cache', __name__, url_prefix='/cache')
+
+# Số lần trúng/trượt cache của process đang phục vụ request này (mỗi worker gunicorn có cache riêng)
+@cache_bp.route('/stats', methods=['GET'])
+@admin_required
+def get_cache_stats(current_user):
+    try:
+        return jsonify({
+            'success': True,
+            'data': {
+                'entities': entity_cache_stats(),
+                'responses': response_cache.stats()
+            }
+        }), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
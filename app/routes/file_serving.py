@@ -0,0 +1,121 @@
+import os
+import re
+import unicodedata
+from typing import Optional, Tuple
+from urllib.parse import quote
+from flask import Response, current_app, send_from_directory
+from werkzeug.exceptions import BadRequest, NotFound
+from werkzeug.http import dump_options_header
+from werkzeug.security import safe_join
+from ..repositories.thumbnails import is_image, thumbnail_path, thumbnail_generator
+
+# Bảng mimetype dựng một lần khi import thay vì mỗi request
+MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.pdf': 'application/pdf',
+    '.doc': 'application/msword',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.xls': 'application/vnd.ms-excel',
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    '.ppt': 'application/vnd.ms-powerpoint',
+    '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+    '.webp': 'image/webp'
+}
+
+# Tệp lưu theo nội dung (aa/bb/<sha256>.<ext>): nội dung không bao giờ đổi nên cache vĩnh viễn
+BLOB_NAME = re.compile(r'^[0-9a-f]{2}/[0-9a-f]{2}/(?P<sha256>[0-9a-f]{64})(\.\w+)?$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def _invalid_size() -> BadRequest:
+    return BadRequest(f"Invalid size. Must be one of: {list(thumbnail_generator.sizes)}")
+
+
+def parse_size(value: Optional[str]) -> Optional[int]:
+    """Parse the raw ?size= value; anything but an integer is rejected with BadRequest"""
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise _invalid_size()
+
+
+def _resolve_size(upload_folder: str, filename: str, size: Optional[int]) -> Tuple[str, bool]:
+    """Return (file to send, whether it is the requested variant) for an optional ?size="""
+    if size is None:
+        return filename, True
+    if size not in thumbnail_generator.sizes:
+        raise _invalid_size()
+    if not is_image(filename):
+        return filename, False
+    thumbnail = thumbnail_path(filename, size)
+    thumbnail_file = safe_join(upload_folder, thumbnail)
+    if thumbnail_file and os.path.isfile(thumbnail_file):
+        return thumbnail, True
+    # Ảnh thu nhỏ chưa tạo xong (hoặc không có Pillow): trả ảnh gốc
+    return filename, False
+
+
+def _content_disposition(download_name: str) -> str:
+    # Giống send_file của Werkzeug: tên có dấu (tiếng Việt) đi kèm filename* dạng UTF-8
+    try:
+        download_name.encode('ascii')
+        names = {'filename': download_name}
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', download_name).encode('ascii', 'ignore').decode('ascii')
+        names = {'filename': simple, 'filename*': f"UTF-8''{quote(download_name, safe='!#$&+^`|~')}"}
+    return dump_options_header('attachment', names)
+
+
+def send_upload(filename: str, as_attachment: bool = False, size: Optional[int] = None,
+                download_name: Optional[str] = None) -> Response:
+    """
+    Serve a file from the upload folder with ETag, Last-Modified, 304 and Range support.
+    Content-addressed files get their SHA-256 as a strong ETag and an immutable
+    Cache-Control. With UPLOAD_ACCEL_REDIRECT_PREFIX set, the bytes are handed off to
+    nginx through X-Accel-Redirect; with USE_X_SENDFILE, Flask emits X-Sendfile.
+    size selects a pre-generated WebP thumbnail of an image, falling back to the original.
+    download_name is the file name of an attachment download (default: the stored name).
+    """
+    upload_folder = os.path.abspath(current_app.config['UPLOAD_FOLDER'])
+    blob = BLOB_NAME.match(filename)
+    filename, exact = _resolve_size(upload_folder, filename, size)
+    mimetype = MIME_TYPES.get(os.path.splitext(filename)[1].lower(), 'application/octet-stream')
+    # Bản thay thế tạm thời (ảnh gốc thay cho thumbnail) không được cache vĩnh viễn
+    immutable = bool(blob) and exact
+    etag = None
+    if immutable:
+        etag = blob.group('sha256') if size is None else f"{blob.group('sha256')}-{size}"
+
+    accel_prefix = current_app.config.get('UPLOAD_ACCEL_REDIRECT_PREFIX')
+    if accel_prefix:
+        file_path = safe_join(upload_folder, filename)
+        if file_path is None or not os.path.isfile(file_path):
+            raise NotFound()
+        # nginx tự xử lý Range/If-None-Match và gửi tệp, Python chỉ trả header
+        response = current_app.response_class(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{filename}"
+        if as_attachment:
+            response.headers['Content-Disposition'] = _content_disposition(download_name or os.path.basename(filename))
+        if etag:
+            response.set_etag(etag)
+    else:
+        response = send_from_directory(
+            upload_folder,
+            filename,
+            mimetype=mimetype,
+            as_attachment=as_attachment,
+            download_name=download_name,
+            etag=etag or True,
+            max_age=IMMUTABLE_MAX_AGE if immutable else None
+        )
+
+    if immutable:
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
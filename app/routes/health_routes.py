@@ -0,0 +1,41 @@
+import time
+from flask import Blueprint, jsonify
+from sqlalchemy import text
+from ..models import db
+
+health_bp = Blueprint('health', __name__, url_prefix='/health')
+
+
+def pool_status(engine):
+    """Connection counts of the engine's pool (QueuePool); other pools only report their class"""
+    pool = engine.pool
+    status = {'class': type(pool).__name__}
+    if hasattr(pool, 'checkedout'):
+        status.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            # Âm khi pool chưa mở đủ pool_size kết nối
+            'overflow': pool.overflow(),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+        })
+    return status
+
+
+# Không cần đăng nhập: dùng cho load balancer / giám sát
+@health_bp.route('/db', methods=['GET'])
+def check_db():
+    start = time.perf_counter()
+    try:
+        db.session.execute(text('SELECT 1'))
+        db.session.rollback()
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e), 'pool': pool_status(db.engine)}), 503
+    return jsonify({
+        'success': True,
+        'data': {
+            'latency_ms': round((time.perf_counter() - start) * 1000, 3),
+            'pool': pool_status(db.engine)
+        }
+    }), 200
@@ -1,40 +1,76 @@
 from flask import Blueprint, request, jsonify
-from ..services import TaskDetailService
+from ..container import service
 from .auth_routes import token_required
 
-from ..repositories.task_detail_assignee_repository import TaskDetailAssigneeRepository
-from ..repositories.user_repository import UserRepository
+from ..repositories.pagination import parse_int_arg, parse_page_args
+from ..repositories.projection import parse_fields
 
 
 task_detail_bp = Blueprint('task_detail', __name__, url_prefix='/task_detail')
-task_detail_service = TaskDetailService()
+# Service/repository được tạo lần đầu khi request dùng tới (xem app/container.py)
+task_detail_service = service('task_detail_service')
 
-assignee_repo = TaskDetailAssigneeRepository()
-user_repo = UserRepository()
+assignee_repo = service('task_detail_assignee_repository')
+user_repo = service('user_repository')
+
+def _format_assignee(user):
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email
+    }
 
 @task_detail_bp.route('/<int:task_detail_id>/assignees', methods=['GET'])
 def get_task_detail_assignees(task_detail_id):
     try:
-        assignees = assignee_repo.get_by_task_detail_id(task_detail_id)
-        # Lấy thông tin user từ user_id
-        users = []
-        for assignee in assignees:
-            user = user_repo.get_by_id(assignee.user_id)
-            if user:
-                users.append({
-                    "id": user.id,
-                    "username": user.username,
-                    "email": user.email
-                })
-        return jsonify({'success': True, 'data': users}), 200
+        # Lấy thông tin user được giao bằng một truy vấn join
+        users = assignee_repo.get_users_by_task_detail_id(task_detail_id)
+        return jsonify({'success': True, 'data': [_format_assignee(user) for user in users]}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+# Lấy assignees của nhiều task detail cùng lúc, ví dụ: /task_detail/assignees?ids=1,2,3
+@task_detail_bp.route('/assignees', methods=['GET'])
+def get_bulk_task_detail_assignees():
+    try:
+        raw_ids = request.args.get('ids', '')
+        try:
+            task_detail_ids = [int(item) for item in raw_ids.split(',') if item.strip()]
+        except ValueError:
+            return jsonify({'success': False, 'error': 'ids must be a comma-separated list of integers'}), 400
+        if not task_detail_ids:
+            return jsonify({'success': False, 'error': 'ids is required'}), 400
+
+        assignees = assignee_repo.get_users_by_task_detail_ids(task_detail_ids)
+        data = {
+            str(task_detail_id): [_format_assignee(user) for user in users]
+            for task_detail_id, users in assignees.items()
+        }
+        return jsonify({'success': True, 'data': data}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# Các tham số bật chế độ phân trang keyset cho GET /task_detail/
+TASK_DETAIL_LIST_PARAMS = ('cursor', 'limit', 'status', 'task_id')
+
 @task_detail_bp.route('/', methods=['GET'])
 def get_all_task_details():
     try:
-        task_details = task_detail_service.get_all()
-        return jsonify({'success': True, 'data': task_details}), 200
+        # ?fields=id,title,... chỉ trả về (và chỉ đọc) các trường được yêu cầu
+        fields = parse_fields(request.args)
+        if not any(param in request.args for param in TASK_DETAIL_LIST_PARAMS):
+            task_details = task_detail_service.get_all(fields)
+            return jsonify({'success': True, 'data': task_details}), 200
+
+        cursor, limit = parse_page_args(request.args)
+        filters = {
+            'status': request.args.get('status'),
+            'task_id': parse_int_arg(request.args, 'task_id')
+        }
+        page = task_detail_service.get_page(filters, cursor, limit, fields)
+        return jsonify({'success': True, 'data': page['items'], 'next_cursor': page['next_cursor']}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -122,16 +158,8 @@ def update_task_detail_status(current_user,task_detail_id, status):
 @task_detail_bp.route('/user/<int:user_id>', methods=['GET'])
 def get_task_details_by_user_id(user_id):
     try:
-        # First get all task_detail_ids assigned to this user
-        assignees = assignee_repo.get_by_user_id(user_id)
-        
-        # Get all task details for these assignments
-        task_details = []
-        for assignee in assignees:
-            detail = task_detail_service.get_by_id(assignee.task_detail_id)
-            if detail:
-                task_details.append(detail)
-                
+        # Lấy tất cả task detail được giao cho user bằng một truy vấn join
+        task_details = task_detail_service.get_by_user_id(user_id)
         return jsonify({'success': True, 'data': task_details}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1,43 +1,74 @@
 from typing import Dict, Any, List 
-from flask import Blueprint, jsonify, request, current_app, send_file
-from ..services import TaskService, UploadService, UserService
+from flask import Blueprint, jsonify, request, current_app
+from ..container import service
+from ..services.response_cache import response_cache
 from ..models import TaskAttachment
+from ..repositories.pagination import parse_int_arg, parse_page_args
+from ..repositories.projection import parse_fields
+from ..repositories.blob_repository import storage_path_from_url
+from ..repositories.upload_stream import accepts_uploads
+from .file_serving import send_upload
+from werkzeug.exceptions import NotFound
 from datetime import datetime
 from .auth_routes import token_required
 import os
 
 task_bp = Blueprint('task', __name__, url_prefix='/task')
-task_service = TaskService()
-user_service = UserService()
-upload_service = UploadService()
+# Service được tạo lần đầu khi request dùng tới (xem app/container.py)
+task_service = service('task_service')
+user_service = service('user_service')
+upload_service = service('upload_service')
+
+# Các tham số bật chế độ phân trang keyset cho GET /task/
+TASK_LIST_PARAMS = ('cursor', 'limit', 'status', 'created_by', 'deadline_from', 'deadline_to')
 
 @task_bp.route('/', methods=['GET'])
 def get_all_tasks():
     try:
-        tasks = task_service.get_all()
-        return jsonify({
-            'success': True,
-            'data': tasks
-        }), 200
+        # ?fields=id,title,... chỉ trả về (và chỉ đọc) các trường được yêu cầu
+        fields = parse_fields(request.args)
+        # Body JSON được mã hóa sẵn và dùng lại cho tới khi có ghi vào tasks/attachments/users
+        # Không có tham số nào thì giữ nguyên response cũ (trả về toàn bộ task)
+        if not any(param in request.args for param in TASK_LIST_PARAMS):
+            return response_cache.respond('tasks', request.query_string.decode(), lambda: {
+                'success': True,
+                'data': task_service.get_all(fields)
+            })
+
+        cursor, limit = parse_page_args(request.args)
+        filters = {
+            'status': request.args.get('status'),
+            'created_by': parse_int_arg(request.args, 'created_by'),
+            'deadline_from': request.args.get('deadline_from'),
+            'deadline_to': request.args.get('deadline_to')
+        }
+
+        def build_page():
+            page = task_service.get_page(filters, cursor, limit, fields)
+            return {
+                'success': True,
+                'data': page['items'],
+                'next_cursor': page['next_cursor']
+            }
+        return response_cache.respond('tasks', request.query_string.decode(), build_page)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @task_bp.route('/', methods=['POST'])
 @token_required
+@accepts_uploads
 def create_task(current_user):
     try:
         if request.is_json:
             data = request.get_json()
             if not data:
                 return jsonify({'success': False, 'error': 'No data provided'}), 400
-            file_paths = None
         elif request.form:
             data = request.form.to_dict()
             if not data:
                 return jsonify({'success': False, 'error': 'No form data provided'}), 400
-
-            # Sử dụng UploadService để xử lý upload file
-            file_paths = upload_service.upload_files(request, 'attachments')
         else:
             return jsonify({'success': False, 'error': 'Unsupported content type'}), 400
 
@@ -57,7 +88,9 @@ def create_task(current_user):
                 'error': 'Invalid deadline format. Use ISO format (e.g., 2025-04-21T15:30:00)'
             }), 400
 
-        new_task = task_service.create(data, file_paths)
+        # Chỉ lưu tệp khi dữ liệu đã hợp lệ; blob được commit cùng task (lưu theo nội dung, tệp trùng chỉ lưu một bản)
+        files = None if request.is_json else upload_service.upload_blobs(request, 'attachments')
+        new_task = task_service.create(data, files)
         if not new_task:
             return jsonify({
                 'success': False,
@@ -76,6 +109,39 @@ def create_task(current_user):
             'error': str(e)
         }), 500
 
+# Số task tối đa trong một lần tạo hàng loạt
+MAX_BULK_TASKS = 1000
+
+@task_bp.route('/bulk', methods=['POST'])
+@token_required
+def create_tasks_bulk(current_user):
+    try:
+        data = request.get_json(silent=True)
+        rows = data.get('tasks') if isinstance(data, dict) else data
+        if not isinstance(rows, list) or not rows:
+            return jsonify({'success': False, 'error': 'Provide a non-empty list of tasks'}), 400
+        if len(rows) > MAX_BULK_TASKS:
+            return jsonify({
+                'success': False,
+                'error': f'Too many tasks in one request (max {MAX_BULK_TASKS})'
+            }), 400
+
+        result = task_service.create_many(rows)
+        if result['errors']:
+            return jsonify({
+                'success': False,
+                'error': 'Validation failed, no task was created',
+                'errors': result['errors']
+            }), 400
+
+        return jsonify({
+            'success': True,
+            'message': f"{len(result['created'])} tasks created successfully",
+            'data': result['created']
+        }), 201
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @task_bp.route('/<int:task_id>', methods=['GET'])
 def get_task_by_id(task_id):
     try:
@@ -160,20 +226,42 @@ def download_attachment(attachment_id):
                 'error': f'Attachment with ID {attachment_id} not found'
             }), 404
 
+        # file_path là URL /api/v1/uploads/..., tệp nằm trong thư mục upload
         file_path = attachment_data['file_path']
-        if not os.path.exists(file_path):
-            return jsonify({
-                'success': False,
-                'error': f'File not found at path: {file_path}'
-            }), 404
-
-        return send_file(file_path, as_attachment=True)
+        # Tệp blob mang tên sha256 trên đĩa: tải về với tên lúc upload (tệp cũ giữ tên đã lưu)
+        return send_upload(storage_path_from_url(file_path), as_attachment=True,
+                           download_name=attachment_data['original_filename'])
+    except NotFound:
+        return jsonify({
+            'success': False,
+            'error': f'File not found at path: {file_path}'
+        }), 404
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
     
+# Tiến độ của nhiều task trong một lần gọi, ví dụ: /task/progress?task_ids=1,2,3 (bỏ trống = tất cả)
+@task_bp.route('/progress', methods=['GET'])
+def get_tasks_progress():
+    try:
+        raw_ids = request.args.get('task_ids')
+        task_ids = None
+        if raw_ids:
+            try:
+                task_ids = [int(item) for item in raw_ids.split(',') if item.strip()]
+            except ValueError:
+                return jsonify({'success': False, 'error': 'task_ids must be a comma-separated list of integers'}), 400
+
+        progress = task_service.get_progress(task_ids)
+        return jsonify({
+            'success': True,
+            'data': {str(task_id): entry for task_id, entry in progress.items()}
+        }), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @task_bp.route('/<int:task_id>/incomplete_details', methods=['GET'])
 def count_incomplete_task_details(task_id):
     try:
@@ -184,14 +272,18 @@ def count_incomplete_task_details(task_id):
 
 @task_bp.route('/<int:task_id>/attachments', methods=['POST'])
 @token_required
+@accepts_uploads
 def add_attachments(current_user, task_id):
     try:
         if not request.files:
             return jsonify({'success': False, 'error': 'No files provided'}), 400
+        # Kiểm tra task trước khi lưu tệp: request bị từ chối không để lại tệp trên đĩa
+        if not task_service.get_by_id(task_id):
+            return jsonify({'success': False, 'error': f'Task with ID {task_id} not found'}), 404
 
-        # Use UploadService to handle file uploads
-        file_paths = upload_service.upload_files(request, 'attachments')
-        attachments = task_service.add_attachments(task_id, file_paths)
+        # Use UploadService to handle file uploads (deduplicated by content hash)
+        files = upload_service.upload_blobs(request, 'attachments')
+        attachments = task_service.add_attachments(task_id, files)
 
         return jsonify({
             'success': True,
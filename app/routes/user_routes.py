@@ -1,19 +1,43 @@
 from flask import Blueprint, jsonify, request
-from ..services import UserService, UploadService
+from ..container import service
+from ..services.password_hasher import PasswordHasherBusy
+from ..services.response_cache import response_cache
 from datetime import datetime
 from .auth_routes import admin_required, token_required
+from ..repositories.upload_stream import accepts_uploads
+from ..repositories.pagination import parse_page_args
+from ..repositories.projection import parse_fields
 
 user_bp = Blueprint('user', __name__ , url_prefix='/user')
-user_service = UserService()
+user_service = service('user_service')
+
+# Các tham số bật chế độ phân trang keyset cho GET /user/
+USER_LIST_PARAMS = ('cursor', 'limit', 'role')
 
 @user_bp.route('/',methods=['GET'])
 def get_all_users():
     try:
-        users_data = user_service.get_all()  # Changed from get_all_users()
-        return jsonify({
-            'success': True,
-            'data': users_data
-        }), 200
+        # ?fields=id,username,... chỉ trả về (và chỉ đọc) các trường được yêu cầu
+        fields = parse_fields(request.args)
+        # Body JSON được mã hóa sẵn và dùng lại cho tới khi bảng users có ghi mới
+        if not any(param in request.args for param in USER_LIST_PARAMS):
+            return response_cache.respond('users', request.query_string.decode(), lambda: {
+                'success': True,
+                'data': user_service.get_all(fields)  # Changed from get_all_users()
+            })
+
+        cursor, limit = parse_page_args(request.args)
+
+        def build_page():
+            page = user_service.get_page({'role': request.args.get('role')}, cursor, limit, fields)
+            return {
+                'success': True,
+                'data': page['items'],
+                'next_cursor': page['next_cursor']
+            }
+        return response_cache.respond('users', request.query_string.decode(), build_page)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -72,6 +96,8 @@ def create_user(current_user):
                 'data': user_data
             }), 201
             
+        except PasswordHasherBusy:
+            return jsonify({'success': False, 'error': 'Server is busy, please try again'}), 503
         except Exception as service_error:
             return jsonify({
                 'success': False,
@@ -86,6 +112,7 @@ def create_user(current_user):
 
 @user_bp.route('/<int:user_id>', methods=['PUT'])
 @token_required # các route có bảo vệ phải thêm tham số current_user
+@accepts_uploads
 def update_user(current_user, user_id):  
     try:
         # Xử lý dữ liệu dựa trên loại request
@@ -126,6 +153,8 @@ def update_user(current_user, user_id):
             'data': updated_user
         }), 200
 
+    except PasswordHasherBusy:
+        return jsonify({'success': False, 'error': 'Server is busy, please try again'}), 503
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1,8 +1,21 @@
-from .interfaces.user_service import IUserService
-from .user_service import UserService
-from .task_service import TaskService
-from .task_detail_services import TaskDetailService 
-from .upload_service import UploadService
+import importlib
+
+# Nạp lười: `from app.services import TaskService` chỉ import module chứa lớp đó,
+# không kéo theo mọi service (và repository, Pillow, jwt...) như trước
+_EXPORTS = {
+    'IUserService': '.interfaces.user_service',
+    'UserService': '.user_service',
+    'TaskService': '.task_service',
+    'TaskDetailService': '.task_detail_services',
+    'UploadService': '.upload_service',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+
 
 # Export classes for easy import
-__all__ = ['IUserService', 'UserService','TaskService','TaskDetailService']
\ No newline at end of file
+__all__ = ['IUserService', 'UserService', 'TaskService', 'TaskDetailService', 'UploadService']
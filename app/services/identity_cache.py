@@ -0,0 +1,54 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from config import Config
+
+
+class IdentityCache:
+    """Process-local LRU cache of verified token -> formatted user dict"""
+
+    def __init__(self, max_size: int = 1024, ttl: int = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (expires_at, user_id, user)
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return the cached user for a token, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if not entry:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return dict(entry[2])
+
+    def set(self, token: str, user: Dict[str, Any], exp: Optional[float] = None) -> None:
+        """Cache a user for a token, never beyond the token's own exp"""
+        if self.max_size <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        with self._lock:
+            self._entries[token] = (expires_at, user.get('id'), dict(user))
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached token of a user (called after the user is updated or deleted)"""
+        with self._lock:
+            for token in [token for token, entry in self._entries.items() if entry[1] == user_id]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Dùng chung cho cả process để token_required và UserService cùng nhìn thấy một cache
+identity_cache = IdentityCache(Config.IDENTITY_CACHE_SIZE, Config.IDENTITY_CACHE_TTL)
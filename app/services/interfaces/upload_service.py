@@ -1,7 +1,11 @@
-from typing import List
+from typing import List, Optional, Tuple
 from flask import Request
 
 class IUploadService:
     def upload_files(self, request: Request, field_name: str) -> List[str]:
         """Upload files from a request and return a list of file paths."""
+        pass
+
+    def upload_blobs(self, request: Request, field_name: str) -> List[Tuple[str, Optional[str]]]:
+        """Upload files into the deduplicating content-addressed store and return (URL, original filename) pairs."""
         pass
\ No newline at end of file
@@ -0,0 +1,71 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional
+import bcrypt
+from config import Config
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash/verify jobs are already waiting or a job did not finish in time"""
+    pass
+
+
+class PasswordHasher:
+    """Run bcrypt on a bounded thread pool (bcrypt releases the GIL while hashing)"""
+
+    def __init__(self, rounds: int = 12, max_workers: int = 4, max_pending: int = 64, timeout: float = 30):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Tạo pool khi dùng lần đầu để không sinh thread lúc import (trước khi gunicorn fork worker)
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bcrypt')
+        return self._executor
+
+    def _run(self, fn, *args):
+        # Hàng đợi có giới hạn: hết chỗ thì báo bận ngay thay vì dồn thêm request
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Password hashing queue is full")
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Trả chỗ khi job bcrypt thực sự chạy xong, kể cả khi request đã thôi chờ vì quá thời gian
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise PasswordHasherBusy("Password hashing timed out") from None
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the configured cost"""
+        salt = bcrypt.gensalt(self.rounds)
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        """Check a password against a stored bcrypt hash"""
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True if the stored hash was made with a cost other than the configured one"""
+        # Định dạng bcrypt: $2b$<cost>$<salt+hash>
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+
+password_hasher = PasswordHasher(
+    Config.BCRYPT_ROUNDS,
+    Config.PASSWORD_HASH_WORKERS,
+    Config.PASSWORD_HASH_QUEUE_SIZE,
+    Config.PASSWORD_HASH_TIMEOUT
+)
@@ -0,0 +1,128 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from flask import Response, current_app, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from config import Config
+
+# Collection được cache -> các bảng mà nội dung của nó phụ thuộc
+# (danh sách task có attachments và username người tạo)
+COLLECTION_TABLES = {
+    'tasks': {'tasks', 'task_attachments', 'users'},
+    'users': {'users'},
+}
+
+
+class ResponseCache:
+    """
+    Pre-encoded JSON bodies of list endpoints. Each collection has a version that is
+    bumped whenever a transaction writing one of its tables commits; a cached body is
+    only served while the version it was built under is still current.
+    """
+
+    def __init__(self, ttl: float = 10, max_entries: int = 64):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._versions: Dict[str, int] = {}
+        self._entries: Dict[str, "OrderedDict[str, tuple]"] = {}  # collection -> key -> (version, expires_at, body, etag)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, collection: str) -> int:
+        return self._versions.get(collection, 0)
+
+    def bump(self, *collections: str) -> None:
+        """Invalidate every cached body of the given collections"""
+        with self._lock:
+            for collection in collections:
+                self._versions[collection] = self._versions.get(collection, 0) + 1
+                self._entries.pop(collection, None)
+
+    def get(self, collection: str, key: str) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entries = self._entries.get(collection)
+            entry = entries.get(key) if entries else None
+            if not entry or entry[0] != self._versions.get(collection, 0) or entry[1] <= time.time():
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+            return entry[2], entry[3]
+
+    def set(self, collection: str, key: str, version: int, body: bytes) -> Tuple[bytes, str]:
+        """Store a body built under `version`; dropped if a write bumped the version meanwhile"""
+        # ETag theo nội dung để các worker khác nhau trả cùng ETag cho cùng dữ liệu
+        etag = hashlib.sha1(body).hexdigest()
+        if self.ttl <= 0:
+            return body, etag
+        with self._lock:
+            if version == self._versions.get(collection, 0):
+                entries = self._entries.setdefault(collection, OrderedDict())
+                entries[key] = (version, time.time() + self.ttl, body, etag)
+                entries.move_to_end(key)
+                while len(entries) > self.max_entries:
+                    entries.popitem(last=False)
+        return body, etag
+
+    def respond(self, collection: str, key: str, build: Callable[[], Any]) -> Response:
+        """JSON response for `key`, built by build() only when no current body is cached; answers 304 on a matching ETag"""
+        entry = self.get(collection, key)
+        if entry is None:
+            # Đọc version trước khi dựng dữ liệu: có ghi xen giữa thì bản này không được lưu
+            version = self.version(collection)
+            entry = self.set(collection, key, version, current_app.json.dumps_bytes(build()))
+        body, etag = entry
+
+        response = current_app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else None,
+            'versions': dict(self._versions)
+        }
+
+
+# Version nằm trong từng process: ghi ở worker khác chỉ được thấy sau tối đa RESPONSE_CACHE_TTL giây
+response_cache = ResponseCache(Config.RESPONSE_CACHE_TTL)
+
+
+# Ghi nhận các bảng bị ghi trong transaction, tăng version khi commit
+def _written(session) -> set:
+    return session.info.setdefault('response_cache_tables', set())
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_flushed(session, flush_context):
+    for entity in list(session.new) + list(session.dirty) + list(session.deleted):
+        _written(session).add(getattr(entity, '__tablename__', None))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_statement(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        _written(orm_execute_state.session).add(mapper.local_table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_written(session):
+    tables = session.info.pop('response_cache_tables', None)
+    if tables:
+        response_cache.bump(*[collection for collection, depends in COLLECTION_TABLES.items() if depends & tables])
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_written(session):
+    session.info.pop('response_cache_tables', None)
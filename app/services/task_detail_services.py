@@ -7,11 +7,24 @@ from datetime import datetime
 from ..repositories.user_repository import UserRepository
 from ..repositories.task_detail_assignee_repository import TaskDetailAssigneeRepository
 from ..repositories.task_detail_repository import TaskDetailRepository  
+from ..repositories.projection import columns_for, pick, resolve_fields
+
+# Trường trả về của task detail -> các cột cần đọc
+TASK_DETAIL_FIELD_COLUMNS = {
+    'id': ('id',),
+    'task_id': ('task_id',),
+    'title': ('title',),
+    'description': ('description',),
+    'status': ('status',),
+    'created_at': ('created_at',),
+    'updated_at': ('updated_at',),
+}
 
 class TaskDetailService(ITaskDetailService):
     def __init__(self, task_detail_repository: ITaskDetailRepository = None):
         self.task_detail_repository = task_detail_repository or TaskDetailRepository()
         self.task_detail_assignee_repository = TaskDetailAssigneeRepository()  # New repository
+        self.user_repository = UserRepository()
     
     def _format_task_detail_data(self, detail: Task_Detail) -> Dict[str, Any]:
         return {
@@ -20,19 +33,47 @@ class TaskDetailService(ITaskDetailService):
             'title': detail.title,
             'description': detail.description,
             'status': detail.status,
-            'created_at': detail.created_at.isoformat() if detail.created_at else None,
-            'updated_at': detail.updated_at.isoformat() if detail.updated_at else None
+            'created_at': detail.created_at,
+            'updated_at': detail.updated_at
         }
 
-    def get_all(self) -> List[Dict[str, Any]]:
-        details = self.task_detail_repository.get_all()
-        return [self._format_task_detail_data(detail) for detail in details]
+    def _resolve_assignee_ids(self, usernames: List[str]) -> List[int]:
+        """Map usernames to user IDs with a single IN query, keeping request order"""
+        unique_usernames = list(dict.fromkeys(usernames))
+        user_ids = {}
+        for user in self.user_repository.get_by_usernames(unique_usernames):
+            user_ids.setdefault(user.username, user.id)
+        for username in unique_usernames:
+            if username not in user_ids:
+                raise LookupError(f"User với username '{username}' không tồn tại")
+        return [user_ids[username] for username in unique_usernames]
+
+    def get_all(self, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        # Chỉ SELECT các cột của những trường được yêu cầu, không dựng đối tượng ORM
+        fields = resolve_fields(fields, TASK_DETAIL_FIELD_COLUMNS)
+        details = self.task_detail_repository.get_all_rows(columns_for(fields, TASK_DETAIL_FIELD_COLUMNS))
+        return [pick(self._format_task_detail_data(detail), fields) for detail in details]
+
+    def get_page(self, filters: Dict[str, Any], cursor: Optional[str], limit: int, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        fields = resolve_fields(fields, TASK_DETAIL_FIELD_COLUMNS)
+        valid_statuses = ['Đã giao', 'Đang thực hiện', 'Hoàn thành']
+        if filters.get('status') and filters['status'] not in valid_statuses:
+            raise ValueError(f"Invalid status. Must be one of: {valid_statuses}")
+
+        details, next_cursor = self.task_detail_repository.get_page(filters, cursor, limit)
+        return {
+            'items': [pick(self._format_task_detail_data(detail), fields) for detail in details],
+            'next_cursor': next_cursor
+        }
 
     def get_by_task_id(self, task_id: int) -> List[Dict[str, Any]]:
         details = self.task_detail_repository.get_by_task_id(task_id)
         return [self._format_task_detail_data(detail) for detail in details]
 
 
+    def get_by_user_id(self, user_id: int) -> List[Dict[str, Any]]:
+        details = self.task_detail_assignee_repository.get_task_details_by_user_id(user_id)
+        return [self._format_task_detail_data(detail) for detail in details]
 
     def get_by_id(self, detail_id: int) -> Optional[Dict[str, Any]]:
         detail = self.task_detail_repository.get_by_id(detail_id)
@@ -54,6 +95,9 @@ class TaskDetailService(ITaskDetailService):
             if not task:
                 raise LookupError(f"Task với ID {task_id} không tồn tại")
 
+            # Kiểm tra username trước khi ghi để không tạo task detail dở dang
+            assignee_ids = self._resolve_assignee_ids(assignees)
+
             new_detail = Task_Detail(
                 task_id=task_id,
                 title=title,
@@ -67,17 +111,7 @@ class TaskDetailService(ITaskDetailService):
             created_detail = self.task_detail_repository.create(new_detail)
 
             # Save Task_Detail_Assignees
-            user_repo = UserRepository()
-            for username in assignees:
-                user = user_repo.get_by_username(username)
-                if not user:
-                    raise LookupError(f"User với username '{username}' không tồn tại")
-                new_assignee = Task_Detail_Assignees(
-                    task_detail_id=created_detail.id,
-                    user_id=user.id,
-                    assigned_at=datetime.utcnow()
-                )
-                self.task_detail_assignee_repository.create(new_assignee)
+            self.task_detail_assignee_repository.create_many(created_detail.id, assignee_ids)
 
             return self._format_task_detail_data(created_detail)
         
@@ -100,30 +134,16 @@ class TaskDetailService(ITaskDetailService):
 
             detail.updated_at = datetime.utcnow()
 
-            # Xử lý cập nhật assignees nếu có
+            # Xử lý cập nhật assignees nếu có: chỉ thêm/xóa phần chênh lệch, commit cùng task detail
             if 'assignees' in data:
-                assignees = data['assignees']  # List of usernames
-                # Xóa hết assignees cũ
-                old_assignees = self.task_detail_assignee_repository.get_by_task_detail_id(detail_id)
-                for assignee in old_assignees:
-                    self.task_detail_assignee_repository.delete(assignee.id)
-                # Thêm lại assignees mới
-                user_repo = UserRepository()
-                for username in assignees:
-                    user = user_repo.get_by_username(username)
-                    if not user:
-                        raise LookupError(f"User với username '{username}' không tồn tại")
-                    new_assignee = Task_Detail_Assignees(
-                        task_detail_id=detail_id,
-                        user_id=user.id,
-                        assigned_at=datetime.utcnow()
-                    )
-                    self.task_detail_assignee_repository.create(new_assignee)
+                assignee_ids = self._resolve_assignee_ids(data['assignees'])  # List of usernames
+                self.task_detail_assignee_repository.set_assignees(detail_id, assignee_ids)
 
             updated = self.task_detail_repository.update(detail)
             return self._format_task_detail_data(updated)
 
         except Exception as e:
+            db.session.rollback()
             raise Exception(f"Lỗi khi cập nhật task detail: {str(e)}")
 
 
@@ -148,17 +168,7 @@ class TaskDetailService(ITaskDetailService):
 
     def delete(self, detail_id: int) -> bool:
         try:
-            # Get the task detail by ID
-            detail = self.task_detail_repository.get_by_id(detail_id)
-            if not detail:
-                return False
-
-            # Delete related task_detail_assignees
-            assignees = self.task_detail_assignee_repository.get_by_task_detail_id(detail_id)
-            for assignee in assignees:
-                self.task_detail_assignee_repository.delete(assignee.id)
-
-            # Delete the task detail
+            # Repository xóa task detail cùng các task_detail_assignees liên quan trong một lần commit
             return self.task_detail_repository.delete(detail_id)
         except Exception as e:
             raise Exception(f"Lỗi khi xóa task detail: {str(e)}")
@@ -2,45 +2,83 @@ from .interfaces.task_service import ITaskService
 from ..repositories.interfaces.task_repository import ITaskRepository
 from ..repositories.task_repository import TaskRepository
 from ..models import Task, TaskAttachment  # Nhập thêm TaskAttachment
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from ..services.user_service import UserService  # Import UserService
+from ..repositories.thumbnails import thumbnail_generator, thumbnail_url
+from ..repositories.projection import columns_for, pick, resolve_fields
+
+# Trường trả về của task -> các cột cần đọc để dựng trường đó
+TASK_FIELD_COLUMNS = {
+    'id': ('id',),
+    'code': ('code',),
+    'title': ('title',),
+    'description': ('description',),
+    'deadline': ('deadline',),
+    'status': ('status',),
+    'created_by': ('created_by',),
+    'created_by_username': ('created_by',),
+    'created_at': ('created_at',),
+    'attachments': (),
+}
 
 class TaskService(ITaskService):
     def __init__(self, task_repository: ITaskRepository = None, user_service: UserService = None):
         self.task_repository = task_repository or TaskRepository()
         self.user_service = user_service or UserService()  # Khởi tạo UserService
     
-    def _format_task_data(self, task: Task) -> Dict[str, Any]:
+    def _format_task_data(self, task: Task, usernames: Dict[int, str] = None) -> Dict[str, Any]:
         """Format task data for API response"""
-        # Lấy thông tin người dùng từ UserService
-        user = self.user_service.get_by_id(task.created_by)
-        username = user['username'] if user else None
+        # Lấy thông tin người dùng từ UserService (hoặc từ bảng username đã nạp sẵn)
+        if usernames is not None:
+            username = usernames.get(task.created_by)
+        else:
+            user = self.user_service.get_by_id(task.created_by)
+            username = user['username'] if user else None
 
         return {
             'id': task.id,
             'code': task.code,
             'title': task.title,
             'description': task.description,
-            'deadline': task.deadline.isoformat() if task.deadline else None,
+            'deadline': task.deadline,
             'status': task.status,
             'created_by': task.created_by,
             'created_by_username': username,  # Thêm username vào dữ liệu trả về
-            'created_at': task.created_at.isoformat() if task.created_at else None,
-            'attachments': [
-                {
-                    'id': attachment.id,
-                    'file_path': attachment.file_path,
-                    'uploaded_at': attachment.uploaded_at.isoformat() if attachment.uploaded_at else None
-                }
-                for attachment in task.attachments
-            ]
+            'created_at': task.created_at,
+            'attachments': [self._format_attachment_data(attachment) for attachment in task.attachments]
         }
 
-    def get_all(self) -> List[Dict[str, Any]]:
-        """Get all tasks with user information"""
-        tasks = self.task_repository.get_all()
-        return [self._format_task_data(task) for task in tasks]
+    def get_all(self, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get all tasks with user information, optionally only the requested fields"""
+        fields = resolve_fields(fields, TASK_FIELD_COLUMNS)
+        # Chỉ SELECT các cột cần cho các trường được yêu cầu, không dựng đối tượng ORM
+        tasks = self.task_repository.get_all_rows(
+            columns_for(fields, TASK_FIELD_COLUMNS),
+            with_attachments='attachments' in fields
+        )
+        # Lấy username của tất cả người tạo bằng một truy vấn IN thay vì truy vấn từng task
+        usernames = {}
+        if 'created_by_username' in fields:
+            usernames = self.user_service.get_usernames_by_ids([task.created_by for task in tasks])
+        return [pick(self._format_task_data(task, usernames), fields) for task in tasks]
+    
+    def get_page(self, filters: Dict[str, Any], cursor: Optional[str], limit: int, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get one keyset page of tasks filtered by status, creator and deadline range"""
+        fields = resolve_fields(fields, TASK_FIELD_COLUMNS)
+        valid_statuses = ['Đã giao', 'Đang thực hiện', 'Đã hoàn thành']
+        if filters.get('status') and filters['status'] not in valid_statuses:
+            raise ValueError(f"Invalid status. Must be one of: {valid_statuses}")
+        for field in ('deadline_from', 'deadline_to'):
+            if filters.get(field):
+                filters[field] = datetime.fromisoformat(filters[field])
+
+        tasks, next_cursor = self.task_repository.get_page(filters, cursor, limit)
+        usernames = self.user_service.get_usernames_by_ids([task.created_by for task in tasks])
+        return {
+            'items': [pick(self._format_task_data(task, usernames), fields) for task in tasks],
+            'next_cursor': next_cursor
+        }
     
     def get_by_id(self, task_id: int) -> Optional[Dict[str, Any]]:  # Changed from get_task_by_id
         """Get a task by ID with formatted data"""
@@ -56,48 +94,115 @@ class TaskService(ITaskService):
             return None
         return self._format_attachment_data(attachment)
     
-    def create(self, data: Dict[str, Any], file_paths: List[str] = None) -> Dict[str, Any]:
-        """Create a new task from request data and handle attachments"""
+    def _build_task(self, data: Dict[str, Any]) -> Task:
+        """Validate request data and build an unsaved Task"""
+        # Validate required fields
+        required_fields = ['code', 'title', 'deadline', 'created_by']
+        for field in required_fields:
+            if field not in data or not data[field]:
+                raise ValueError(f"Missing required field: {field}")
+
+        # Sai kiểu phải thành lỗi của dòng đó (ValueError), không phải TypeError -> 500
+        for field in ('code', 'title', 'deadline'):
+            if not isinstance(data[field], str):
+                raise ValueError(f"{field} must be a string")
+        # Form multipart gửi mọi giá trị dạng chuỗi ("1"): chấp nhận số nguyên hoặc chuỗi số
+        created_by = data['created_by']
         try:
-            # Validate required fields
-            required_fields = ['code', 'title', 'deadline', 'created_by']
-            for field in required_fields:
-                if field not in data or not data[field]:
-                    raise ValueError(f"Missing required field: {field}")
-
-            # Validate deadline
-            deadline = datetime.fromisoformat(data['deadline'])
-            
-            # Validate status with Vietnamese values
-            valid_statuses = ['Đã giao', 'Đang thực hiện', 'Đã hoàn thành']
-            status = data.get('status', 'Đã giao')
-            if status not in valid_statuses:
-                raise ValueError(f"Invalid status. Must be one of: {valid_statuses}")
+            if isinstance(created_by, bool) or not isinstance(created_by, (int, str)):
+                raise TypeError
+            created_by = int(created_by)
+        except (TypeError, ValueError):
+            raise ValueError("created_by must be an integer user id") from None
 
-            # Create new task
-            new_task = Task(
-                code=data['code'],
-                title=data['title'],
-                description=data.get('description'),
-                deadline=deadline,
-                status=status,
-                created_by=data['created_by']
-            )
-            
+        # Validate deadline
+        deadline = datetime.fromisoformat(data['deadline'])
+        
+        # Validate status with Vietnamese values
+        valid_statuses = ['Đã giao', 'Đang thực hiện', 'Đã hoàn thành']
+        status = data.get('status', 'Đã giao')
+        if status not in valid_statuses:
+            raise ValueError(f"Invalid status. Must be one of: {valid_statuses}")
 
-            # Save task to database
-            created_task = self.task_repository.create(new_task)
+        return Task(
+            code=data['code'],
+            title=data['title'],
+            description=data.get('description'),
+            deadline=deadline,
+            status=status,
+            created_by=created_by
+        )
 
-            # Lưu các tệp đính kèm nếu có
-            if file_paths:
-                for file_path in file_paths:
-                    self.task_repository.create_attachment(created_task.id, file_path)
+    def create(self, data: Dict[str, Any], files: List[Tuple[str, Optional[str]]] = None) -> Dict[str, Any]:
+        """Create a new task from request data and handle attachments"""
+        try:
+            # Create new task
+            new_task = self._build_task(data)
+
+            # Lưu task cùng các tệp đính kèm (nếu có) trong một lần commit
+            created_task = self.task_repository.create(new_task, files)
 
             # Format and return the created task
             return self._format_task_data(created_task)
             
         except Exception as e:
             raise Exception(f"Error creating task: {str(e)}")
+
+    def create_many(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Validate every row, then create all tasks and attachments in one transaction.
+
+        Returns {'created': [...], 'errors': [...]}; when any row is invalid nothing is created.
+        """
+        errors = []
+        tasks = []
+        attachment_paths = []
+        seen_codes = set()
+        for index, data in enumerate(rows):
+            try:
+                if not isinstance(data, dict):
+                    raise ValueError("Row must be an object")
+                task = self._build_task(data)
+                attachments = data.get('attachments') or []
+                if not isinstance(attachments, list) or not all(isinstance(path, str) for path in attachments):
+                    raise ValueError("attachments must be a list of file URLs")
+                if task.code in seen_codes:
+                    raise ValueError(f"Duplicate code in request: {task.code}")
+            except ValueError as e:
+                errors.append({'index': index, 'error': str(e)})
+                continue
+            seen_codes.add(task.code)
+            tasks.append(task)
+            attachment_paths.append(attachments)
+
+        # Kiểm tra trùng mã với DB bằng một truy vấn IN thay vì chờ IntegrityError từng dòng
+        existing_codes = self.task_repository.get_existing_codes([task.code for task in tasks])
+        # Tệp đính kèm phải là URL của blob đã upload (một truy vấn IN cho cả lô)
+        unknown_urls = self.task_repository.get_unknown_attachment_urls(
+            [path for paths in attachment_paths for path in paths]
+        )
+        for index, data in enumerate(rows):
+            if not isinstance(data, dict) or not isinstance(data.get('code'), str):
+                continue
+            if data['code'] in existing_codes:
+                errors.append({'index': index, 'error': f"Task code already exists: {data['code']}"})
+            attachments = data.get('attachments')
+            if isinstance(attachments, list):
+                unknown = [path for path in attachments if isinstance(path, str) and path in unknown_urls]
+                if unknown:
+                    errors.append({'index': index, 'error': f"Unknown attachments (upload them first): {unknown}"})
+
+        if errors:
+            return {'created': [], 'errors': sorted(errors, key=lambda error: error['index'])}
+
+        try:
+            created_tasks = self.task_repository.create_many(tasks, attachment_paths)
+        except Exception as e:
+            raise Exception(f"Error creating tasks: {str(e)}")
+        usernames = self.user_service.get_usernames_by_ids([task.created_by for task in created_tasks])
+        return {
+            'created': [self._format_task_data(task, usernames) for task in created_tasks],
+            'errors': []
+        }
     
     def update(self, task_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update an existing task from request data"""
@@ -156,12 +261,31 @@ class TaskService(ITaskService):
         """Count all task details with status not equal to 'Đã hoàn thành'"""
         return self.task_repository.count_incomplete_task_details(task_id)
     
+    def get_progress(self, task_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, Any]]:
+        """Task detail counts by status for many (or all) tasks, from a single GROUP BY query"""
+        progress = {}
+        # Task chưa có task detail nào vẫn có mặt với số đếm 0 (không có dòng nào trong GROUP BY)
+        seeded_ids = task_ids if task_ids is not None else self.task_repository.get_ids()
+        for task_id in seeded_ids:
+            progress[task_id] = {'total': 0, 'incomplete': 0, 'by_status': {}}
+        for task_id, status, count in self.task_repository.count_task_details_by_status(task_ids):
+            entry = progress.setdefault(task_id, {'total': 0, 'incomplete': 0, 'by_status': {}})
+            entry['by_status'][status] = count
+            entry['total'] += count
+            # Giống count_incomplete_task_details: mọi trạng thái khác 'Hoàn thành'
+            if status != 'Hoàn thành':
+                entry['incomplete'] += count
+        return progress
+    
     def _format_attachment_data(self, attachment: TaskAttachment) -> Dict[str, Any]:
         """Format attachment data for API response"""
         return {
             'id': attachment.id,
             'file_path': attachment.file_path,
-            'uploaded_at': attachment.uploaded_at.isoformat() if attachment.uploaded_at else None
+            'original_filename': attachment.original_filename,
+            # Ảnh xem trước cho danh sách (None nếu không phải ảnh)
+            'thumbnail': thumbnail_url(attachment.file_path, thumbnail_generator.largest),
+            'uploaded_at': attachment.uploaded_at
         }
     def delete_attachment(self, attachment_id: int) -> bool:
         """Delete an attachment by ID of the task"""
@@ -170,10 +294,10 @@ class TaskService(ITaskService):
         except Exception as e:
             raise Exception(f"Lỗi xóa tệp đính kèm: {str(e)}")
     
-    def add_attachments(self, task_id: int, file_paths: List[str]) -> List[Dict[str, Any]]:
-        """Add multiple attachments to a task by task ID"""
+    def add_attachments(self, task_id: int, files: List[Tuple[str, Optional[str]]]) -> List[Dict[str, Any]]:
+        """Add attachments to a task by task ID from uploaded (URL, original filename) pairs"""
         try:
-            attachments = self.task_repository.add_attachments(task_id, file_paths)
+            attachments = self.task_repository.add_attachments(task_id, files)
             return [self._format_attachment_data(attachment) for attachment in attachments]
         except Exception as e:
             raise Exception(f"Error adding attachments: {str(e)}")
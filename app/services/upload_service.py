@@ -8,7 +8,13 @@ from ..repositories.interfaces.upload_repository import IUploadRepository
 
 # Import class UploadRepository từ thư mục repositories
 # Đây là triển khai cụ thể của IUploadRepository, chịu trách nhiệm lưu file
-from ..repositories.upload_repository import UploadRepository
+from ..repositories.upload_repository import UploadRepository, UploadedFile
+
+# Bộ tạo ảnh thu nhỏ (chạy qua hàng đợi job) và hàm đổi URL sang đường dẫn tương đối trong thư mục upload
+from ..repositories.thumbnails import thumbnail_generator
+from ..repositories.blob_repository import storage_path_from_url
+
+import os
 
 # Import đối tượng Request từ Flask để xử lý yêu cầu HTTP và current_app để truy cập cấu hình của ứng dụng Flask
 from flask import Request, current_app
@@ -56,6 +62,37 @@ class UploadService(IUploadService):
             raise ValueError("UPLOAD_FOLDER chưa được cấu hình trong ứng dụng Flask")
 
         # Giao việc lưu file cho upload_repository
-        # Phương thức save_files() nhận danh sách file và đường dẫn thư mục upload
+        # Phương thức save_files() nhận danh sách file, đường dẫn thư mục upload và giới hạn kích thước mỗi file
         # Nó lưu file vào hệ thống và trả về danh sách các đường dẫn tuyệt đối của file
-        return self.upload_repository.save_files(files, upload_folder)
\ No newline at end of file
+        max_size = current_app.config.get('UPLOAD_MAX_FILE_SIZE')
+        file_urls = self.upload_repository.save_files(files, upload_folder, max_size)
+        self._schedule_thumbnails(upload_folder, file_urls)
+        return file_urls
+
+    # Giống upload_files nhưng lưu theo nội dung (content-addressed): cùng một tệp
+    # upload nhiều lần chỉ được lưu một bản trên đĩa, dùng cho tệp đính kèm của task
+    def upload_blobs(self, request: Request, field_name: str) -> List[UploadedFile]:
+        """Upload file vào kho lưu theo mã băm nội dung, trả về danh sách (URL, tên tệp gốc)."""
+        if field_name not in request.files:
+            return []
+
+        files = request.files.getlist(field_name)
+        if not files or all(not file.filename for file in files):
+            return []
+
+        upload_folder = current_app.config.get('UPLOAD_FOLDER')
+        if not upload_folder:
+            raise ValueError("UPLOAD_FOLDER chưa được cấu hình trong ứng dụng Flask")
+
+        max_size = current_app.config.get('UPLOAD_MAX_FILE_SIZE')
+        uploaded = self.upload_repository.save_blobs(files, upload_folder, max_size)
+        self._schedule_thumbnails(upload_folder, [file.url for file in uploaded])
+        return uploaded
+
+    # Bước xử lý sau upload: job tạo ảnh thu nhỏ được lưu cùng transaction của request
+    # và chạy trên worker nền sau khi commit, request trả về ngay
+    # Ảnh thu nhỏ được lưu cạnh tệp gốc và phục vụ qua /api/v1/uploads/<file>?size=<px>
+    def _schedule_thumbnails(self, upload_folder: str, file_urls: List[str]) -> None:
+        thumbnail_generator.schedule(
+            os.path.join(upload_folder, storage_path_from_url(file_url)) for file_url in file_urls
+        )
\ No newline at end of file
@@ -1,15 +1,35 @@
 from .interfaces.user_service import IUserService
 from ..repositories.interfaces.user_repository import IUserRepository
 from ..repositories.user_repository import UserRepository
-from ..models import User
+from ..models import User, UserRole
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
-import bcrypt
 import jwt
 import os
 from .upload_service import UploadService
+from .identity_cache import identity_cache
+from .password_hasher import password_hasher
+from ..repositories.thumbnails import thumbnail_generator, thumbnail_url
+from ..repositories.projection import columns_for, pick, resolve_fields
 from flask import Request
 
+# Trường trả về của user -> các cột cần đọc (password_hash không bao giờ được đọc cho danh sách)
+USER_FIELD_COLUMNS = {
+    'id': ('id',),
+    'username': ('username',),
+    'email': ('email',),
+    'birth_year': ('birth_year',),
+    'phone': ('phone',),
+    'gender': ('gender',),
+    'avatar': ('avatar',),
+    'avatar_thumbnail': ('avatar',),
+    'start_date': ('start_date',),
+    'cv_link': ('cv_link',),
+    'role': ('role',),
+    'is_verified': ('is_verified',),
+    'created_at': ('created_at',),
+}
+
 class UserService(IUserService):
     def __init__(self, user_repository: IUserRepository = None):
         self.user_repository = user_repository or UserRepository()
@@ -25,17 +45,35 @@ class UserService(IUserService):
             'phone': user.phone,
             'gender': user.gender,
             'avatar': user.avatar,
-            'start_date': user.start_date.isoformat() if user.start_date else None,
+            # Danh sách chỉ cần ảnh nhỏ; ảnh gốc vẫn ở 'avatar'
+            'avatar_thumbnail': thumbnail_url(user.avatar, thumbnail_generator.smallest),
+            'start_date': user.start_date,
             'cv_link': user.cv_link,
             'role': user.role.value if user.role else None,
             'is_verified': user.is_verified,
-            'created_at': user.created_at.isoformat() if user.created_at else None
+            'created_at': user.created_at
         }
         
-    def get_all(self) -> List[Dict[str, Any]]:
-        """Get all users with formatted data"""
-        users = self.user_repository.get_all()
-        return [self._format_user_data(user) for user in users]
+    def get_all(self, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get all users with formatted data, optionally only the requested fields"""
+        fields = resolve_fields(fields, USER_FIELD_COLUMNS)
+        users = self.user_repository.get_all_rows(columns_for(fields, USER_FIELD_COLUMNS))
+        return [pick(self._format_user_data(user), fields) for user in users]
+    
+    def get_page(self, filters: Dict[str, Any], cursor: Optional[str], limit: int, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get one keyset page of users, optionally filtered by role"""
+        fields = resolve_fields(fields, USER_FIELD_COLUMNS)
+        if filters.get('role'):
+            try:
+                filters['role'] = UserRole(filters['role'].upper())
+            except ValueError:
+                raise ValueError(f"Invalid role. Must be one of: {[role.value for role in UserRole]}")
+
+        users, next_cursor = self.user_repository.get_page(filters, cursor, limit)
+        return {
+            'items': [pick(self._format_user_data(user), fields) for user in users],
+            'next_cursor': next_cursor
+        }
     
     def get_by_id(self, id: int) -> Optional[Dict[str, Any]]:
         """Get a user by ID with formatted data"""
@@ -44,12 +82,15 @@ class UserService(IUserService):
             return None
         return self._format_user_data(user)
     
+    def get_usernames_by_ids(self, ids: List[int]) -> Dict[int, str]:
+        """Resolve many user IDs to usernames with a single query"""
+        users = self.user_repository.get_rows_by_ids(ids, ['id', 'username'])
+        return {user.id: user.username for user in users}
+    
     def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new user from request data"""
         # Hash password
-        password = data['password'].encode('utf-8')  # Changed from user_data to data
-        salt = bcrypt.gensalt()
-        password_hash = bcrypt.hashpw(password, salt).decode('utf-8')
+        password_hash = password_hasher.hash(data['password'])  # Changed from user_data to data
         
         # Parse start_date
         start_date = datetime.fromisoformat(data['start_date'])  # Changed from user_data to data
@@ -97,9 +138,7 @@ class UserService(IUserService):
         if 'username' in data:
             user.username = data['username']
         if 'password' in data:
-            password = data['password'].encode('utf-8')
-            salt = bcrypt.gensalt()
-            user.password_hash = bcrypt.hashpw(password, salt).decode('utf-8')
+            user.password_hash = password_hasher.hash(data['password'])
         if 'email' in data:
             user.email = data['email']
         if 'birth_year' in data:
@@ -121,11 +160,15 @@ class UserService(IUserService):
         
         # Save changes
         updated_user = self.user_repository.update(user)
+        # Role/thông tin user có thể đã đổi, bỏ các identity đã cache của user này
+        identity_cache.invalidate_user(user_id)
         return self._format_user_data(updated_user) if updated_user else None
     
     def delete(self, id: int) -> bool:
         """Delete a user by ID"""
-        return self.user_repository.delete(id)
+        deleted = self.user_repository.delete(id)
+        identity_cache.invalidate_user(id)
+        return deleted
 
     def verify_credentials(self, email: str, password: str) -> Tuple[bool, Optional[User]]:
         """Verify user credentials and return user if valid"""
@@ -133,34 +176,39 @@ class UserService(IUserService):
         if not user:
             return False, None
             
-        password_bytes = password.encode('utf-8')
-        hashed_password = user.password_hash.encode('utf-8')
-        if bcrypt.checkpw(password_bytes, hashed_password):
-            return True, user
-        return False, None
+        if not password_hasher.verify(password, user.password_hash):
+            return False, None
+
+        # Hash cũ có cost khác cấu hình hiện tại thì băm lại ngay khi đăng nhập thành công
+        if password_hasher.needs_rehash(user.password_hash):
+            user.password_hash = password_hasher.hash(password)
+            self.user_repository.update(user)
+        return True, user
         
-    def generate_access_token(self, user_id: int) -> str:
-        user = self.user_repository.get_by_id(user_id)
-        payload = {
-            'exp': datetime.utcnow() + timedelta(minutes=15),
-            'iat': datetime.utcnow(),
-            'sub': user_id,
-            'role': user.role.value if user.role else None  # Thêm role vào token
-        }
+    def _mint_token(self, claims: Dict[str, Any], lifetime: timedelta) -> str:
+        """Sign a JWT from the given claims without touching the database"""
+        now = datetime.utcnow()
+        payload = dict(claims, exp=now + lifetime, iat=now)
         return jwt.encode(payload, os.getenv('SECRET_KEY'), algorithm='HS256')
+
+    def generate_access_token(self, user_id: int, role: Optional[str]) -> str:
+        """Generate a short-lived access token carrying the user's role"""
+        return self._mint_token({'sub': user_id, 'role': role}, timedelta(minutes=15))
     
-    def generate_refresh_token(self, user_id: int) -> str:
+    def generate_refresh_token(self, user_id: int, role: Optional[str]) -> str:
         """Generate a long-lived refresh token"""
-        payload = {
-            'exp': datetime.utcnow() + timedelta(days=7),  # Token expires in 7 days
-            'iat': datetime.utcnow(),
-            'sub': user_id
-        }
-        return jwt.encode(
-            payload,
-            os.getenv('SECRET_KEY'),
-            algorithm='HS256'
-        )
+        # Lưu role trong refresh token để /auth/refresh/ không phải truy vấn lại user
+        return self._mint_token({'sub': user_id, 'role': role}, timedelta(days=7))
+    
+    def refresh_access_token(self, payload: Dict[str, Any]) -> str:
+        """Mint a new access token from a verified refresh token payload"""
+        if 'role' in payload:
+            return self.generate_access_token(payload['sub'], payload['role'])
+        # Refresh token cũ (phát hành trước khi có claim role) thì mới cần đọc role từ DB
+        user = self.user_repository.get_by_id(payload['sub'])
+        if not user:
+            raise LookupError("User not found")
+        return self.generate_access_token(user.id, user.role.value if user.role else None)
     
     def verify_token(self, token: str) -> Tuple[bool, Optional[Dict]]:
         """Verify a JWT token and return the payload if valid"""
@@ -180,14 +228,27 @@ class UserService(IUserService):
         except jwt.InvalidTokenError:
             return False, {'error': 'Invalid token'}
             
-    def get_user_from_token(self, token: str) -> Optional[Dict[str, Any]]:
-        """Get user data from a valid token"""
-        is_valid, payload = self.verify_token(token)
-        if not is_valid or 'sub' not in payload:
+    def get_user_from_token(self, token: str, payload: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
+        """Get user data from a valid token, reusing an already verified payload if given"""
+        if payload is None:
+            is_valid, payload = self.verify_token(token)
+            if not is_valid:
+                return None
+        if 'sub' not in payload:
             return None
-            
-        user_id = payload['sub']
-        return self.get_by_id(user_id)
+
+        user = identity_cache.get(token)
+        if user is not None:
+            return user
+
+        # Đọc thẳng DB, bỏ qua entity cache: cache đó chỉ bị xóa ở worker đã ghi, role bị hạ/xóa
+        # ở worker khác sẽ còn hiệu lực tới ENTITY_CACHE_TTL. Sai lệch chỉ còn tối đa IDENTITY_CACHE_TTL
+        user = self.user_repository.get_by_id_uncached(payload['sub'])
+        if not user:
+            return None
+        user = self._format_user_data(user)
+        identity_cache.set(token, user, payload.get('exp'))
+        return user
 
 
     
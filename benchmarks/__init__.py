@@ -0,0 +1,4 @@
+# Các benchmark chạy trên SQLite in-memory với Flask test client.
+# Ví dụ: python -m benchmarks.auth_bench
+# Bộ kịch bản đầy đủ trên dữ liệu sinh sẵn (SQLite hoặc MySQL), kết quả JSON để so sánh giữa các commit:
+#   python -m benchmarks run --output head.json && python -m benchmarks compare base.json head.json
@@ -0,0 +1,196 @@
+"""Benchmark suite CLI.
+
+  python -m benchmarks seed    [--database-url URL] [volumes] [--seed 42] [--reset]
+  python -m benchmarks run     [--database-url URL] [volumes] [--scenarios a,b] [--iterations 200]
+                               [--driver test-client|wsgi] [--output results.json]
+  python -m benchmarks compare base.json head.json
+
+Without --database-url (or BENCH_DATABASE_URL) `run` seeds a fresh SQLite file. A
+database that already holds data is reused as is, so a MySQL stand-in can be seeded
+once and measured from several commits.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from sqlalchemy.engine import make_url
+
+from app import db
+from app.services.password_hasher import password_hasher
+from app.services.response_cache import response_cache
+from config import engine_options
+from .common import BenchConfig, QueryCounter, create_bench_app
+from .drivers import DRIVERS
+from .scenarios import SCENARIOS, BenchContext
+from .seed import DatasetSize, dataset_counts, is_seeded, seed_dataset
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPARED_METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'queries_per_request')
+
+
+def add_database_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--database-url', default=os.getenv('BENCH_DATABASE_URL'),
+                        help='SQLAlchemy URL (default: a new SQLite file)')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=500)
+    parser.add_argument('--details-per-task', type=int, default=4)
+    parser.add_argument('--assignees-per-detail', type=int, default=2)
+    parser.add_argument('--attachments-per-task', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--bcrypt-rounds', type=int, default=4,
+                        help='bcrypt cost of seeded passwords and logins (default 4 so hashing does not dominate)')
+
+
+def dataset_size(args) -> DatasetSize:
+    return DatasetSize(args.users, args.tasks, args.details_per_task, args.assignees_per_detail, args.attachments_per_task)
+
+
+def bench_app(database_url: str):
+    # SQLite dạng file (không dùng in-memory): burst đăng nhập và driver wsgi chạy trên nhiều thread
+    database_url = database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    class SuiteConfig(BenchConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(database_url)
+
+    return create_bench_app(SuiteConfig), database_url
+
+
+def git_revision() -> str:
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return f'{revision}-dirty' if dirty else revision
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def seed_command(args) -> None:
+    password_hasher.rounds = args.bcrypt_rounds
+    app, database_url = bench_app(args.database_url)
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+            db.create_all()
+        if is_seeded():
+            sys.exit(f'{make_url(database_url).render_as_string(hide_password=True)} already has data; use --reset to recreate it')
+        counts = seed_dataset(dataset_size(args), args.seed)
+    print(json.dumps({'database': make_url(database_url).render_as_string(hide_password=True), 'rows': counts}, indent=2))
+
+
+def run_command(args) -> None:
+    names = args.scenarios.split(',') if args.scenarios else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        sys.exit(f'Unknown scenarios: {unknown}. Available: {list(SCENARIOS)}')
+
+    password_hasher.rounds = args.bcrypt_rounds
+    if args.no_response_cache:
+        response_cache.ttl = 0
+    app, database_url = bench_app(args.database_url)
+    size = dataset_size(args)
+    with app.app_context():
+        if is_seeded():
+            print('Reusing the existing dataset', file=sys.stderr)
+        else:
+            seed_dataset(size, args.seed)
+        counts = dataset_counts()
+    # Số lượng thực tế trong DB (có thể là dataset đã seed từ trước)
+    size = DatasetSize(counts['users'], counts['tasks'], counts['task_details'] // max(counts['tasks'], 1),
+                       args.assignees_per_detail, args.attachments_per_task)
+
+    counter = QueryCounter(app)
+    driver = DRIVERS[args.driver](app)
+    try:
+        ctx = BenchContext(driver, counter, size, args.seed)
+        results = []
+        for name in names:
+            iterations = args.burst_clients if name == 'login_burst' else args.iterations
+            results.append(SCENARIOS[name](ctx, iterations))
+    finally:
+        driver.close()
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'database': make_url(database_url).render_as_string(hide_password=True),
+            'driver': args.driver,
+            'response_cache': not args.no_response_cache,
+            'bcrypt_rounds': args.bcrypt_rounds,
+            'seed': args.seed,
+            'rows': counts,
+        },
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+def compare_command(args) -> None:
+    """Per-scenario change of each metric from base to head, in percent"""
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.head, encoding='utf-8') as f:
+        head = json.load(f)
+    base_results = {result['scenario']: result for result in base['results']}
+    comparison = []
+    for result in head['results']:
+        before = base_results.get(result['scenario'])
+        if before is None:
+            continue
+        row = {'scenario': result['scenario']}
+        for metric in COMPARED_METRICS:
+            old, new = before.get(metric), result.get(metric)
+            change = round((new - old) / old * 100, 1) if old and new is not None else None
+            row[metric] = {'base': old, 'head': new, 'change_pct': change}
+        comparison.append(row)
+    print(json.dumps({
+        'base': base['meta'].get('revision'),
+        'head': head['meta'].get('revision'),
+        'scenarios': comparison
+    }, indent=2))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = commands.add_parser('seed', help='create tables and insert the synthetic dataset')
+    add_database_arguments(seed_parser)
+    seed_parser.add_argument('--reset', action='store_true', help='drop and recreate every table first')
+    seed_parser.set_defaults(handler=seed_command)
+
+    run_parser = commands.add_parser('run', help='run scenarios and print the results as JSON')
+    add_database_arguments(run_parser)
+    run_parser.add_argument('--scenarios', help=f'comma separated, among: {",".join(SCENARIOS)}')
+    run_parser.add_argument('--iterations', type=int, default=200)
+    run_parser.add_argument('--burst-clients', type=int, default=32, help='concurrent logins of login_burst')
+    run_parser.add_argument('--driver', choices=list(DRIVERS), default='test-client')
+    run_parser.add_argument('--no-response-cache', action='store_true', help='rebuild list responses on every request')
+    run_parser.add_argument('--output', help='also write the JSON report to this file')
+    run_parser.set_defaults(handler=run_command)
+
+    compare_parser = commands.add_parser('compare', help='compare two JSON reports of `run`')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('head')
+    compare_parser.set_defaults(handler=compare_command)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Throughput of POST /auth/login/ and POST /auth/refresh/.
+
+Usage: python -m benchmarks.auth_bench [--iterations N]
+"""
+import argparse
+import json
+from datetime import date
+
+from app import db
+from app.models import User, UserRole
+from app.services.password_hasher import password_hasher
+from .common import QueryCounter, create_bench_app, run_scenario
+
+
+def seed_user(app, password: str) -> None:
+    with app.app_context():
+        db.session.add(User(username='bench', password_hash=password_hasher.hash(password), email='bench@example.com',
+                            start_date=date.today(), role=UserRole.MANAGER))
+        db.session.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    # Cost thấp để bcrypt không lấn át phần được đo (DB + JWT)
+    password_hasher.rounds = 4
+    app = create_bench_app()
+    seed_user(app, 'bench-password')
+    counter = QueryCounter(app)
+    client = app.test_client()
+
+    def login():
+        response = client.post('/api/v1/auth/login/', json={'email': 'bench@example.com', 'password': 'bench-password'})
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return response
+
+    refresh_token = login().get_json()['data']['refresh_token']
+
+    def refresh():
+        response = client.post('/api/v1/auth/refresh/', json={'refresh_token': refresh_token})
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    results = [
+        run_scenario('auth_login', login, args.iterations, counter),
+        run_scenario('auth_refresh', refresh, args.iterations, counter),
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import event
+
+os.environ.setdefault('SECRET_KEY', 'benchmark-secret')
+os.environ.setdefault('API_BASE_URL', 'http://localhost:5000')
+
+from config import TestingConfig, engine_options  # noqa: E402
+from app import create_app, db  # noqa: E402
+
+
+class BenchConfig(TestingConfig):
+    SECRET_KEY = os.environ['SECRET_KEY']
+    SQLALCHEMY_DATABASE_URI = os.getenv('BENCH_DATABASE_URL', 'sqlite://')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    # Mỗi request ghi một dòng INFO: chỉ giữ cảnh báo để I/O log không lẫn vào số đo
+    LOG_LEVEL = 'WARNING'
+    LOG_SINK = 'stderr'
+
+
+def create_bench_app(config_class=BenchConfig):
+    """Create the app against the benchmark database with all tables created"""
+    app = create_app(config_class)
+    with app.app_context():
+        from app import models  # noqa: F401  đăng ký model trước khi create_all
+        db.create_all()
+    return app
+
+
+class QueryCounter:
+    """Count SQL statements executed on the app's engine"""
+
+    def __init__(self, app):
+        self.count = 0
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+@contextmanager
+def timed(samples: List[float]):
+    start = time.perf_counter()
+    yield
+    samples.append(time.perf_counter() - start)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_scenario(name: str, fn: Callable[[], Any], iterations: int, counter: QueryCounter = None) -> Dict[str, Any]:
+    """Call fn `iterations` times and summarize latency, throughput and query count"""
+    samples: List[float] = []
+    queries_before = counter.count if counter else 0
+    for _ in range(iterations):
+        with timed(samples):
+            fn()
+    total = sum(samples)
+    return {
+        'scenario': name,
+        'iterations': iterations,
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'throughput_rps': round(iterations / total, 1) if total else None,
+        'queries_per_request': round((counter.count - queries_before) / iterations, 2) if counter else None
+    }
+
+
+def run_concurrent(name: str, fn: Callable[[int], Any], clients: int, counter: QueryCounter = None) -> Dict[str, Any]:
+    """Start `clients` threads that call fn(i) at the same moment; latency per call, throughput over the burst"""
+    samples: List[float] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients)
+    queries_before = counter.count if counter else 0
+
+    def client(i):
+        barrier.wait()
+        start = time.perf_counter()
+        fn(i)
+        elapsed = time.perf_counter() - start
+        with lock:
+            samples.append(elapsed)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+    return {
+        'scenario': name,
+        'iterations': clients,
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'throughput_rps': round(clients / wall, 1),
+        'queries_per_request': round((counter.count - queries_before) / clients, 2) if counter else None
+    }
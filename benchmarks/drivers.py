@@ -0,0 +1,63 @@
+"""How scenarios send requests: in-process Flask test client, or HTTP to a local WSGI server."""
+import json
+import threading
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Optional, Tuple
+
+from werkzeug.serving import make_server
+
+
+class TestClientDriver:
+    """Flask test client (no sockets); one client per thread, without cookies"""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, json: Any = None, headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client(use_cookies=False)
+        response = client.open(path, method=method, json=json, headers=headers)
+        return response.status_code, response.get_data()
+
+    def close(self) -> None:
+        pass
+
+
+class WSGIServerDriver:
+    """Threaded werkzeug server on 127.0.0.1 plus urllib: includes HTTP parsing and socket I/O"""
+
+    def __init__(self, app):
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def request(self, method: str, path: str, json: Any = None, headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        data = None
+        headers = dict(headers or {})
+        if json is not None:
+            data = _json_dumps(json)
+            headers['Content-Type'] = 'application/json'
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self._thread.join()
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value).encode('utf-8')
+
+
+DRIVERS = {
+    'test-client': TestClientDriver,
+    'wsgi': WSGIServerDriver,
+}
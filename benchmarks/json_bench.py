@@ -0,0 +1,78 @@
+"""Serialization of a 10k-task list: stdlib json with pre-stringified dates vs the orjson provider.
+
+Usage: python -m benchmarks.json_bench [--tasks 10000] [--iterations 20]
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.json_provider import FastJSONProvider, orjson
+from app.models import Task, TaskAttachment
+from app.services.task_service import TaskService
+from .common import run_scenario
+
+
+def build_tasks(count: int):
+    """Transient Task rows (no database) shaped like a real listing"""
+    start = datetime(2025, 1, 1, 8, 30)
+    tasks = []
+    for i in range(count):
+        task = Task(id=i + 1, code=f'BENCH-{i:05d}', title=f'Nhiệm vụ số {i}', description='Mô tả ' * 20,
+                    deadline=start + timedelta(days=i % 90), status='Đang thực hiện', created_by=(i % 50) + 1,
+                    created_at=start + timedelta(minutes=i))
+        task.attachments = [
+            TaskAttachment(id=i * 2 + k, file_path=f'http://localhost:5000/api/v1/uploads/{i:05d}-{k}.pdf',
+                           uploaded_at=start + timedelta(minutes=i, seconds=k))
+            for k in range(2)
+        ]
+        tasks.append(task)
+    return tasks
+
+
+def stringify_dates(value):
+    """What the formatters used to do: isoformat() every datetime before encoding"""
+    if isinstance(value, dict):
+        return {key: stringify_dates(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [stringify_dates(item) for item in value]
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    app = Flask('json_bench')
+    stdlib_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+
+    service = TaskService()
+    usernames = {user_id: f'user{user_id}' for user_id in range(1, 51)}
+    data = [service._format_task_data(task, usernames) for task in build_tasks(args.tasks)]
+
+    def stdlib():
+        stdlib_provider.dumps({'success': True, 'data': stringify_dates(data)}, separators=(',', ':'))
+
+    def fast():
+        fast_provider.dumps_bytes({'success': True, 'data': data})
+
+    # Cùng dữ liệu phải ra cùng JSON (chỉ khác cách mã hóa ký tự ngoài ASCII)
+    assert json.loads(stdlib_provider.dumps({'data': stringify_dates(data)})) == json.loads(fast_provider.dumps_bytes({'data': data}))
+
+    results = [
+        run_scenario('json_stdlib_isoformat', stdlib, args.iterations),
+        run_scenario('json_orjson' if orjson else 'json_fast_provider_stdlib_fallback', fast, args.iterations),
+    ]
+    results[1]['speedup'] = round(results[0]['p50_ms'] / results[1]['p50_ms'], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Login burst: many clients hitting POST /auth/login/ at the same moment.
+
+Usage: python -m benchmarks.login_burst_bench [--clients 32] [--rounds 12] [--workers 4]
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+
+from app import db
+from app.models import User, UserRole
+from app.services.password_hasher import password_hasher
+from .common import BenchConfig, create_bench_app, percentile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=32, help='concurrent logins')
+    parser.add_argument('--rounds', type=int, default=password_hasher.rounds, help='bcrypt cost')
+    parser.add_argument('--workers', type=int, default=password_hasher.max_workers, help='hashing threads')
+    args = parser.parse_args(argv)
+
+    password_hasher.rounds = args.rounds
+    password_hasher.max_workers = args.workers
+
+    # SQLite dạng file để nhiều thread có connection riêng
+    db_file = os.path.join(tempfile.mkdtemp(), 'login_burst.db')
+
+    class BurstConfig(BenchConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_file}'
+
+    app = create_bench_app(BurstConfig)
+    with app.app_context():
+        password_hash = password_hasher.hash('burst-password')
+        db.session.add_all([
+            User(username=f'burst{i}', password_hash=password_hash, email=f'burst{i}@example.com',
+                 start_date=date.today(), role=UserRole.INTERN)
+            for i in range(args.clients)
+        ])
+        db.session.commit()
+
+    samples, statuses = [], []
+    barrier = threading.Barrier(args.clients)
+    lock = threading.Lock()
+
+    def login(i):
+        client = app.test_client()
+        barrier.wait()
+        start = time.perf_counter()
+        response = client.post('/api/v1/auth/login/', json={'email': f'burst{i}@example.com', 'password': 'burst-password'})
+        elapsed = time.perf_counter() - start
+        with lock:
+            samples.append(elapsed)
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=login, args=(i,)) for i in range(args.clients)]
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+
+    print(json.dumps({
+        'scenario': 'login_burst',
+        'clients': args.clients,
+        'bcrypt_rounds': args.rounds,
+        'hash_workers': args.workers,
+        'wall_s': round(wall, 3),
+        'p50_ms': round(percentile(samples, 50) * 1000, 1),
+        'p95_ms': round(percentile(samples, 95) * 1000, 1),
+        'p99_ms': round(percentile(samples, 99) * 1000, 1),
+        'throughput_rps': round(args.clients / wall, 1),
+        'ok': statuses.count(200),
+        'busy_503': statuses.count(503)
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
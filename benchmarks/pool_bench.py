@@ -0,0 +1,131 @@
+"""Connection pool saturation: concurrent GET /task/ with more clients than pool_size + max_overflow.
+
+Each SQL statement is slowed by --query-ms so requests hold their connection long
+enough to queue. Clients beyond the pool's capacity wait up to pool_timeout for a
+connection, then fail with 500 (QueuePool TimeoutError).
+
+Usage: python -m benchmarks.pool_bench [--pool-size 5] [--max-overflow 5] [--pool-timeout 1]
+                                       [--query-ms 20] [--requests 10] [--clients 5,10,20,40]
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import db
+from app.models import Task
+from app.services.response_cache import response_cache
+from config import engine_options
+from .common import BenchConfig, create_bench_app, percentile
+
+
+def run_clients(app, clients: int, requests: int):
+    """`clients` threads each sending `requests` GETs at once; returns latencies, statuses and peak pool usage"""
+    samples, statuses = [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients + 1)
+    done = threading.Event()
+    peak = {'checked_out': 0, 'overflow': 0}
+
+    with app.app_context():
+        pool = db.engine.pool
+
+    def client():
+        test_client = app.test_client()
+        barrier.wait()
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = test_client.get('/api/v1/task/?fields=id,code,title')
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples.append(elapsed)
+                statuses.append(response.status_code)
+
+    # Lấy mẫu số kết nối đang dùng trong lúc tải
+    def monitor():
+        while not done.is_set():
+            peak['checked_out'] = max(peak['checked_out'], pool.checkedout())
+            peak['overflow'] = max(peak['overflow'], pool.overflow())
+            time.sleep(0.002)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    watcher = threading.Thread(target=monitor)
+    watcher.start()
+    barrier.wait()
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+    done.set()
+    watcher.join()
+    return samples, statuses, wall, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pool-size', type=int, default=5)
+    parser.add_argument('--max-overflow', type=int, default=5)
+    parser.add_argument('--pool-timeout', type=float, default=1, help='seconds to wait for a connection')
+    parser.add_argument('--query-ms', type=float, default=20, help='simulated latency of every SQL statement')
+    parser.add_argument('--requests', type=int, default=10, help='requests per client')
+    parser.add_argument('--clients', default=None, help='comma separated client counts (default: around pool capacity)')
+    args = parser.parse_args(argv)
+
+    capacity = args.pool_size + args.max_overflow
+    client_counts = ([int(count) for count in args.clients.split(',')] if args.clients
+                     else [args.pool_size, capacity, capacity * 2, capacity * 4])
+
+    # SQLite dạng file dùng QueuePool (in-memory dùng StaticPool, không có giới hạn để bão hòa)
+    database_url = os.getenv('BENCH_DATABASE_URL') or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'pool.db')}"
+
+    class PoolConfig(BenchConfig):
+        SQLALCHEMY_DATABASE_URI = database_url
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            **engine_options(database_url),
+            'pool_size': args.pool_size,
+            'max_overflow': args.max_overflow,
+            'pool_timeout': args.pool_timeout,
+        }
+
+    app = create_bench_app(PoolConfig)
+    # Mỗi request phải truy vấn DB, không trả từ cache
+    response_cache.ttl = 0
+    with app.app_context():
+        start = datetime(2025, 1, 1)
+        db.session.add_all([
+            Task(code=f'POOL-{i:04d}', title=f'Pool task {i}', deadline=start + timedelta(days=i), created_by=1)
+            for i in range(50)
+        ])
+        db.session.commit()
+        event.listen(db.engine, 'before_cursor_execute', lambda *a, **kw: time.sleep(args.query_ms / 1000))
+
+    results = []
+    for clients in client_counts:
+        samples, statuses, wall, peak = run_clients(app, clients, args.requests)
+        results.append({
+            'scenario': f'pool_{clients}_clients',
+            'clients': clients,
+            'pool_size': args.pool_size,
+            'max_overflow': args.max_overflow,
+            'pool_timeout_s': args.pool_timeout,
+            'peak_checked_out': peak['checked_out'],
+            'peak_overflow': peak['overflow'],
+            'p50_ms': round(percentile(samples, 50) * 1000, 1),
+            'p95_ms': round(percentile(samples, 95) * 1000, 1),
+            'p99_ms': round(percentile(samples, 99) * 1000, 1),
+            'throughput_rps': round(len(samples) / wall, 1),
+            'ok': statuses.count(200),
+            'pool_timeouts_500': statuses.count(500)
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
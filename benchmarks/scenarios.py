@@ -0,0 +1,94 @@
+"""Realistic API scenarios run against a seeded dataset."""
+import json
+import random
+from typing import Any, Callable, Dict
+from urllib.parse import quote
+
+from .common import QueryCounter, run_concurrent, run_scenario
+from .seed import BENCH_PASSWORD, DETAIL_STATUSES, DatasetSize
+
+
+class BenchContext:
+    """What a scenario needs: the driver to send requests, the query counter and the dataset volumes"""
+
+    def __init__(self, driver, counter: QueryCounter, size: DatasetSize, seed: int = 42):
+        self.driver = driver
+        self.counter = counter
+        self.size = size
+        self.rng = random.Random(seed)
+        self._token = None
+
+    def call(self, method: str, path: str, expected: int = 200, **kwargs) -> bytes:
+        status, body = self.driver.request(method, path, **kwargs)
+        assert status == expected, f'{method} {path} -> {status}: {body[:300]!r}'
+        return body
+
+    def random_user(self) -> int:
+        return self.rng.randint(1, self.size.users)
+
+    def random_detail(self) -> int:
+        return self.rng.randint(1, self.size.tasks * self.size.details_per_task)
+
+    def auth_headers(self) -> Dict[str, str]:
+        # Đăng nhập một lần bằng tài khoản manager (user1) cho các thao tác cần token
+        if self._token is None:
+            body = self.call('POST', '/api/v1/auth/login/', json={'email': 'user1@bench.local', 'password': BENCH_PASSWORD})
+            self._token = json.loads(body)['data']['access_token']
+        return {'Authorization': f'Bearer {self._token}'}
+
+
+def task_list(ctx: BenchContext, iterations: int) -> Dict[str, Any]:
+    """GET /task/: every task with attachments and creator username"""
+    return run_scenario('task_list', lambda: ctx.call('GET', '/api/v1/task/'), iterations, ctx.counter)
+
+
+def task_detail_by_user(ctx: BenchContext, iterations: int) -> Dict[str, Any]:
+    """GET /task_detail/user/<id> for random users"""
+    return run_scenario('task_detail_by_user',
+                        lambda: ctx.call('GET', f'/api/v1/task_detail/user/{ctx.random_user()}'),
+                        iterations, ctx.counter)
+
+
+def board_load(ctx: BenchContext, iterations: int) -> Dict[str, Any]:
+    """What the board page requests on open: task list, progress of every task, the user's task details"""
+    def load():
+        ctx.call('GET', '/api/v1/task/')
+        ctx.call('GET', '/api/v1/task/progress')
+        ctx.call('GET', f'/api/v1/task_detail/user/{ctx.random_user()}')
+    return run_scenario('board_load', load, iterations, ctx.counter)
+
+
+def status_drag_drop(ctx: BenchContext, iterations: int) -> Dict[str, Any]:
+    """Drag a card to another column (PATCH status) then refresh the board column of a user"""
+    headers = ctx.auth_headers()
+
+    def drag_drop():
+        status = quote(ctx.rng.choice(DETAIL_STATUSES))
+        ctx.call('PATCH', f'/api/v1/task_detail/{ctx.random_detail()}/status/{status}', headers=headers)
+        ctx.call('GET', f'/api/v1/task_detail/user/{ctx.random_user()}')
+    return run_scenario('status_drag_drop', drag_drop, iterations, ctx.counter)
+
+
+def login_burst(ctx: BenchContext, iterations: int) -> Dict[str, Any]:
+    """`iterations` different users logging in at the same moment; bcrypt back-pressure answers 503"""
+    statuses = []
+
+    def login(i):
+        user_id = i % ctx.size.users + 1
+        status, _ = ctx.driver.request('POST', '/api/v1/auth/login/',
+                                       json={'email': f'user{user_id}@bench.local', 'password': BENCH_PASSWORD})
+        statuses.append(status)
+
+    result = run_concurrent('login_burst', login, iterations, ctx.counter)
+    result['ok'] = statuses.count(200)
+    result['busy_503'] = statuses.count(503)
+    return result
+
+
+SCENARIOS: Dict[str, Callable[[BenchContext, int], Dict[str, Any]]] = {
+    'task_list': task_list,
+    'task_detail_by_user': task_detail_by_user,
+    'board_load': board_load,
+    'status_drag_drop': status_drag_drop,
+    'login_burst': login_burst,
+}
@@ -0,0 +1,105 @@
+"""Seeded synthetic dataset: users, tasks, task details, assignees and attachments.
+
+The same --seed and volumes always produce the same rows, so results from two
+commits are measured against identical data.
+"""
+import random
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import func, insert, select
+
+from app import db
+from app.models import Task, TaskAttachment, Task_Detail, Task_Detail_Assignees, User, UserRole
+from app.services.password_hasher import password_hasher
+
+BENCH_PASSWORD = 'bench-password'
+TASK_STATUSES = ('Đã giao', 'Đang thực hiện', 'Đã hoàn thành')
+DETAIL_STATUSES = ('Đã giao', 'Đang thực hiện', 'Hoàn thành')
+CHUNK_SIZE = 1000
+
+
+class DatasetSize:
+    """Row volumes of the generated dataset"""
+
+    def __init__(self, users: int = 50, tasks: int = 500, details_per_task: int = 4,
+                 assignees_per_detail: int = 2, attachments_per_task: int = 2):
+        self.users = users
+        self.tasks = tasks
+        self.details_per_task = details_per_task
+        self.assignees_per_detail = min(assignees_per_detail, users)
+        self.attachments_per_task = attachments_per_task
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+def _insert(model, rows: List[Dict[str, Any]]) -> None:
+    # INSERT nhiều dòng một lần (executemany), không tạo đối tượng ORM
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(insert(model), rows[start:start + CHUNK_SIZE])
+
+
+def is_seeded() -> bool:
+    return db.session.scalar(select(func.count(User.id))) > 0
+
+
+def seed_dataset(size: DatasetSize, seed: int = 42) -> Dict[str, int]:
+    """Insert the dataset into the current app's database (inside an app context); returns row counts"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1, 8, 0)
+    # Một mã băm cho mọi user: băm bcrypt từng user chỉ làm chậm bước seed
+    password_hash = password_hasher.hash(BENCH_PASSWORD)
+
+    users = [{
+        'id': i, 'username': f'user{i}', 'password_hash': password_hash, 'email': f'user{i}@bench.local',
+        'birth_year': rng.randint(1990, 2004), 'gender': rng.choice(('Nam', 'Nữ', 'Khác')),
+        'start_date': date(2024, 1, 1) + timedelta(days=rng.randint(0, 365)),
+        # user đầu tiên là manager (dùng cho các thao tác cần quyền)
+        'role': UserRole.MANAGER if i == 1 else UserRole.INTERN, 'is_verified': True,
+        'created_at': start + timedelta(minutes=i),
+    } for i in range(1, size.users + 1)]
+    _insert(User, users)
+
+    tasks, attachments, details, assignees = [], [], [], []
+    for task_id in range(1, size.tasks + 1):
+        created_at = start + timedelta(hours=task_id)
+        tasks.append({
+            'id': task_id, 'code': f'BENCH-{task_id:06d}', 'title': f'Nhiệm vụ {task_id}',
+            'description': 'Mô tả công việc ' * rng.randint(1, 20), 'status': rng.choice(TASK_STATUSES),
+            'deadline': created_at + timedelta(days=rng.randint(1, 60)), 'created_by': rng.randint(1, size.users),
+            'created_at': created_at,
+        })
+        for k in range(size.attachments_per_task):
+            attachments.append({
+                'task_id': task_id, 'file_path': f'http://localhost:5000/api/v1/uploads/bench/{task_id}-{k}.pdf',
+                'uploaded_at': created_at + timedelta(minutes=k),
+            })
+        for k in range(size.details_per_task):
+            detail_id = len(details) + 1
+            details.append({
+                'id': detail_id, 'task_id': task_id, 'title': f'Việc {k + 1} của nhiệm vụ {task_id}',
+                'description': 'Chi tiết ' * rng.randint(1, 10), 'status': rng.choice(DETAIL_STATUSES),
+                'created_at': created_at + timedelta(minutes=k), 'updated_at': created_at + timedelta(minutes=k),
+            })
+            for user_id in rng.sample(range(1, size.users + 1), size.assignees_per_detail):
+                assignees.append({'task_detail_id': detail_id, 'user_id': user_id, 'assigned_at': created_at})
+
+    _insert(Task, tasks)
+    _insert(TaskAttachment, attachments)
+    _insert(Task_Detail, details)
+    _insert(Task_Detail_Assignees, assignees)
+    db.session.commit()
+    return {
+        'users': len(users),
+        'tasks': len(tasks),
+        'task_attachments': len(attachments),
+        'task_details': len(details),
+        'task_detail_assignees': len(assignees),
+    }
+
+
+def dataset_counts() -> Dict[str, int]:
+    """Row counts of an existing dataset"""
+    return {model.__tablename__: db.session.scalar(select(func.count()).select_from(model))
+            for model in (User, Task, TaskAttachment, Task_Detail, Task_Detail_Assignees)}
@@ -0,0 +1,117 @@
+"""Cold start of a worker: `import app`, create_app() and the first request, each in a fresh interpreter.
+
+Every run is a new `python -X importtime` process, so nothing is warm in sys.modules.
+The report lists the slowest imports (cumulative) of the first run; with --baseline it
+exits non-zero when the median total start-up time regressed by more than --max-regression
+percent, which makes it usable as a CI gate.
+
+Usage: python -m benchmarks.startup_bench [--runs 10] [--top 15] [--save baseline.json]
+                                          [--baseline baseline.json --max-regression 20]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARKER = 'STARTUP_TIMINGS '
+
+# Chạy trong process con: đo từng bước bằng perf_counter, in kết quả trên một dòng stdout
+CHILD = f"""
+import json, time
+t0 = time.perf_counter()
+from app import create_app, db
+t1 = time.perf_counter()
+from config import TestingConfig
+app = create_app(TestingConfig)
+t2 = time.perf_counter()
+with app.app_context():
+    from app import models
+    db.create_all()
+client = app.test_client()
+t3 = time.perf_counter()
+status = client.get('/api/v1/task/').status_code
+t4 = time.perf_counter()
+assert status == 200, status
+print({MARKER!r} + json.dumps({{
+    'import_ms': (t1 - t0) * 1000,
+    'create_app_ms': (t2 - t1) * 1000,
+    'first_request_ms': (t4 - t3) * 1000,
+}}))
+"""
+
+
+def run_once() -> Tuple[Dict[str, float], str]:
+    env = dict(os.environ, SECRET_KEY=os.getenv('SECRET_KEY', 'benchmark-secret'),
+               API_BASE_URL='http://localhost:5000', LOG_LEVEL='WARNING', LOG_SINK='stderr',
+               PYTHONPATH=REPO_ROOT + os.pathsep + os.getenv('PYTHONPATH', ''))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', CHILD], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True)
+    lines = [line for line in result.stdout.splitlines() if line.startswith(MARKER)]
+    if result.returncode != 0 or not lines:
+        sys.exit(f'start-up run failed:\n{result.stderr[-2000:]}')
+    timings = json.loads(lines[-1][len(MARKER):])
+    timings['total_ms'] = timings['import_ms'] + timings['create_app_ms'] + timings['first_request_ms']
+    return timings, result.stderr
+
+
+def slowest_imports(importtime_output: str, top: int) -> List[Dict[str, object]]:
+    """Top-level packages (first dotted name) ranked by the cumulative time of their outermost import"""
+    packages: Dict[str, int] = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        package = name.split('.')[0]
+        # Dòng của gói cha đến sau các import con và có cumulative lớn nhất
+        packages[package] = max(packages.get(package, 0), int(cumulative))
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{'package': package, 'cumulative_ms': round(us / 1000, 1)} for package, us in ranked]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=15, help='slowest imported packages to list')
+    parser.add_argument('--save', help='write the report to this file (e.g. to use as a baseline)')
+    parser.add_argument('--baseline', help='report of a previous run to compare with')
+    parser.add_argument('--max-regression', type=float, default=20, help='allowed median total increase, percent')
+    args = parser.parse_args(argv)
+
+    runs, first_importtime = [], None
+    for _ in range(args.runs):
+        timings, importtime_output = run_once()
+        runs.append(timings)
+        first_importtime = first_importtime or importtime_output
+
+    report = {
+        'scenario': 'startup',
+        'runs': args.runs,
+        **{f'{key}_p50': round(statistics.median(run[key] for run in runs), 1)
+           for key in ('import_ms', 'create_app_ms', 'first_request_ms', 'total_ms')},
+        'slowest_imports': slowest_imports(first_importtime, args.top),
+    }
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        change = (report['total_ms_p50'] - baseline['total_ms_p50']) / baseline['total_ms_p50'] * 100
+        report['baseline_total_ms_p50'] = baseline['total_ms_p50']
+        report['change_pct'] = round(change, 1)
+        failed = change > args.max_regression
+
+    output = json.dumps(report, indent=2)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    print(output)
+    if failed:
+        sys.exit(f"start-up regressed by {report['change_pct']}% (limit {args.max_regression}%)")
+
+
+if __name__ == '__main__':
+    main()
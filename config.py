@@ -3,15 +3,125 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def env_bool(name, default=False):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+def engine_options(database_url):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for a database URL from DB_* environment variables.
+    SQLite (tests, benchmarks) keeps Flask-SQLAlchemy's defaults: its pools take no size settings.
+    """
+    if not database_url or database_url.startswith('sqlite'):
+        return {}
+    options = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),  # chờ tối đa khi pool hết kết nối
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),  # nhỏ hơn wait_timeout của MySQL
+        'pool_pre_ping': env_bool('DB_POOL_PRE_PING', True),  # bỏ kết nối đã bị server đóng trước khi dùng
+        'connect_args': {'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 10))},
+    }
+    # Timeout đọc/ghi của pymysql (giây), không đặt thì chờ vô hạn
+    for name in ('read_timeout', 'write_timeout'):
+        value = os.getenv(f'DB_{name.upper()}')
+        if value:
+            options['connect_args'][name] = int(value)
+    return options
+
+
 class Config(object):
     SECRET_KEY = os.getenv('SECRET_KEY')
     FLASK_ENV = os.getenv('FLASK_ENV')
     DATABASE_URL = os.getenv('DATABASE_URL')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
-    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool kết nối (kích thước, overflow, recycle, pre-ping, timeout) lấy từ biến môi trường DB_*
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     MAIL_SERVER = os.getenv('MAIL_SERVER')
     MAIL_PORT = os.getenv('MAIL_PORT')  
     MAIL_USE_TLS = os.getenv('MAIL_USE_TLS')
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
-    MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
\ No newline at end of file
+    MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
+    # Cache user đã xác thực theo token (số token tối đa, thời gian sống tính bằng giây)
+    IDENTITY_CACHE_SIZE = int(os.getenv('IDENTITY_CACHE_SIZE', 1024))
+    IDENTITY_CACHE_TTL = int(os.getenv('IDENTITY_CACHE_TTL', 60))
+    # Cache get_by_id của repository (số bản ghi tối đa, thời gian sống tính bằng giây).
+    # Cache nằm trong từng process và chỉ bị xóa ở worker đã ghi: khi chạy nhiều worker gunicorn,
+    # worker khác có thể trả bản ghi cũ tới ENTITY_CACHE_TTL giây. Xác thực token (role) không
+    # đọc qua cache này nên thay đổi role/xóa user có hiệu lực sau tối đa IDENTITY_CACHE_TTL
+    ENTITY_CACHE_SIZE = int(os.getenv('ENTITY_CACHE_SIZE', 2048))
+    ENTITY_CACHE_TTL = int(os.getenv('ENTITY_CACHE_TTL', 300))
+    # Cache body JSON của GET /task/ và GET /user/ (giây; 0 = tắt). Ghi ở worker khác chỉ
+    # được nhìn thấy khi hết hạn nên giữ ngắn khi chạy nhiều worker
+    RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', 10))
+    # Băm mật khẩu bcrypt: cost, số thread, số job chờ tối đa, timeout (giây)
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 4))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', 64))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 30))
+    # Giới hạn kích thước mỗi tệp upload (byte), kiểm tra ngay trong lúc nhận dữ liệu
+    UPLOAD_MAX_FILE_SIZE = int(os.getenv('UPLOAD_MAX_FILE_SIZE', 50 * 1024 * 1024))
+    # Giao việc gửi tệp upload cho web server: X-Sendfile (Apache/lighttpd) hoặc
+    # X-Accel-Redirect của nginx (ví dụ UPLOAD_ACCEL_REDIRECT_PREFIX=/protected-uploads)
+    USE_X_SENDFILE = env_bool('USE_X_SENDFILE')
+    UPLOAD_ACCEL_REDIRECT_PREFIX = os.getenv('UPLOAD_ACCEL_REDIRECT_PREFIX')
+    # Ảnh thu nhỏ WebP (cạnh dài, px) tạo nền sau khi upload ảnh; cần Pillow
+    THUMBNAIL_SIZES = tuple(int(size) for size in os.getenv('THUMBNAIL_SIZES', '64,256').split(',') if size.strip())
+    # Hàng đợi job bền vững (bảng jobs): xóa tệp, tạo ảnh thu nhỏ... chạy sau khi commit
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))  # 0 = chỉ chạy bằng lệnh `flask jobs drain`
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 5))
+    JOB_RETRY_BACKOFF = float(os.getenv('JOB_RETRY_BACKOFF', 2))  # giây, nhân đôi sau mỗi lần lỗi
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 5))
+    JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', 300))
+    # Tệp hết tham chiếu chỉ bị xóa sau FILE_REMOVAL_DELAY giây (request đang dùng lại nội dung đó kịp commit);
+    # `flask jobs collect-blobs` dọn blob/tệp mồ côi cũ hơn BLOB_GC_AGE giây
+    FILE_REMOVAL_DELAY = float(os.getenv('FILE_REMOVAL_DELAY', 60))
+    BLOB_GC_AGE = int(os.getenv('BLOB_GC_AGE', 3600))
+    # Log: mức log, nơi ghi (file | stdout | stderr), định dạng (json | text),
+    # tỉ lệ giữ lại các dòng INFO (1 = giữ hết; WARNING trở lên luôn được ghi)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_SINK = os.getenv('LOG_SINK', 'file')
+    LOG_FILE = os.getenv('LOG_FILE', 'flask-template.log')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+    LOG_INFO_SAMPLE_RATE = float(os.getenv('LOG_INFO_SAMPLE_RATE', 1))
+    # Đo từng request (log + Prometheus GET /metrics); cảnh báo request chậm và câu SQL lặp lại (N+1)
+    METRICS_ENABLED = env_bool('METRICS_ENABLED', True)
+    SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', 1000))
+    N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 5))
+    # Profile theo yêu cầu (header X-Profile: 1 của manager); tắt mặc định
+    PROFILING_ENABLED = env_bool('PROFILING_ENABLED')
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+    PROFILE_MAX_CONCURRENT = int(os.getenv('PROFILE_MAX_CONCURRENT', 1))
+    PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', 5))
+    PROFILE_MAX_SECONDS = float(os.getenv('PROFILE_MAX_SECONDS', 30))
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    SQLALCHEMY_ECHO = env_bool('SQLALCHEMY_ECHO')
+
+
+class ProductionConfig(Config):
+    DEBUG = False
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URL', 'sqlite://')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    # SQLite in-memory dùng chung một kết nối: không chạy worker job trên thread khác
+    JOB_WORKERS = 0
+
+
+config_by_name = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+}
+
+
+def get_config(name=None):
+    """Config class for FLASK_ENV (development/production/testing); production if unset"""
+    return config_by_name.get(name or os.getenv('FLASK_ENV') or 'production', ProductionConfig)
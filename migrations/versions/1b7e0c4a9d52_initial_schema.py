@@ -0,0 +1,83 @@
+"""initial schema
+
+Revision ID: 1b7e0c4a9d52
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b7e0c4a9d52'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=255), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('birth_year', sa.Integer(), nullable=True),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('gender', sa.Enum('Nam', 'Nữ', 'Khác'), nullable=True),
+        sa.Column('avatar', sa.String(length=255), nullable=True),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('cv_link', sa.String(length=255), nullable=True),
+        sa.Column('role', sa.Enum('INTERN', 'MANAGER', name='userrole'), nullable=True),
+        sa.Column('is_verified', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('tasks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('code', sa.String(length=50), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('deadline', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.Enum('Đã giao', 'Đang thực hiện', 'Đã hoàn thành'), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('code')
+    )
+    op.create_table('task_attachments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('file_path', sa.String(length=255), nullable=False),
+        sa.Column('uploaded_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('task_details',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('status', sa.Enum('Đã giao', 'Đang thực hiện', 'Hoàn thành'), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('task_detail_assignees',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('task_detail_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('assigned_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['task_detail_id'], ['task_details.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('task_detail_assignees')
+    op.drop_table('task_details')
+    op.drop_table('task_attachments')
+    op.drop_table('tasks')
+    op.drop_table('users')
@@ -0,0 +1,50 @@
+"""add keyset listing indexes
+
+Revision ID: 3f9a2c1d7b40
+Revises: 1b7e0c4a9d52
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a2c1d7b40'
+down_revision = '1b7e0c4a9d52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_tasks_status_created_at_id', ['status', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_tasks_created_by_created_at_id', ['created_by', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_tasks_deadline', ['deadline'], unique=False)
+
+    with op.batch_alter_table('task_details', schema=None) as batch_op:
+        batch_op.create_index('ix_task_details_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_task_details_status_created_at_id', ['status', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_task_details_task_id_created_at_id', ['task_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_users_role_created_at_id', ['role', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_role_created_at_id')
+        batch_op.drop_index('ix_users_created_at_id')
+
+    with op.batch_alter_table('task_details', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_details_task_id_created_at_id')
+        batch_op.drop_index('ix_task_details_status_created_at_id')
+        batch_op.drop_index('ix_task_details_created_at_id')
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_deadline')
+        batch_op.drop_index('ix_tasks_created_by_created_at_id')
+        batch_op.drop_index('ix_tasks_status_created_at_id')
+        batch_op.drop_index('ix_tasks_created_at_id')
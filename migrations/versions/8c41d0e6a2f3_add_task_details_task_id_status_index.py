@@ -0,0 +1,26 @@
+"""add task_details task_id status index
+
+Revision ID: 8c41d0e6a2f3
+Revises: 3f9a2c1d7b40
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41d0e6a2f3'
+down_revision = '3f9a2c1d7b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('task_details', schema=None) as batch_op:
+        batch_op.create_index('ix_task_details_task_id_status', ['task_id', 'status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('task_details', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_details_task_id_status')
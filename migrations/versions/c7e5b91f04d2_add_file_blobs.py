@@ -0,0 +1,43 @@
+"""add content-addressed file blobs for task attachments
+
+Revision ID: c7e5b91f04d2
+Revises: 8c41d0e6a2f3
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e5b91f04d2'
+down_revision = '8c41d0e6a2f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('file_blobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('path', sa.String(length=255), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('path'),
+        sa.UniqueConstraint('sha256')
+    )
+    with op.batch_alter_table('task_attachments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('blob_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_task_attachments_blob_id'), ['blob_id'], unique=False)
+        batch_op.create_foreign_key('fk_task_attachments_blob_id_file_blobs', 'file_blobs', ['blob_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('task_attachments', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_task_attachments_blob_id_file_blobs', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_task_attachments_blob_id'))
+        batch_op.drop_column('blob_id')
+
+    op.drop_table('file_blobs')
@@ -0,0 +1,26 @@
+"""add original filename to task attachments
+
+Revision ID: e2a6c9d4b813
+Revises: a4d8f27c9e15
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a6c9d4b813'
+down_revision = 'a4d8f27c9e15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('task_attachments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('original_filename', sa.String(length=255), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('task_attachments', schema=None) as batch_op:
+        batch_op.drop_column('original_filename')
@@ -0,0 +1,68 @@
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SECRET_KEY', 'test-secret')
+os.environ.setdefault('API_BASE_URL', 'http://localhost:5000')
+
+from config import TestingConfig  # noqa: E402
+from app import create_app, db  # noqa: E402
+from app.services.password_hasher import password_hasher  # noqa: E402
+from app.repositories.entity_cache import cache_backend  # noqa: E402
+from app.services.response_cache import COLLECTION_TABLES, response_cache  # noqa: E402
+from app.services.identity_cache import identity_cache  # noqa: E402
+
+
+class TestConfig(TestingConfig):
+    SECRET_KEY = os.environ['SECRET_KEY']
+    LOG_LEVEL = 'WARNING'
+    LOG_SINK = 'stderr'
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """App on a fresh in-memory SQLite database with every table created"""
+    # Thư mục uploads/ được tạo theo thư mục hiện tại: mỗi test một thư mục riêng
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(password_hasher, 'rounds', 4)
+    # Cache bản ghi dùng chung cả process: id của SQLite được dùng lại giữa các test
+    cache_backend.clear()
+    response_cache.bump(*COLLECTION_TABLES)
+    identity_cache.clear()
+    app = create_app(TestConfig)
+    with app.app_context():
+        from app import models  # noqa: F401  đăng ký model trước khi create_all
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def make_user(username: str, role, password: str = 'secret'):
+    from app.models import User
+    user = User(username=username, password_hash=password_hasher.hash(password), email=f'{username}@test.local',
+                start_date=date(2024, 1, 1), role=role)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def manager(app):
+    from app.models import UserRole
+    return make_user('manager', UserRole.MANAGER)
+
+
+@pytest.fixture
+def auth_headers(app, manager):
+    """Bearer token of the manager"""
+    token = app.extensions['services'].get('user_service').generate_access_token(manager.id, manager.role.value)
+    return {'Authorization': f'Bearer {token}'}
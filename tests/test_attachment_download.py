@@ -0,0 +1,25 @@
+import io
+
+import pytest
+
+from app.models import TaskAttachment
+
+
+@pytest.mark.parametrize('accel_prefix', [None, '/protected-uploads'])
+def test_download_uses_the_uploaded_file_name(app, client, manager, auth_headers, accel_prefix):
+    app.config['UPLOAD_ACCEL_REDIRECT_PREFIX'] = accel_prefix
+    response = client.post('/api/v1/task/', headers=auth_headers, content_type='multipart/form-data', data={
+        'code': 'T1', 'title': 'Task 1', 'deadline': '2030-01-01T00:00:00', 'created_by': str(manager.id),
+        'attachments': (io.BytesIO(b'report'), 'Báo cáo.pdf'),
+    })
+    assert response.status_code == 201
+    attachment = TaskAttachment.query.one()
+    assert attachment.original_filename == 'Báo cáo.pdf'
+    assert response.get_json()['data']['attachments'][0]['original_filename'] == 'Báo cáo.pdf'
+
+    response = client.get(f'/api/v1/task/attachment/{attachment.id}')
+
+    assert response.status_code == 200
+    disposition = response.headers['Content-Disposition']
+    assert disposition.startswith('attachment;')
+    assert "filename*=UTF-8''B%C3%A1o%20c%C3%A1o.pdf" in disposition
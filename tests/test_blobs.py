@@ -0,0 +1,124 @@
+import hashlib
+import io
+import os
+
+from sqlalchemy import text
+
+from app import db
+from app.models import FileBlob, Task
+from app.repositories.blob_repository import blob_path
+from app.repositories.file_cleanup import collect_orphan_blobs, schedule_file_removal
+from app.repositories.job_queue import job_queue
+from app.repositories.task_repository import TaskRepository
+
+BASE_URL = 'http://localhost:5000/api/v1/uploads/'
+
+
+def blob_files():
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), 'uploads')
+        for directory, _, names in os.walk('uploads') for name in names
+    )
+
+
+def post_task(client, headers, **fields):
+    data = {'code': 'T1', 'title': 'Task 1', 'deadline': '2030-01-01T00:00:00', 'created_by': '1',
+            'attachments': (io.BytesIO(b'report'), 'report.pdf')}
+    data.update(fields)
+    return client.post('/api/v1/task/', headers=headers, content_type='multipart/form-data', data=data)
+
+
+def test_rejected_create_stores_no_blob(client, auth_headers):
+    data = {'title': 'Task 1', 'deadline': '2030-01-01T00:00:00', 'created_by': '1',
+            'attachments': (io.BytesIO(b'report'), 'report.pdf')}
+    response = client.post('/api/v1/task/', headers=auth_headers, content_type='multipart/form-data', data=data)
+
+    assert response.status_code == 400
+    assert FileBlob.query.count() == 0
+    assert blob_files() == []
+
+
+def test_failed_create_commits_no_blob_and_gc_removes_the_file(client, auth_headers):
+    assert post_task(client, auth_headers).status_code == 201
+    # Mã trùng: lỗi khi commit, blob của tệp mới bị rollback cùng task
+    response = post_task(client, auth_headers, attachments=(io.BytesIO(b'other'), 'other.pdf'))
+
+    assert response.status_code == 500
+    assert FileBlob.query.count() == 1
+    assert len(blob_files()) == 2
+
+    assert collect_orphan_blobs(max_age=0) == {'rows': 0, 'files': 1}
+    assert blob_files() == [FileBlob.query.one().path.replace('/', os.sep)]
+
+
+def test_gc_deletes_unreferenced_rows(app):
+    db.session.add(FileBlob(sha256='a' * 64, path=blob_path('a' * 64, '.pdf'), size=1, ref_count=0))
+    db.session.commit()
+
+    assert collect_orphan_blobs(max_age=-60)['rows'] == 1
+    assert FileBlob.query.count() == 0
+
+
+def test_reference_to_blob_deleted_concurrently_recreates_it(app, manager):
+    blob = FileBlob(sha256='b' * 64, path=blob_path('b' * 64, '.pdf'), size=3, ref_count=1)
+    db.session.add(blob)
+    db.session.commit()
+    repository = TaskRepository()
+    stale = repository.blob_repository.get_by_paths([blob.path])
+    # Transaction khác giải phóng tham chiếu cuối và xóa blob sau khi request này đã đọc nó
+    db.session.execute(text('DELETE FROM file_blobs'))
+    repository.blob_repository.get_by_paths = lambda paths: dict(stale)
+
+    task = Task(code='T1', title='Task 1', deadline=db.func.current_timestamp(), created_by=manager.id)
+    repository.create(task, [(BASE_URL + blob.path, 'report.pdf')])
+
+    recreated = FileBlob.query.filter_by(sha256='b' * 64).one()
+    assert recreated.ref_count == 1
+    assert task.attachments[0].blob_id == recreated.id
+
+
+def test_file_removal_keeps_files_referenced_again(app):
+    path = blob_path('c' * 64, '.pdf')
+    os.makedirs(os.path.dirname(os.path.join('uploads', path)))
+    with open(os.path.join('uploads', path), 'wb') as f:
+        f.write(b'c')
+    schedule_file_removal([os.path.abspath(os.path.join('uploads', path))])
+    # Cùng nội dung được upload lại trước khi job chạy
+    db.session.add(FileBlob(sha256='c' * 64, path=path, size=1, ref_count=1))
+    db.session.commit()
+
+    assert job_queue.drain(ignore_schedule=True) == 1
+    assert os.path.exists(os.path.join('uploads', path))
+
+
+def ref_counts():
+    db.session.expire_all()
+    return {blob.sha256[:8]: blob.ref_count for blob in FileBlob.query.all()}
+
+
+def test_references_are_counted_across_attachment_and_task_deletes(client, auth_headers):
+    shared, unique = (hashlib.sha256(content).hexdigest()[:8] for content in (b'shared', b'unique'))
+    assert post_task(client, auth_headers, code='T1', attachments=[
+        (io.BytesIO(b'shared'), 'a.pdf'), (io.BytesIO(b'unique'), 'b.pdf'),
+    ]).status_code == 201
+    assert post_task(client, auth_headers, code='T2', attachments=[
+        (io.BytesIO(b'shared'), 'a.pdf'), (io.BytesIO(b'shared'), 'copy.pdf'),
+    ]).status_code == 201
+    assert ref_counts() == {shared: 3, unique: 1}
+    assert len(blob_files()) == 2
+
+    first = Task.query.filter_by(code='T1').one()
+    shared_attachment = next(a for a in first.attachments if a.original_filename == 'a.pdf')
+    assert client.delete(f'/api/v1/task/attachments/{shared_attachment.id}', headers=auth_headers).status_code == 200
+    assert ref_counts() == {shared: 2, unique: 1}
+
+    assert client.delete(f'/api/v1/task/{first.id}/attachments', headers=auth_headers).status_code == 200
+    assert ref_counts() == {shared: 2}
+    job_queue.drain(ignore_schedule=True)
+    assert len(blob_files()) == 1
+
+    second = Task.query.filter_by(code='T2').one()
+    assert client.delete(f'/api/v1/task/{second.id}', headers=auth_headers).status_code == 200
+    assert ref_counts() == {}
+    job_queue.drain(ignore_schedule=True)
+    assert blob_files() == []
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Task
+from app.repositories.task_repository import TaskRepository
+
+
+@pytest.fixture
+def repository(app):
+    return TaskRepository()
+
+
+@pytest.fixture
+def task_id(manager):
+    task = Task(code='T1', title='Original', deadline=datetime(2030, 1, 1), created_by=manager.id)
+    db.session.add(task)
+    db.session.commit()
+    task_id = task.id
+    db.session.expunge_all()
+    return task_id
+
+
+def count_selects(fn):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return result, [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+
+
+def fresh_load(repository, task_id):
+    db.session.expunge_all()
+    return count_selects(lambda: repository.get_by_id(task_id))
+
+
+def test_second_load_is_served_from_cache(repository, task_id):
+    _, selects = fresh_load(repository, task_id)
+    assert len(selects) == 1
+
+    task, selects = fresh_load(repository, task_id)
+
+    assert selects == []
+    assert task.title == 'Original'
+    assert task in db.session
+
+
+def test_update_invalidates_on_commit(repository, task_id):
+    repository.get_by_id(task_id).title = 'Changed'
+    db.session.commit()
+
+    task, selects = fresh_load(repository, task_id)
+
+    assert len(selects) == 1
+    assert task.title == 'Changed'
+
+
+def test_flushed_change_is_dropped_on_rollback(repository, task_id):
+    task = repository.get_by_id(task_id)
+    task.title = 'Never committed'
+    db.session.flush()
+    # Một lượt đọc khác có thể đã cache dữ liệu chưa commit trong lúc transaction còn mở
+    repository.entity_cache.backend.set(f'tasks:{task_id}', {'id': task_id, 'title': 'Never committed'})
+    db.session.rollback()
+
+    task, selects = fresh_load(repository, task_id)
+
+    assert len(selects) == 1
+    assert task.title == 'Original'
+
+
+def test_bulk_update_invalidates_the_whole_model(repository, task_id):
+    fresh_load(repository, task_id)
+    Task.query.filter(Task.id == task_id).update({Task.title: 'Bulk'}, synchronize_session=False)
+    db.session.commit()
+
+    task, selects = fresh_load(repository, task_id)
+
+    assert len(selects) == 1
+    assert task.title == 'Bulk'
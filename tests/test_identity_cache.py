@@ -0,0 +1,35 @@
+from app.models import UserRole
+from app.services.identity_cache import identity_cache
+from conftest import make_user
+
+
+def token_of(headers):
+    return headers['Authorization'].split(' ', 1)[1]
+
+
+def test_role_change_takes_effect_on_the_next_request(client, manager, auth_headers):
+    other = make_user('other', UserRole.INTERN)
+    assert client.get('/api/v1/auth/me/', headers=auth_headers).status_code == 200
+    assert identity_cache.get(token_of(auth_headers))['role'] == 'MANAGER'
+
+    response = client.put(f'/api/v1/user/{manager.id}', headers=auth_headers, json={'role': 'INTERN'})
+
+    assert response.status_code == 200, response.get_json()
+    assert identity_cache.get(token_of(auth_headers)) is None
+    # Cùng token nhưng role đã bị hạ: không còn quyền manager
+    response = client.delete(f'/api/v1/user/{other.id}', headers=auth_headers)
+    assert response.status_code == 403
+    assert identity_cache.get(token_of(auth_headers))['role'] == 'INTERN'
+
+
+def test_deleted_user_token_is_rejected(client, app, manager, auth_headers):
+    intern = make_user('intern', UserRole.INTERN)
+    token = app.extensions['services'].get('user_service').generate_access_token(intern.id, intern.role.value)
+    intern_headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/api/v1/auth/me/', headers=intern_headers).status_code == 200
+    assert identity_cache.get(token) is not None
+
+    assert client.delete(f'/api/v1/user/{intern.id}', headers=auth_headers).status_code == 200
+
+    assert identity_cache.get(token) is None
+    assert client.get('/api/v1/auth/me/', headers=intern_headers).status_code == 401
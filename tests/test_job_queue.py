@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Job
+from app.repositories.job_queue import job_handler, job_queue
+
+calls = []
+
+
+@job_handler('test_record')
+def record(payload):
+    calls.append(payload['value'])
+
+
+@job_handler('test_fail')
+def fail(payload):
+    calls.append(payload['value'])
+    raise RuntimeError('boom')
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+def test_job_runs_only_after_commit_and_is_deleted(app):
+    job_queue.enqueue('test_record', {'value': 'rolled back'})
+    db.session.rollback()
+    job_queue.enqueue('test_record', {'value': 'committed'})
+    db.session.commit()
+
+    assert job_queue.drain() == 1
+    assert calls == ['committed']
+    assert Job.query.count() == 0
+
+
+def test_job_claimed_by_another_worker_is_not_run_twice(app):
+    job = job_queue.enqueue('test_record', {'value': 1})
+    db.session.commit()
+    # Worker khác đã đổi trạng thái trước: UPDATE có điều kiện không khớp dòng nào
+    job.status = 'running'
+    job.locked_until = datetime.utcnow() + timedelta(minutes=5)
+    db.session.commit()
+
+    assert job_queue.run_next() is False
+    assert calls == []
+
+
+def test_job_with_an_expired_lease_is_claimed_again(app):
+    job = job_queue.enqueue('test_record', {'value': 1})
+    db.session.commit()
+    job.status = 'running'
+    job.attempts = 1
+    job.locked_until = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+    assert job_queue.run_next() is True
+    assert calls == [1]
+
+
+def test_failed_job_is_retried_with_backoff_then_marked_failed(app):
+    job = job_queue.enqueue('test_fail', {'value': 1}, max_attempts=2)
+    db.session.commit()
+    job_id = job.id
+
+    assert job_queue.run_next() is True
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.attempts, job.locked_until) == ('pending', 1, None)
+    assert job.run_at > datetime.utcnow()
+    assert 'RuntimeError: boom' in job.last_error
+    # Chưa tới hạn retry
+    assert job_queue.run_next() is False
+
+    assert job_queue.run_next(ignore_schedule=True) is True
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.attempts) == ('failed', 2)
+    assert job_queue.drain(ignore_schedule=True) == 0
+    assert calls == [1, 1]
+
+
+def test_retry_failed_command_requeues_failed_jobs(app):
+    job = job_queue.enqueue('test_fail', {'value': 1}, max_attempts=1)
+    db.session.commit()
+    job_id = job.id
+    job_queue.drain()
+    assert db.session.get(Job, job_id).status == 'failed'
+
+    result = app.test_cli_runner().invoke(args=['jobs', 'retry-failed'])
+
+    assert result.exit_code == 0, result.output
+    assert 'Re-queued 1 job(s)' in result.output
+    db.session.expire_all()
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.attempts) == ('pending', 0)
+    assert job_queue.drain() == 1
+    assert calls == [1, 1]
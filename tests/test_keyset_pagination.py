@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from app import db
+from app.models import Task
+
+
+def seed(manager):
+    for i in range(6):
+        db.session.add(Task(code=f'T{i}', title=f'Task {i}', deadline=datetime(2030, 1, 1), created_by=manager.id,
+                            created_at=datetime(2026, 1, 1, 0, 0, i)))
+    db.session.commit()
+    # Dữ liệu cũ không có created_at
+    Task.query.filter(Task.id <= 3).update({Task.created_at: None}, synchronize_session=False)
+    db.session.commit()
+
+
+def test_pages_cover_rows_with_and_without_created_at(client, manager):
+    seed(manager)
+
+    ids, cursor = [], None
+    for _ in range(10):
+        url = '/api/v1/task/?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(url).get_json()
+        ids.extend(task['id'] for task in body['data'])
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+
+    assert ids == [1, 2, 3, 4, 5, 6]
@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.mark.parametrize('url', [
+    '/api/v1/task/?created_by=abc',
+    '/api/v1/task_detail/?task_id=abc',
+    '/api/v1/user/?role=nobody',
+    '/api/v1/task/?limit=abc',
+])
+def test_invalid_filter_is_rejected(client, url):
+    response = client.get(url)
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
@@ -0,0 +1,13 @@
+import os
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+def test_db_commands_are_registered_outside_a_click_context(app):
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['db', '--directory', MIGRATIONS, 'heads'])
+
+    assert result.exit_code == 0, result.output
+    assert 'e2a6c9d4b813 (head)' in result.output
+    assert 'migrate' in app.extensions
@@ -0,0 +1,63 @@
+from datetime import datetime
+
+from app import db
+from app.models import Task
+from app.services.response_cache import response_cache
+
+
+def add_task(manager, code):
+    db.session.add(Task(code=code, title=code, deadline=datetime(2030, 1, 1), created_by=manager.id))
+    db.session.commit()
+
+
+def codes(response):
+    return [task['code'] for task in response.get_json()['data']]
+
+
+def test_cached_body_is_reused_until_a_write_commits(client, manager):
+    add_task(manager, 'T1')
+    first = client.get('/api/v1/task/')
+    hits = response_cache.hits
+
+    second = client.get('/api/v1/task/')
+
+    assert response_cache.hits == hits + 1
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert codes(second) == ['T1']
+
+    version = response_cache.version('tasks')
+    add_task(manager, 'T2')
+    assert response_cache.version('tasks') == version + 1
+
+    third = client.get('/api/v1/task/')
+    assert third.headers['ETag'] != first.headers['ETag']
+    assert codes(third) == ['T1', 'T2']
+
+
+def test_matching_etag_gets_304_until_data_changes(client, manager):
+    add_task(manager, 'T1')
+    etag = client.get('/api/v1/task/').headers['ETag']
+
+    not_modified = client.get('/api/v1/task/', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+
+    add_task(manager, 'T2')
+    modified = client.get('/api/v1/task/', headers={'If-None-Match': etag})
+    assert modified.status_code == 200
+    assert codes(modified) == ['T1', 'T2']
+
+
+def test_user_write_invalidates_task_list_but_rollback_does_not(client, manager):
+    client.get('/api/v1/task/')
+    client.get('/api/v1/user/')
+    tasks, users = response_cache.version('tasks'), response_cache.version('users')
+
+    manager.email = 'discarded@test.local'
+    db.session.flush()
+    db.session.rollback()
+    assert (response_cache.version('tasks'), response_cache.version('users')) == (tasks, users)
+
+    manager.email = 'manager2@test.local'
+    db.session.commit()
+    assert (response_cache.version('tasks'), response_cache.version('users')) == (tasks + 1, users + 1)
@@ -0,0 +1,73 @@
+import io
+import os
+
+from app import db
+from app.models import FileBlob, Task, TaskAttachment
+
+
+def test_multipart_create_accepts_form_strings_and_stores_attachment(client, manager, auth_headers):
+    response = client.post('/api/v1/task/', headers=auth_headers, content_type='multipart/form-data', data={
+        'code': 'T1',
+        'title': 'Task 1',
+        'deadline': '2030-01-01T00:00:00',
+        'created_by': str(manager.id),
+        'attachments': (io.BytesIO(b'report'), 'report.pdf'),
+    })
+
+    assert response.status_code == 201, response.get_json()
+    task = Task.query.filter_by(code='T1').one()
+    assert task.created_by == manager.id
+    attachment = TaskAttachment.query.filter_by(task_id=task.id).one()
+    blob = db.session.get(FileBlob, attachment.blob_id)
+    assert blob.ref_count == 1
+    assert os.path.exists(os.path.join('uploads', blob.path))
+
+
+def test_json_create_rejects_non_numeric_created_by(client, auth_headers):
+    response = client.post('/api/v1/task/', headers=auth_headers, json={
+        'code': 'T1', 'title': 'Task 1', 'deadline': '2030-01-01T00:00:00', 'created_by': 'abc'
+    })
+
+    assert response.status_code >= 400
+    assert 'created_by must be an integer user id' in response.get_json()['error']
+    assert Task.query.count() == 0
+
+
+def bulk_row(code, **fields):
+    row = {'code': code, 'title': code, 'deadline': '2030-01-01T00:00:00', 'created_by': 1}
+    row.update(fields)
+    return row
+
+
+def test_bulk_create_inserts_every_row(client, manager, auth_headers):
+    response = client.post('/api/v1/task/bulk', headers=auth_headers, json={'tasks': [bulk_row('T1'), bulk_row('T2')]})
+
+    assert response.status_code == 201, response.get_json()
+    assert [task['code'] for task in response.get_json()['data']] == ['T1', 'T2']
+    assert Task.query.count() == 2
+
+
+def test_bulk_create_is_all_or_nothing(client, manager, auth_headers):
+    rows = [
+        bulk_row('T1'),
+        bulk_row('T2', title=None),
+        bulk_row('T3', attachments=['http://localhost:5000/api/v1/uploads/ab/cd/unknown.pdf']),
+    ]
+    response = client.post('/api/v1/task/bulk', headers=auth_headers, json=rows)
+
+    assert response.status_code == 400
+    assert [error['index'] for error in response.get_json()['errors']] == [1, 2]
+    assert Task.query.count() == 0
+
+
+def test_bulk_create_rejects_duplicate_codes(client, manager, auth_headers):
+    db.session.add(Task(code='OLD', title='Old', deadline=db.func.current_timestamp(), created_by=manager.id))
+    db.session.commit()
+
+    response = client.post('/api/v1/task/bulk', headers=auth_headers,
+                           json=[bulk_row('T1'), bulk_row('T1'), bulk_row('OLD')])
+
+    assert response.status_code == 400
+    errors = {error['index']: error['error'] for error in response.get_json()['errors']}
+    assert errors == {1: 'Duplicate code in request: T1', 2: 'Task code already exists: OLD'}
+    assert Task.query.count() == 1
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import Task, Task_Detail, Task_Detail_Assignees, User, UserRole
+from conftest import make_user
+
+
+@pytest.fixture
+def detail_id(manager):
+    users = {name: make_user(name, UserRole.INTERN) for name in ('alice', 'bob', 'carol')}
+    task = Task(code='T1', title='Task 1', deadline=datetime(2030, 1, 1), created_by=manager.id)
+    db.session.add(task)
+    db.session.flush()
+    detail = Task_Detail(task_id=task.id, title='Detail', status='Đã giao')
+    db.session.add(detail)
+    db.session.flush()
+    db.session.add_all([
+        Task_Detail_Assignees(task_detail_id=detail.id, user_id=users[name].id, assigned_at=datetime.utcnow())
+        for name in ('alice', 'bob')
+    ])
+    db.session.commit()
+    return detail.id
+
+
+def assignees(detail_id):
+    db.session.expire_all()
+    rows = db.session.query(User.username, Task_Detail_Assignees.id).join(
+        Task_Detail_Assignees, Task_Detail_Assignees.user_id == User.id
+    ).filter(Task_Detail_Assignees.task_detail_id == detail_id)
+    return dict(rows)
+
+
+def test_update_only_inserts_and_deletes_the_difference(client, auth_headers, detail_id):
+    before = assignees(detail_id)
+
+    response = client.put(f'/api/v1/task_detail/{detail_id}', headers=auth_headers,
+                          json={'title': 'Renamed', 'assignees': ['bob', 'carol', 'bob']})
+
+    assert response.status_code == 200, response.get_json()
+    after = assignees(detail_id)
+    assert set(after) == {'bob', 'carol'}
+    # bob được giữ nguyên dòng cũ, không xóa rồi thêm lại
+    assert after['bob'] == before['bob']
+    assert db.session.get(Task_Detail, detail_id).title == 'Renamed'
+
+
+def test_unknown_username_changes_nothing(client, auth_headers, detail_id):
+    before = assignees(detail_id)
+
+    response = client.put(f'/api/v1/task_detail/{detail_id}', headers=auth_headers,
+                          json={'title': 'Renamed', 'assignees': ['carol', 'nobody']})
+
+    assert response.status_code != 200
+    assert "'nobody'" in response.get_json()['error']
+    assert assignees(detail_id) == before
+    assert db.session.get(Task_Detail, detail_id).title == 'Detail'
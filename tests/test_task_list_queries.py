@@ -0,0 +1,57 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Task, TaskAttachment, User, UserRole
+from app.services.response_cache import response_cache
+
+# tasks + tệp đính kèm (IN) + username người tạo (IN), không phụ thuộc số task
+TASK_LIST_QUERIES = 3
+
+
+def seed_tasks(count: int) -> None:
+    users = [User(username=f'user{i}', password_hash='x', email=f'user{i}@test.local',
+                  start_date=date(2024, 1, 1), role=UserRole.INTERN) for i in range(5)]
+    db.session.add_all(users)
+    db.session.flush()
+    for i in range(count):
+        task = Task(code=f'T{i}', title=f'Task {i}', deadline=datetime(2030, 1, 1),
+                    created_by=users[i % len(users)].id)
+        db.session.add(task)
+        db.session.flush()
+        db.session.add_all([TaskAttachment(task_id=task.id, file_path=f'http://localhost:5000/api/v1/uploads/{i}-{n}.pdf')
+                            for n in range(2)])
+    db.session.commit()
+
+
+def count_queries(fn) -> int:
+    statements = []
+
+    def on_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', on_execute)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', on_execute)
+    return len(statements)
+
+
+@pytest.mark.parametrize('task_count', [1, 10, 100])
+def test_task_list_query_count_does_not_grow_with_tasks(app, client, monkeypatch, task_count):
+    # Tắt cache response để mỗi request thật sự chạy truy vấn
+    monkeypatch.setattr(response_cache, 'ttl', 0)
+    seed_tasks(task_count)
+
+    responses = []
+    queries = count_queries(lambda: responses.append(client.get('/api/v1/task/')))
+
+    response = responses[0]
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert len(data) == task_count
+    assert all(len(task['attachments']) == 2 and task['created_by_username'] for task in data)
+    assert queries == TASK_LIST_QUERIES
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import Task, Task_Detail
+
+
+@pytest.mark.parametrize('query', ['', '?task_ids=1,2'])
+def test_progress_lists_tasks_without_details(client, manager, query):
+    for code in ('T1', 'T2'):
+        db.session.add(Task(code=code, title=code, deadline=datetime(2030, 1, 1), created_by=manager.id))
+    db.session.flush()
+    db.session.add_all([
+        Task_Detail(task_id=1, title='a', status='Hoàn thành'),
+        Task_Detail(task_id=1, title='b', status='Đã giao'),
+    ])
+    db.session.commit()
+
+    data = client.get(f'/api/v1/task/progress{query}').get_json()['data']
+
+    assert data == {
+        '1': {'total': 2, 'incomplete': 1, 'by_status': {'Hoàn thành': 1, 'Đã giao': 1}},
+        '2': {'total': 0, 'incomplete': 0, 'by_status': {}},
+    }
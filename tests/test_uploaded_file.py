@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def uploaded(app):
+    os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'ab', 'cd'), exist_ok=True)
+    name = 'ab/cd/' + 'f' * 64 + '.png'
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], name), 'wb') as f:
+        f.write(b'png')
+    return name
+
+
+@pytest.mark.parametrize('size', ['abc', '1.5', '', '128'])
+def test_invalid_size_is_rejected_with_json_400(client, uploaded, size):
+    response = client.get(f'/api/v1/uploads/{uploaded}?size={size}')
+
+    assert response.status_code == 400
+    assert response.get_json()['message'].startswith('Invalid size. Must be one of:')
+
+
+def test_without_size_serves_the_original(client, uploaded):
+    response = client.get(f'/api/v1/uploads/{uploaded}')
+
+    assert response.status_code == 200
+    assert response.data == b'png'